@@ -0,0 +1,203 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cstr, flt, get_first_day, get_last_day, getdate, now
+
+from erpnext.utilities.upsert import insert_or_add
+
+BALANCE_KEY_FIELDS = [
+	"company",
+	"account",
+	"posting_date",
+	"fiscal_year",
+	"voucher_type",
+	"is_opening",
+	"cost_center",
+	"project",
+	"finance_book",
+]
+BALANCE_FIELDS = ["debit", "credit", "debit_in_account_currency", "credit_in_account_currency"]
+
+
+class AccountPeriodBalance(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Period Balance", ["company", "account", "posting_date"])
+	frappe.db.add_unique(
+		"Account Period Balance", ["balance_key"], constraint_name="unique_balance_key"
+	)
+
+
+def get_balance_key_fields():
+	meta = frappe.get_meta("Account Period Balance")
+	dimensions = [
+		d.fieldname
+		for d in frappe.get_all("Accounting Dimension", fields=["fieldname"])
+		if meta.has_field(d.fieldname)
+	]
+
+	return BALANCE_KEY_FIELDS + dimensions
+
+
+def update_account_period_balance(gl_entries, cancel=False):
+	"""Add debit / credit of GL entries to the balance of their account for the month,
+	or reverse it if `cancel` is set."""
+	key_fields = get_balance_key_fields()
+	sign = -1 if cancel else 1
+
+	balances = []
+	for key, balance in get_balance_by_period(gl_entries, key_fields).items():
+		for field in BALANCE_FIELDS:
+			balance[field] = sign * flt(balance[field])
+		balances.append((key, balance))
+
+	insert_account_period_balances(balances, key_fields)
+
+
+def remove_account_period_balance(voucher_type, voucher_no):
+	"""Reverse balance of active GL entries of the voucher, before they are cancelled or deleted."""
+	key_fields = get_balance_key_fields()
+	gl_entries = frappe.get_all(
+		"GL Entry",
+		filters={"voucher_type": voucher_type, "voucher_no": voucher_no, "is_cancelled": 0},
+		fields=key_fields + BALANCE_FIELDS + ["account_currency"],
+	)
+	update_account_period_balance(gl_entries, cancel=True)
+
+
+def get_balance_by_period(gl_entries, key_fields):
+	balances = {}
+	for gle in gl_entries:
+		key = tuple(get_balance_key_value(gle, field) for field in key_fields)
+		if key not in balances:
+			balances[key] = frappe._dict(account_currency=gle.account_currency)
+
+		for field in BALANCE_FIELDS:
+			balances[key][field] = flt(balances[key].get(field)) + flt(gle.get(field))
+
+	return balances
+
+
+def get_balance_key_value(gle, field):
+	if field == "posting_date":
+		return get_first_day(gle.posting_date)
+	elif field == "voucher_type":
+		# only entries of period closing vouchers are kept separately
+		return gle.voucher_type if gle.voucher_type == "Period Closing Voucher" else ""
+	elif field == "is_opening":
+		return gle.is_opening or "No"
+
+	return cstr(gle.get(field))
+
+
+def get_balance_key(key_fields, key):
+	"""Returns a hash of the values of `key_fields`, unique per balance row. Empty values are
+	left out, so that adding an accounting dimension does not change keys of existing rows."""
+	key = "\n".join(
+		"{0}={1}".format(field, cstr(value)) for field, value in zip(key_fields, key) if value
+	)
+	return hashlib.sha1(key.encode()).hexdigest()
+
+
+def insert_account_period_balances(balances, key_fields):
+	"""Insert balances, or add them to the existing balance of the same key."""
+	if not balances:
+		return
+
+	timestamp = now()
+	fields = ["name", "creation", "modified", "owner", "modified_by", "account_currency"]
+	fields.extend(key_fields)
+	fields.extend(BALANCE_FIELDS)
+	fields.append("balance_key")
+
+	values = []
+	for key, balance in balances:
+		row = [
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			frappe.session.user,
+			frappe.session.user,
+			balance.account_currency,
+		]
+		for field, value in zip(key_fields, key):
+			# empty links are stored as null, same as in GL Entry
+			row.append(value if field == "voucher_type" else value or None)
+
+		row.extend(balance[field] for field in BALANCE_FIELDS)
+		row.append(get_balance_key(key_fields, key))
+		values.append(row)
+
+	# rows are locked in the same order by all transactions
+	values.sort(key=lambda row: row[-1])
+	insert_or_add("Account Period Balance", fields, values, ["balance_key"], BALANCE_FIELDS)
+
+
+def rebuild_account_period_balance(company=None):
+	"""Rebuild monthly balances of all accounts from GL entries."""
+	key_fields = get_balance_key_fields()
+	group_by_fields = [field for field in key_fields if field not in ("posting_date", "voucher_type")]
+
+	frappe.db.sql(
+		"delete from `tabAccount Period Balance` {0}".format(
+			"where company = %(company)s" if company else ""
+		),
+		{"company": company},
+	)
+
+	gl_entries = frappe.db.sql(
+		"""
+		select
+			{fields}, account_currency, min(posting_date) as posting_date,
+			if(voucher_type = 'Period Closing Voucher', voucher_type, '') as voucher_type,
+			sum(debit) as debit, sum(credit) as credit,
+			sum(debit_in_account_currency) as debit_in_account_currency,
+			sum(credit_in_account_currency) as credit_in_account_currency
+		from `tabGL Entry`
+		where is_cancelled = 0 {conditions}
+		group by {fields}, account_currency, year(posting_date), month(posting_date),
+			if(voucher_type = 'Period Closing Voucher', voucher_type, '')
+	""".format(
+			fields=", ".join("`{0}`".format(field) for field in group_by_fields),
+			conditions="and company = %(company)s" if company else "",
+		),
+		{"company": company},
+		as_dict=1,
+	)
+
+	insert_account_period_balances(
+		list(get_balance_by_period(gl_entries, key_fields).items()), key_fields
+	)
+
+
+def get_gl_balance_sources(to_date=None, start_dates=None, end_dates=None):
+	"""Returns list of (table, condition) to read GL balances upto `to_date` from.
+
+	Balances of complete months are read from Account Period Balance and entries of the
+	month of `to_date`, if it is not complete yet, from GL Entry. Only GL Entry is used if
+	any of `start_dates` is not the first day or `end_dates` the last day of a month,
+	as monthly balances can not be split at those dates."""
+	gl_entry_source = ("`tabGL Entry`", "is_cancelled = 0")
+
+	for date in start_dates or []:
+		if date and getdate(date) != get_first_day(date):
+			return [gl_entry_source]
+
+	for date in end_dates or []:
+		if date and getdate(date) != get_last_day(date):
+			return [gl_entry_source]
+
+	if not to_date or getdate(to_date) == get_last_day(to_date):
+		return [("`tabAccount Period Balance`", "1 = 1")]
+
+	partial_period_start = frappe.db.escape(cstr(get_first_day(to_date)))
+	return [
+		("`tabAccount Period Balance`", "posting_date < {0}".format(partial_period_start)),
+		("`tabGL Entry`", "is_cancelled = 0 and posting_date >= {0}".format(partial_period_start)),
+	]
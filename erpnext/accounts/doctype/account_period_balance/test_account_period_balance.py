@@ -0,0 +1,114 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, flt, get_first_day, get_last_day, today
+
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	get_gl_balance_sources,
+	rebuild_account_period_balance,
+	update_account_period_balance,
+)
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.utils import get_balance_on
+
+
+class TestAccountPeriodBalance(FrappeTestCase):
+	def get_balance_from_gl_entries(self, account, date):
+		return flt(
+			frappe.db.sql(
+				"""select sum(debit) - sum(credit) from `tabGL Entry`
+				where account = %s and posting_date <= %s and is_cancelled = 0""",
+				(account, date),
+			)[0][0]
+		)
+
+	def get_period_balances(self, account):
+		balances = {}
+		for d in frappe.get_all(
+			"Account Period Balance",
+			filters={"account": account},
+			fields=["posting_date", "cost_center", "debit", "credit"],
+		):
+			balance = balances.setdefault((d.posting_date, d.cost_center), [0.0, 0.0])
+			balance[0] = flt(balance[0] + d.debit, 2)
+			balance[1] = flt(balance[1] + d.credit, 2)
+
+		return {key: balance for key, balance in balances.items() if any(balance)}
+
+	def assertBalanceOnEqual(self, account, dates):
+		for date in dates:
+			self.assertEqual(
+				flt(get_balance_on(account, date, in_account_currency=False), 2),
+				flt(self.get_balance_from_gl_entries(account, date), 2),
+			)
+
+	def test_balance_on_gl_posting_and_cancel(self):
+		account = "_Test Bank - _TC"
+		posting_date = add_days(get_first_day(today()), -10)
+		dates = [posting_date, get_last_day(posting_date), today()]
+
+		je = make_journal_entry(
+			account, "_Test Account Shipping Charges - _TC", 100, posting_date=posting_date, submit=True
+		)
+		make_journal_entry(account, "_Test Account Shipping Charges - _TC", 50, submit=True)
+		self.assertBalanceOnEqual(account, dates)
+
+		je.cancel()
+		self.assertBalanceOnEqual(account, dates)
+
+		# balances kept on posting are same as rebuilt from GL Entries
+		expected = self.get_period_balances(account)
+		rebuild_account_period_balance("_Test Company")
+		self.assertEqual(expected, self.get_period_balances(account))
+
+	def test_balance_of_same_key_is_added_to_one_row(self):
+		account = "_Test Account Shipping Charges - _TC"
+		gle = frappe._dict(
+			company="_Test Company",
+			account=account,
+			posting_date="2001-01-10",
+			fiscal_year="_Test Fiscal Year 2001",
+			voucher_type="Journal Entry",
+			cost_center="_Test Cost Center - _TC",
+			account_currency="INR",
+			debit=100,
+			credit=0,
+			debit_in_account_currency=100,
+			credit_in_account_currency=0,
+		)
+		frappe.db.delete("Account Period Balance", {"account": account, "posting_date": "2001-01-01"})
+
+		update_account_period_balance([gle])
+		update_account_period_balance([gle, gle.copy()])
+		update_account_period_balance([gle], cancel=True)
+
+		rows = frappe.get_all(
+			"Account Period Balance",
+			filters={"account": account, "posting_date": "2001-01-01"},
+			fields=["debit", "debit_in_account_currency"],
+		)
+		self.assertEqual(len(rows), 1)
+		self.assertEqual(rows[0].debit, 200)
+		self.assertEqual(rows[0].debit_in_account_currency, 200)
+
+	def test_gl_balance_sources(self):
+		self.assertEqual(
+			get_gl_balance_sources("2021-03-31", start_dates=["2021-01-01"]),
+			[("`tabAccount Period Balance`", "1 = 1")],
+		)
+		self.assertEqual(
+			get_gl_balance_sources("2021-03-15", start_dates=["2021-01-01"]),
+			[
+				("`tabAccount Period Balance`", "posting_date < '2021-03-01'"),
+				("`tabGL Entry`", "is_cancelled = 0 and posting_date >= '2021-03-01'"),
+			],
+		)
+
+		# monthly balances can't be split at mid-month dates
+		for sources in (
+			get_gl_balance_sources("2021-03-31", start_dates=["2021-01-15"]),
+			get_gl_balance_sources("2021-03-31", end_dates=["2021-02-15"]),
+		):
+			self.assertEqual(sources, [("`tabGL Entry`", "is_cancelled = 0")])
@@ -11,7 +11,12 @@ from frappe.utils import add_months, flt, fmt_money, get_last_day, getdate
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
+from erpnext.accounts.doctype.budget_consumption.budget_consumption import (
+	get_budget_consumption,
+	rebuild_budget_consumption,
+)
 from erpnext.accounts.utils import get_fiscal_year
+from erpnext.utilities.tree_index import get_ancestors, get_tree_index
 
 
 class BudgetError(frappe.ValidationError):
@@ -36,6 +41,12 @@ class Budget(Document):
 		self.set_null_value()
 		self.validate_applicable_for()
 
+	def on_submit(self):
+		rebuild_budget_consumption(self)
+
+	def on_cancel(self):
+		frappe.db.sql("delete from `tabBudget Consumption` where budget = %s", self.name)
+
 	def validate_duplicate(self):
 		budget_against_field = frappe.scrub(self.budget_against)
 		budget_against = self.get(budget_against_field)
@@ -111,79 +122,107 @@ class Budget(Document):
 
 
 def validate_expense_against_budget(args):
-	args = frappe._dict(args)
+	validate_expenses_against_budget([args])
 
-	if args.get("company") and not args.fiscal_year:
-		args.fiscal_year = get_fiscal_year(args.get("posting_date"), company=args.get("company"))[0]
-		frappe.flags.exception_approver_role = frappe.get_cached_value(
-			"Company", args.get("company"), "exception_budget_approver_role"
-		)
 
-	if not args.account:
-		args.account = args.get("expense_account")
+def validate_expenses_against_budget(args_list):
+	"""Validate expenses of all rows of a document against budgets in one call.
 
-	if not (args.get("account") and args.get("cost_center")) and args.item_code:
-		args.cost_center, args.account = get_item_details(args)
+	Rows with the same item, account and dimensions are validated once and budgets of
+	an account and dimension are fetched once."""
+	accounting_dimensions = get_accounting_dimensions()
+	validated_rows = set()
+	budget_records_by_dimension = {}
 
-	if not args.account:
-		return
+	for args in args_list:
+		args = frappe._dict(args)
 
-	for budget_against in ["project", "cost_center"] + get_accounting_dimensions():
-		if (
-			args.get(budget_against)
-			and args.account
-			and frappe.db.get_value("Account", {"name": args.account, "root_type": "Expense"})
-		):
+		if args.get("company") and not args.fiscal_year:
+			args.fiscal_year = get_fiscal_year(args.get("posting_date"), company=args.get("company"))[0]
+			frappe.flags.exception_approver_role = frappe.get_cached_value(
+				"Company", args.get("company"), "exception_budget_approver_role"
+			)
+
+		if not args.account:
+			args.account = args.get("expense_account")
+
+		if not (args.get("account") and args.get("cost_center")) and args.item_code:
+			args.cost_center, args.account = get_item_details(args)
+
+		if not args.account:
+			continue
+
+		if frappe.get_cached_value("Account", args.account, "root_type") != "Expense":
+			continue
+
+		dimensions = ["project", "cost_center"] + accounting_dimensions
+		row_key = tuple(
+			args.get(field)
+			for field in ["doctype", "company", "fiscal_year", "posting_date", "item_code", "account"]
+			+ dimensions
+		)
+		if row_key in validated_rows:
+			continue
+
+		validated_rows.add(row_key)
 
-			doctype = frappe.unscrub(budget_against)
-
-			if frappe.get_cached_value("DocType", doctype, "is_tree"):
-				lft, rgt = frappe.db.get_value(doctype, args.get(budget_against), ["lft", "rgt"])
-				condition = """and exists(select name from `tab%s`
-					where lft<=%s and rgt>=%s and name=b.%s)""" % (
-					doctype,
-					lft,
-					rgt,
-					budget_against,
-				)  # nosec
-				args.is_tree = True
-			else:
-				condition = "and b.%s=%s" % (budget_against, frappe.db.escape(args.get(budget_against)))
-				args.is_tree = False
+		for budget_against in dimensions:
+			if not args.get(budget_against):
+				continue
 
 			args.budget_against_field = budget_against
-			args.budget_against_doctype = doctype
-
-			budget_records = frappe.db.sql(
-				"""
-				select
-					b.{budget_against_field} as budget_against, ba.budget_amount, b.monthly_distribution,
-					ifnull(b.applicable_on_material_request, 0) as for_material_request,
-					ifnull(applicable_on_purchase_order, 0) as for_purchase_order,
-					ifnull(applicable_on_booking_actual_expenses,0) as for_actual_expenses,
-					b.action_if_annual_budget_exceeded, b.action_if_accumulated_monthly_budget_exceeded,
-					b.action_if_annual_budget_exceeded_on_mr, b.action_if_accumulated_monthly_budget_exceeded_on_mr,
-					b.action_if_annual_budget_exceeded_on_po, b.action_if_accumulated_monthly_budget_exceeded_on_po
-				from
-					`tabBudget` b, `tabBudget Account` ba
-				where
-					b.name=ba.parent and b.fiscal_year=%s
-					and ba.account=%s and b.docstatus=1
-					{condition}
-			""".format(
-					condition=condition, budget_against_field=budget_against
-				),
-				(args.fiscal_year, args.account),
-				as_dict=True,
-			)  # nosec
-
-			if budget_records:
-				validate_budget_records(args, budget_records)
+			args.budget_against_doctype = frappe.unscrub(budget_against)
+			args.is_tree = bool(frappe.get_cached_value("DocType", args.budget_against_doctype, "is_tree"))
+
+			key = (args.fiscal_year, args.account, budget_against, args.get(budget_against))
+			if key not in budget_records_by_dimension:
+				budget_records_by_dimension[key] = get_budget_records(args)
+
+			if budget_records_by_dimension[key]:
+				validate_budget_records(args, budget_records_by_dimension[key])
+
+
+def get_budget_records(args):
+	budget_against = args.budget_against_field
+
+	if args.is_tree:
+		# budgets against the value or any of its parents
+		parents = get_ancestors(args.budget_against_doctype, args.get(budget_against), include_self=True)
+		condition = "and b.%s in (%s)" % (
+			budget_against,
+			", ".join(frappe.db.escape(d) for d in parents) or "''",
+		)  # nosec
+	else:
+		condition = "and b.%s=%s" % (budget_against, frappe.db.escape(args.get(budget_against)))
+
+	return frappe.db.sql(
+		"""
+		select
+			b.name, b.{budget_against_field} as budget_against, ba.budget_amount, b.monthly_distribution,
+			ifnull(b.applicable_on_material_request, 0) as for_material_request,
+			ifnull(applicable_on_purchase_order, 0) as for_purchase_order,
+			ifnull(applicable_on_booking_actual_expenses,0) as for_actual_expenses,
+			b.action_if_annual_budget_exceeded, b.action_if_accumulated_monthly_budget_exceeded,
+			b.action_if_annual_budget_exceeded_on_mr, b.action_if_accumulated_monthly_budget_exceeded_on_mr,
+			b.action_if_annual_budget_exceeded_on_po, b.action_if_accumulated_monthly_budget_exceeded_on_po
+		from
+			`tabBudget` b, `tabBudget Account` ba
+		where
+			b.name=ba.parent and b.fiscal_year=%s
+			and ba.account=%s and b.docstatus=1
+			{condition}
+	""".format(
+			condition=condition, budget_against_field=budget_against
+		),
+		(args.fiscal_year, args.account),
+		as_dict=True,
+	)  # nosec
 
 
 def validate_budget_records(args, budget_records):
 	for budget in budget_records:
 		if flt(budget.budget_amount):
+			args.budget = budget.name
 			amount = get_amount(args, budget)
 			yearly_action, monthly_action = get_actions(args, budget)
 
@@ -324,6 +363,10 @@ def get_other_condition(args, budget, for_doc):
 
 
 def get_actual_expense(args):
+	if args.get("budget"):
+		# expense booked against submitted budgets is kept in Budget Consumption
+		return get_budget_consumption(args.budget, args.account, args.get("month_end_date"))
+
 	if not args.budget_against_doctype:
 		args.budget_against_doctype = frappe.unscrub(args.budget_against_field)
 
@@ -331,11 +374,9 @@ def get_actual_expense(args):
 	condition1 = " and gle.posting_date <= %(month_end_date)s" if args.get("month_end_date") else ""
 
 	if args.is_tree:
-		lft_rgt = frappe.db.get_value(
-			args.budget_against_doctype, args.get(budget_against_field), ["lft", "rgt"], as_dict=1
-		)
-
-		args.update(lft_rgt)
+		args.lft, args.rgt = get_tree_index(args.budget_against_doctype).bounds[
+			args.get(budget_against_field)
+		]
 
 		condition2 = """and exists(select name from `tab{doctype}`
 			where lft>=%(lft)s and rgt<=%(rgt)s
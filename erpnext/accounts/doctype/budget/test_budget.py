@@ -7,6 +7,10 @@ import frappe
 from frappe.utils import now_datetime, nowdate
 
 from erpnext.accounts.doctype.budget.budget import BudgetError, get_actual_expense
+from erpnext.accounts.doctype.budget_consumption.budget_consumption import (
+	get_budget_consumption,
+	rebuild_budget_consumption,
+)
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
 from erpnext.accounts.utils import get_fiscal_year
 from erpnext.buying.doctype.purchase_order.test_purchase_order import create_purchase_order
@@ -334,6 +338,48 @@ class TestBudget(unittest.TestCase):
 		budget.cancel()
 		jv.cancel()
 
+	def test_budget_consumption_on_posting(self):
+		set_total_expense_zero(nowdate(), "cost_center")
+
+		budget = make_budget(budget_against="Cost Center")
+		account = "_Test Account Cost for Goods Sold - _TC"
+		consumption = get_budget_consumption(budget.name, account)
+
+		jv = make_journal_entry(
+			account,
+			"_Test Bank - _TC",
+			4000,
+			"_Test Cost Center - _TC",
+			posting_date=nowdate(),
+			submit=True,
+		)
+		self.assertEqual(get_budget_consumption(budget.name, account), consumption + 4000)
+
+		# expense of the month is added to one row
+		jv2 = make_journal_entry(
+			account,
+			"_Test Bank - _TC",
+			1000,
+			"_Test Cost Center - _TC",
+			posting_date=nowdate(),
+			submit=True,
+		)
+		self.assertEqual(get_budget_consumption(budget.name, account), consumption + 5000)
+		self.assertEqual(
+			frappe.db.count("Budget Consumption", {"budget": budget.name, "account": account}), 1
+		)
+		jv2.cancel()
+
+		# consumption kept on posting is same as rebuilt from GL Entries
+		rebuild_budget_consumption(budget)
+		self.assertEqual(get_budget_consumption(budget.name, account), consumption + 4000)
+
+		jv.cancel()
+		self.assertEqual(get_budget_consumption(budget.name, account), consumption)
+
+		budget.cancel()
+		self.assertFalse(frappe.db.exists("Budget Consumption", {"budget": budget.name}))
+
 
 def set_total_expense_zero(posting_date, budget_against_field=None, budget_against_CC=None):
 	if budget_against_field == "project":
@@ -0,0 +1,200 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cstr, flt, get_first_day, now
+
+from erpnext.utilities.tree_index import get_descendants, is_descendant
+from erpnext.utilities.upsert import insert_or_add
+
+CONSUMPTION_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"budget",
+	"account",
+	"posting_date",
+	"amount",
+]
+
+
+class BudgetConsumption(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Budget Consumption",
+		["budget", "account", "posting_date"],
+		constraint_name="unique_budget_account_posting_date",
+	)
+
+
+def get_budget_consumption(budget, account, to_date=None):
+	"""Returns expense booked against the budget for the account, upto the month of `to_date`"""
+	return flt(
+		frappe.db.sql(
+			"""select sum(amount) from `tabBudget Consumption`
+			where budget = %(budget)s and account = %(account)s {0}""".format(
+				"and posting_date <= %(to_date)s" if to_date else ""
+			),
+			{"budget": budget, "account": account, "to_date": to_date},
+		)[0][0]
+	)
+
+
+def update_budget_consumption(gl_entries, cancel=False):
+	"""Add expense of GL entries to the consumption of submitted budgets they are booked against,
+	or reverse it if `cancel` is set."""
+	sign = -1 if cancel else 1
+	consumption = get_consumption_by_budget(gl_entries)
+
+	# rows are locked in the same order by all transactions
+	insert_budget_consumption(
+		[(key[0], key[1], key[2], sign * consumption[key]) for key in sorted(consumption)]
+	)
+
+
+def insert_budget_consumption(consumption):
+	"""Insert (budget, account, posting_date, amount) rows, or add the amount to the existing
+	row of the budget, account and month."""
+	timestamp = now()
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			frappe.session.user,
+			frappe.session.user,
+			budget,
+			account,
+			posting_date,
+			flt(amount),
+		)
+		for budget, account, posting_date, amount in consumption
+	]
+
+	insert_or_add(
+		"Budget Consumption",
+		CONSUMPTION_FIELDS,
+		values,
+		["budget", "account", "posting_date"],
+		["amount"],
+	)
+
+
+def remove_budget_consumption(voucher_type, voucher_no):
+	"""Reverse consumption of active GL entries of the voucher, before they are cancelled or deleted."""
+	gl_entries = frappe.get_all(
+		"GL Entry",
+		filters={"voucher_type": voucher_type, "voucher_no": voucher_no, "is_cancelled": 0},
+		fields=["*"],
+	)
+	update_budget_consumption(gl_entries, cancel=True)
+
+
+def get_consumption_by_budget(gl_entries):
+	budgets = get_budgets_for_gl_entries(gl_entries)
+	if not budgets:
+		return {}
+
+	consumption = {}
+	for gle in gl_entries:
+		for budget in budgets.get((gle.company, gle.fiscal_year, gle.account), []):
+			if is_booked_against_budget(gle, budget):
+				key = (budget.name, gle.account, get_first_day(gle.posting_date))
+				consumption[key] = flt(consumption.get(key)) + flt(gle.debit) - flt(gle.credit)
+
+	return consumption
+
+
+def get_budgets_for_gl_entries(gl_entries):
+	"""Returns submitted budgets by company, fiscal year and account of the GL entries"""
+	keys = {(gle.company, gle.fiscal_year, gle.account) for gle in gl_entries}
+	if not keys:
+		return {}
+
+	budgets = {}
+	for d in frappe.db.sql(
+		"""
+		select b.*, ba.account as budget_account
+		from `tabBudget` b, `tabBudget Account` ba
+		where ba.parent = b.name and b.docstatus = 1
+			and b.company in %(companies)s
+			and b.fiscal_year in %(fiscal_years)s
+			and ba.account in %(accounts)s""",
+		{
+			"companies": tuple({key[0] for key in keys}),
+			"fiscal_years": tuple({cstr(key[1]) for key in keys}),
+			"accounts": tuple({key[2] for key in keys}),
+		},
+		as_dict=1,
+	):
+		key = (d.company, d.fiscal_year, d.budget_account)
+		if key in keys:
+			budgets.setdefault(key, []).append(d)
+
+	return budgets
+
+
+def is_booked_against_budget(gle, budget):
+	"""Expense is booked against the budget if its dimension is same as of the budget,
+	or under it for tree doctypes like Cost Center"""
+	budget_against_field = frappe.scrub(budget.budget_against)
+	value = gle.get(budget_against_field)
+	budget_against = budget.get(budget_against_field)
+
+	if not value or not budget_against:
+		return False
+	elif value == budget_against:
+		return True
+	elif not frappe.get_cached_value("DocType", budget.budget_against, "is_tree"):
+		return False
+
+	return is_descendant(budget.budget_against, value, budget_against)
+
+
+def rebuild_budget_consumption(budget):
+	"""Rebuild consumption of the submitted budget from GL entries."""
+	frappe.db.sql("delete from `tabBudget Consumption` where budget = %s", budget.name)
+
+	accounts = [d.account for d in budget.get("accounts")]
+	if not accounts:
+		return
+
+	budget_against_field = frappe.scrub(budget.budget_against)
+	filters = {
+		"company": budget.company,
+		"fiscal_year": budget.fiscal_year,
+		"accounts": tuple(accounts),
+		"budget_against": budget.get(budget_against_field),
+	}
+
+	if frappe.get_cached_value("DocType", budget.budget_against, "is_tree"):
+		filters["budget_against"] = get_descendants(
+			budget.budget_against, filters["budget_against"], include_self=True
+		) or [filters["budget_against"]]
+		condition = "gle.`{0}` in %(budget_against)s".format(budget_against_field)
+	else:
+		condition = "gle.`{0}` = %(budget_against)s".format(budget_against_field)
+
+	consumption = frappe.db.sql(
+		"""
+		select account, min(posting_date) as posting_date, sum(debit) - sum(credit) as amount
+		from `tabGL Entry` gle
+		where company = %(company)s and fiscal_year = %(fiscal_year)s
+			and account in %(accounts)s and is_cancelled = 0 and {0}
+		group by account, year(posting_date), month(posting_date)
+	""".format(
+			condition
+		),
+		filters,
+		as_dict=1,
+	)
+
+	insert_budget_consumption(
+		[(budget.name, d.account, get_first_day(d.posting_date), d.amount) for d in consumption]
+	)
@@ -1,13 +1,14 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+import time
 
 import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.model.meta import get_field_precision
-from frappe.model.naming import set_name_from_naming_options
-from frappe.utils import flt, fmt_money
+from frappe.model.naming import parse_naming_series, set_name_from_naming_options
+from frappe.utils import cint, flt, fmt_money, now
 from six import iteritems
 
 import erpnext
@@ -27,6 +28,10 @@ from erpnext.exceptions import (
 
 exclude_from_linked_with = True
 
+RENAME_LIMIT = 50000
+RENAME_BATCH_SIZE = 5000
+RENAME_METRICS_CACHE_KEY = "gle_sle_rename_metrics"
+
 
 class GLEntry(Document):
 	def autoname(self):
@@ -418,15 +423,151 @@ def rename_gle_sle_docs():
 		rename_temporarily_named_docs(doctype)
 
 
-def rename_temporarily_named_docs(doctype):
-	"""Rename temporarily named docs using autoname options"""
-	docs_to_rename = frappe.get_all(doctype, {"to_rename": "1"}, order_by="creation", limit=50000)
-	for doc in docs_to_rename:
-		oldname = doc.name
-		set_name_from_naming_options(frappe.get_meta(doctype).autoname, doc)
+def rename_temporarily_named_docs(doctype, limit=RENAME_LIMIT, batch_size=RENAME_BATCH_SIZE):
+	"""Rename temporarily named docs using autoname options
+
+	Docs named by a naming series are renamed in batches, each with one block of names reserved
+	from the series. Renaming stops after `rename_gle_sle_time_limit` seconds (site config), the
+	remaining docs are renamed in the next run."""
+	start_time = time.monotonic()
+	time_limit = flt(frappe.conf.rename_gle_sle_time_limit)
+	autoname = frappe.get_meta(doctype).autoname
+	rename_in_bulk = is_series_autoname(autoname)
+
+	if rename_in_bulk:
+		# commit before creating the temporary table, to avoid an implicit commit
+		frappe.db.commit()
+		create_rename_map()
+
+	renamed = 0
+	while renamed < limit:
+		docs_to_rename = frappe.get_all(
+			doctype,
+			{"to_rename": "1"},
+			order_by="creation",
+			limit=min(batch_size, limit - renamed),
+			pluck="name",
+		)
+		if not docs_to_rename:
+			break
+
+		if rename_in_bulk:
+			rename_docs_from_series(doctype, docs_to_rename, autoname)
+			frappe.db.commit()
+		else:
+			rename_docs(doctype, docs_to_rename, autoname)
+
+		renamed += len(docs_to_rename)
+		if time_limit and time.monotonic() - start_time > time_limit:
+			break
+
+	if rename_in_bulk:
+		drop_rename_map()
+
+	set_rename_metrics(doctype, renamed, time.monotonic() - start_time)
+
+
+def rename_docs(doctype, docs_to_rename, autoname):
+	for oldname in docs_to_rename:
+		doc = frappe._dict(name=oldname)
+		set_name_from_naming_options(autoname, doc)
 		newname = doc.name
 		frappe.db.sql(
 			"UPDATE `tab{}` SET name = %s, to_rename = 0 where name = %s".format(doctype),
 			(newname, oldname),
 			auto_commit=True,
 		)
+
+
+def is_series_autoname(autoname):
+	"""Check if names are made of a prefix and a series number only, e.g. `ACC-GLE-.YYYY.-.#####`"""
+	if not autoname or ":" in autoname or "{" in autoname or "." not in autoname:
+		return False
+
+	parts = autoname.split(".")
+	return set(parts[-1]) == {"#"} and not any("#" in part for part in parts[:-1])
+
+
+def rename_docs_from_series(doctype, docs_to_rename, autoname):
+	"""Rename docs to the next names of the naming series, with one update via a mapping table."""
+	parts = autoname.split(".")
+	prefix = parse_naming_series(parts[:-1], doctype=doctype)
+	series_format = "%0" + str(len(parts[-1])) + "d"
+
+	start = reserve_series(prefix, len(docs_to_rename))
+	values = []
+	for i, oldname in enumerate(docs_to_rename):
+		values.extend([oldname, prefix + series_format % (start + i)])
+
+	frappe.db.sql("delete from `tmp_rename_map`")
+	frappe.db.sql(
+		"insert into `tmp_rename_map` (old_name, new_name) values {}".format(
+			", ".join(["(%s, %s)"] * len(docs_to_rename))
+		),
+		values,
+	)
+	frappe.db.multisql(
+		{
+			"mariadb": """update `tab{0}` doc join `tmp_rename_map` rename_map
+				on rename_map.old_name = doc.name
+				set doc.name = rename_map.new_name, doc.to_rename = 0""".format(
+				doctype
+			),
+			"postgres": """update "tab{0}" doc set name = rename_map.new_name, to_rename = 0
+				from tmp_rename_map rename_map where rename_map.old_name = doc.name""".format(
+				doctype
+			),
+		}
+	)
+
+
+def reserve_series(prefix, count):
+	"""Reserve `count` consecutive numbers of the naming series and return the first number."""
+	current = frappe.db.sql("select `current` from `tabSeries` where `name`=%s for update", prefix)
+	if current and current[0][0] is not None:
+		frappe.db.sql(
+			"update `tabSeries` set `current` = `current` + %s where `name`=%s", (count, prefix)
+		)
+		return cint(current[0][0]) + 1
+
+	frappe.db.sql("insert into `tabSeries` (`name`, `current`) values (%s, %s)", (prefix, count))
+	return 1
+
+
+def create_rename_map():
+	frappe.db.sql(
+		"""create temporary table if not exists `tmp_rename_map`
+		(old_name varchar(140) primary key, new_name varchar(140))"""
+	)
+
+
+def drop_rename_map():
+	# only drops the temporary table, never a permanent table of the same name
+	frappe.db.multisql(
+		{
+			"mariadb": "drop temporary table if exists `tmp_rename_map`",
+			"postgres": "drop table if exists pg_temp.tmp_rename_map",
+		}
+	)
+
+
+def set_rename_metrics(doctype, renamed, time_taken):
+	frappe.cache().hset(
+		RENAME_METRICS_CACHE_KEY,
+		doctype,
+		{
+			"renamed": renamed,
+			"time_taken": flt(time_taken, 3),
+			"docs_per_second": flt(renamed / time_taken, 2) if time_taken else 0,
+			"pending": frappe.db.count(doctype, {"to_rename": 1}),
+			"last_run": now(),
+		},
+	)
+
+
+def get_rename_metrics(doctype=None):
+	"""Returns throughput of the last run of renaming temporarily named GL and Stock Ledger Entries."""
+	if doctype:
+		return frappe.cache().hget(RENAME_METRICS_CACHE_KEY, doctype)
+
+	return frappe.cache().hgetall(RENAME_METRICS_CACHE_KEY)
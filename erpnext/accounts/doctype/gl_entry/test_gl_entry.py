@@ -7,7 +7,11 @@ import unittest
 import frappe
 from frappe.model.naming import parse_naming_series
 
-from erpnext.accounts.doctype.gl_entry.gl_entry import rename_gle_sle_docs
+from erpnext.accounts.doctype.gl_entry.gl_entry import (
+	get_rename_metrics,
+	is_series_autoname,
+	rename_gle_sle_docs,
+)
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
 
 
@@ -79,3 +83,20 @@ class TestGLEntry(unittest.TestCase):
 			"SELECT current from tabSeries where name = %s", naming_series
 		)[0][0]
 		self.assertEqual(old_naming_series_current_value + 2, new_naming_series_current_value)
+
+	def test_rename_metrics(self):
+		make_journal_entry(
+			"_Test Account Cost for Goods Sold - _TC", "_Test Bank - _TC", 100, submit=True
+		)
+		rename_gle_sle_docs()
+
+		metrics = get_rename_metrics("GL Entry")
+		self.assertGreaterEqual(metrics["renamed"], 2)
+		self.assertEqual(metrics["pending"], 0)
+
+	def test_series_autoname(self):
+		self.assertTrue(is_series_autoname("ACC-GLE-.YYYY.-.#####"))
+		self.assertFalse(is_series_autoname("hash"))
+		self.assertFalse(is_series_autoname("format:GLE-{#####}"))
+		self.assertFalse(is_series_autoname("naming_series:"))
+		self.assertFalse(is_series_autoname("GLE-.#####.-.YYYY"))
@@ -0,0 +1,166 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, now
+
+TAX_DOCTYPES = {
+	"Sales Invoice": "Sales Taxes and Charges",
+	"Purchase Invoice": "Purchase Taxes and Charges",
+}
+TAX_DETAIL_FIELDS = [
+	"company",
+	"voucher_type",
+	"voucher_no",
+	"posting_date",
+	"tax_row",
+	"account_head",
+	"item_code",
+	"rate",
+	"tax_amount",
+]
+
+
+class ItemWiseTaxDetail(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Item Wise Tax Detail", ["voucher_type", "voucher_no"])
+	frappe.db.add_index("Item Wise Tax Detail", ["account_head", "posting_date"])
+
+
+def make_item_wise_tax_details(doc):
+	"""Add item-wise breakup of taxes of the submitted invoice, as kept in `item_wise_tax_detail`
+	of its tax rows."""
+	tax_rows = [
+		frappe._dict(
+			name=tax.name,
+			parent=doc.name,
+			company=doc.company,
+			posting_date=doc.posting_date,
+			account_head=tax.account_head,
+			item_wise_tax_detail=tax.item_wise_tax_detail,
+		)
+		for tax in doc.get("taxes")
+	]
+
+	insert_item_wise_tax_details(doc.doctype, tax_rows)
+
+
+def delete_item_wise_tax_details(voucher_type, voucher_no):
+	frappe.db.sql(
+		"""delete from `tabItem Wise Tax Detail` where voucher_type = %s and voucher_no = %s""",
+		(voucher_type, voucher_no),
+	)
+
+
+def insert_item_wise_tax_details(voucher_type, tax_rows):
+	timestamp = now()
+	values = []
+	for tax in tax_rows:
+		for item_code, rate, tax_amount in parse_item_wise_tax_detail(tax.item_wise_tax_detail):
+			values.append(
+				(
+					frappe.generate_hash(length=10),
+					timestamp,
+					timestamp,
+					frappe.session.user,
+					frappe.session.user,
+					tax.company,
+					voucher_type,
+					tax.parent,
+					tax.posting_date,
+					tax.name,
+					tax.account_head,
+					item_code,
+					rate,
+					tax_amount,
+				)
+			)
+
+	if values:
+		frappe.db.bulk_insert(
+			"Item Wise Tax Detail",
+			fields=["name", "creation", "modified", "owner", "modified_by"] + TAX_DETAIL_FIELDS,
+			values=values,
+		)
+
+
+def parse_item_wise_tax_detail(item_wise_tax_detail):
+	"""Returns list of (item, rate, tax amount) from `item_wise_tax_detail` of a tax row.
+
+	Older records only have the rate of each item."""
+	if not item_wise_tax_detail:
+		return []
+
+	if isinstance(item_wise_tax_detail, str):
+		try:
+			item_wise_tax_detail = json.loads(item_wise_tax_detail)
+		except ValueError:
+			return []
+
+	if not isinstance(item_wise_tax_detail, dict):
+		return []
+
+	tax_details = []
+	for item_code, tax_data in item_wise_tax_detail.items():
+		if isinstance(tax_data, list):
+			rate = tax_data[0] if tax_data else 0
+			tax_amount = tax_data[1] if len(tax_data) > 1 else 0
+		else:
+			rate, tax_amount = tax_data, 0
+
+		tax_details.append((item_code, flt(rate), flt(tax_amount)))
+
+	return tax_details
+
+
+def rebuild_item_wise_tax_details(voucher_type, chunk_size=1000):
+	"""Rebuild item-wise tax breakup of all submitted invoices of `voucher_type`."""
+	tax_doctype = TAX_DOCTYPES[voucher_type]
+	frappe.db.sql("delete from `tabItem Wise Tax Detail` where voucher_type = %s", voucher_type)
+
+	invoices = frappe.get_all(voucher_type, filters={"docstatus": 1}, pluck="name", order_by="name")
+	for i in range(0, len(invoices), chunk_size):
+		tax_rows = frappe.db.sql(
+			"""
+			select
+				tax.name, tax.parent, tax.account_head, tax.item_wise_tax_detail,
+				inv.company, inv.posting_date
+			from `tab{tax_doctype}` tax, `tab{voucher_type}` inv
+			where tax.parent = inv.name and tax.parenttype = %(voucher_type)s
+				and inv.name in %(invoices)s
+		""".format(
+				tax_doctype=tax_doctype, voucher_type=voucher_type
+			),
+			{"voucher_type": voucher_type, "invoices": invoices[i : i + chunk_size]},
+			as_dict=1,
+		)
+
+		insert_item_wise_tax_details(voucher_type, tax_rows)
+
+
+def get_item_wise_tax_details(voucher_type, vouchers, accounts=None):
+	"""Returns tax rate and amount of each item of the submitted `vouchers` per tax account,
+	ordered by account."""
+	if not vouchers:
+		return []
+
+	return frappe.db.sql(
+		"""
+		select
+			voucher_no as parent, account_head, item_code, rate, sum(tax_amount) as tax_amount
+		from `tabItem Wise Tax Detail`
+		where voucher_type = %(voucher_type)s and voucher_no in %(vouchers)s {0}
+		group by voucher_no, account_head, item_code, rate
+		order by account_head, voucher_no, item_code
+	""".format(
+			"and account_head in %(accounts)s" if accounts else ""
+		),
+		{"voucher_type": voucher_type, "vouchers": tuple(vouchers), "accounts": tuple(accounts or [])},
+		as_dict=1,
+	)
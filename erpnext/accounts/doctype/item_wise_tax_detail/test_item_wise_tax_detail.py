@@ -0,0 +1,68 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	get_item_wise_tax_details,
+	parse_item_wise_tax_detail,
+	rebuild_item_wise_tax_details,
+)
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+
+
+class TestItemWiseTaxDetail(FrappeTestCase):
+	def get_tax_details(self, si):
+		return [
+			(d.item_code, d.account_head, d.rate, d.tax_amount)
+			for d in get_item_wise_tax_details(si.doctype, [si.name])
+		]
+
+	def test_tax_details_on_submit_and_cancel(self):
+		si = create_sales_invoice(qty=10, rate=100, do_not_save=True)
+		si.append(
+			"items",
+			{
+				"item_code": "_Test Item 2",
+				"warehouse": "_Test Warehouse - _TC",
+				"qty": 5,
+				"rate": 100,
+				"income_account": "Sales - _TC",
+				"expense_account": "Cost of Goods Sold - _TC",
+				"cost_center": "_Test Cost Center - _TC",
+			},
+		)
+		si.append(
+			"taxes",
+			{
+				"charge_type": "On Net Total",
+				"account_head": "_Test Account Service Tax - _TC",
+				"cost_center": "_Test Cost Center - _TC",
+				"description": "Service Tax",
+				"rate": 10,
+			},
+		)
+		si.insert()
+		si.submit()
+
+		expected = [
+			("_Test Item", "_Test Account Service Tax - _TC", 10.0, 100.0),
+			("_Test Item 2", "_Test Account Service Tax - _TC", 10.0, 50.0),
+		]
+		self.assertEqual(self.get_tax_details(si), expected)
+
+		# breakup rebuilt from tax rows is same as kept on submit
+		rebuild_item_wise_tax_details("Sales Invoice")
+		self.assertEqual(self.get_tax_details(si), expected)
+
+		si.cancel()
+		self.assertEqual(self.get_tax_details(si), [])
+
+	def test_parse_item_wise_tax_detail(self):
+		self.assertEqual(
+			parse_item_wise_tax_detail('{"_Test Item":[18.0,90.0],"_Test Item 2":18}'),
+			[("_Test Item", 18.0, 90.0), ("_Test Item 2", 18.0, 0.0)],
+		)
+		self.assertEqual(parse_item_wise_tax_detail("invalid"), [])
+		self.assertEqual(parse_item_wise_tax_detail(None), [])
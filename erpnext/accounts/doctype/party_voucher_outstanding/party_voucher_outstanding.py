@@ -0,0 +1,184 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, now
+
+PARTY_ACCOUNT_TYPES = ("Receivable", "Payable")
+VOUCHER_KEY_FIELDS = ("company", "account", "party_type", "party", "voucher_type", "voucher_no")
+GL_ENTRY_FIELDS = [
+	"company",
+	"account",
+	"party_type",
+	"party",
+	"voucher_type",
+	"voucher_no",
+	"against_voucher_type",
+	"against_voucher",
+	"account_currency",
+	"debit",
+	"credit",
+	"debit_in_account_currency",
+	"credit_in_account_currency",
+]
+
+
+class PartyVoucherOutstanding(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Party Voucher Outstanding", ["voucher_no", "party"])
+	frappe.db.add_index("Party Voucher Outstanding", ["company", "party_type", "party"])
+
+
+def update_party_voucher_outstanding(gl_entries, cancel=False):
+	"""Add balance of GL entries booked on receivable / payable accounts to the outstanding
+	of the voucher they are booked against, or reverse it if `cancel` is set."""
+	sign = -1 if cancel else 1
+	for key, balance in get_outstanding_by_voucher(gl_entries).items():
+		filters = dict(zip(VOUCHER_KEY_FIELDS, key))
+		name = frappe.db.get_value("Party Voucher Outstanding", filters, "name", for_update=True)
+		if name:
+			frappe.db.sql(
+				"""
+				update `tabParty Voucher Outstanding`
+				set outstanding = outstanding + %s,
+					outstanding_in_account_currency = outstanding_in_account_currency + %s
+				where name = %s""",
+				(sign * balance.outstanding, sign * balance.outstanding_in_account_currency, name),
+			)
+		else:
+			doc = frappe.new_doc("Party Voucher Outstanding")
+			doc.update(filters)
+			doc.account_currency = balance.account_currency
+			doc.outstanding = sign * balance.outstanding
+			doc.outstanding_in_account_currency = sign * balance.outstanding_in_account_currency
+			doc.db_insert()
+
+
+def remove_party_voucher_outstanding(voucher_type, voucher_no):
+	"""Reverse outstanding of active GL entries of the voucher, before they are cancelled or deleted."""
+	update_party_voucher_outstanding(
+		get_party_gl_entries({"voucher_type": voucher_type, "voucher_no": voucher_no}), cancel=True
+	)
+
+
+def get_party_gl_entries(filters):
+	filters.update({"is_cancelled": 0, "party": ("is", "set")})
+	return frappe.get_all("GL Entry", filters=filters, fields=GL_ENTRY_FIELDS)
+
+
+def get_outstanding_by_voucher(gl_entries, return_against=None):
+	outstanding = {}
+	for gle in gl_entries:
+		if not (gle.party_type and gle.party):
+			continue
+
+		if frappe.get_cached_value("Account", gle.account, "account_type") not in PARTY_ACCOUNT_TYPES:
+			continue
+
+		key = get_voucher_key(gle, return_against)
+		if key not in outstanding:
+			outstanding[key] = frappe._dict(
+				account_currency=gle.account_currency, outstanding=0.0, outstanding_in_account_currency=0.0
+			)
+
+		outstanding[key].outstanding += flt(gle.debit) - flt(gle.credit)
+		outstanding[key].outstanding_in_account_currency += flt(gle.debit_in_account_currency) - flt(
+			gle.credit_in_account_currency
+		)
+
+	return outstanding
+
+
+def get_voucher_key(gle, return_against=None):
+	voucher_type, voucher_no = gle.voucher_type, gle.voucher_no
+	if gle.against_voucher:
+		voucher_type, voucher_no = gle.against_voucher_type, gle.against_voucher
+
+		# payment against a credit / debit note is considered against the original invoice,
+		# same as in Accounts Receivable / Payable report
+		if voucher_type in ("Sales Invoice", "Purchase Invoice"):
+			if return_against is None:
+				original_invoice = get_return_against(voucher_type, voucher_no)
+			else:
+				original_invoice = return_against.get((voucher_type, voucher_no))
+
+			voucher_no = original_invoice or voucher_no
+
+	return (gle.company, gle.account, gle.party_type, gle.party, voucher_type, voucher_no)
+
+
+def get_return_against(voucher_type, voucher_no):
+	is_return, return_against = frappe.db.get_value(
+		voucher_type, voucher_no, ["is_return", "return_against"]
+	) or (0, None)
+
+	return return_against if is_return else None
+
+
+def rebuild_party_voucher_outstanding(company=None):
+	"""Rebuild outstanding of all vouchers from GL entries."""
+	conditions = "and gle.company = %(company)s" if company else ""
+
+	frappe.db.sql(
+		"delete from `tabParty Voucher Outstanding` {0}".format(
+			"where company = %(company)s" if company else ""
+		),
+		{"company": company},
+	)
+
+	return_against = {}
+	for doctype in ("Sales Invoice", "Purchase Invoice"):
+		for name, original_invoice in frappe.get_all(
+			doctype, filters={"is_return": 1}, fields=["name", "return_against"], as_list=1
+		):
+			return_against[(doctype, name)] = original_invoice
+
+	gl_entries = frappe.db.sql(
+		"""
+		select
+			gle.company, gle.account, gle.party_type, gle.party, gle.voucher_type, gle.voucher_no,
+			gle.against_voucher_type, gle.against_voucher, gle.account_currency,
+			sum(gle.debit) as debit, sum(gle.credit) as credit,
+			sum(gle.debit_in_account_currency) as debit_in_account_currency,
+			sum(gle.credit_in_account_currency) as credit_in_account_currency
+		from `tabGL Entry` gle, `tabAccount` acc
+		where gle.account = acc.name
+			and acc.account_type in ('Receivable', 'Payable')
+			and gle.is_cancelled = 0
+			and ifnull(gle.party, '') != ''
+			{0}
+		group by gle.company, gle.account, gle.party_type, gle.party, gle.voucher_type,
+			gle.voucher_no, gle.against_voucher_type, gle.against_voucher, gle.account_currency
+	""".format(
+			conditions
+		),
+		{"company": company},
+		as_dict=1,
+	)
+
+	timestamp = now()
+	fields = ["name", "creation", "modified", "owner", "modified_by", "account_currency"]
+	fields.extend(VOUCHER_KEY_FIELDS)
+	fields.extend(["outstanding", "outstanding_in_account_currency"])
+
+	values = []
+	for key, balance in get_outstanding_by_voucher(gl_entries, return_against).items():
+		values.append(
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				frappe.session.user,
+				frappe.session.user,
+				balance.account_currency,
+				*key,
+				balance.outstanding,
+				balance.outstanding_in_account_currency,
+			)
+		)
+
+	frappe.db.bulk_insert("Party Voucher Outstanding", fields=fields, values=values)
@@ -0,0 +1,57 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext.accounts.doctype.party_voucher_outstanding.party_voucher_outstanding import (
+	rebuild_party_voucher_outstanding,
+)
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+
+
+class TestPartyVoucherOutstanding(FrappeTestCase):
+	def get_outstanding(self, voucher_no):
+		return frappe.db.get_value(
+			"Party Voucher Outstanding",
+			{"voucher_type": "Sales Invoice", "voucher_no": voucher_no, "party": "_Test Customer"},
+			"outstanding",
+		)
+
+	def get_outstanding_of_vouchers(self, voucher_nos):
+		return sorted(
+			frappe.get_all(
+				"Party Voucher Outstanding",
+				filters={"company": "_Test Company", "voucher_no": ("in", voucher_nos)},
+				fields=["account", "party", "voucher_type", "voucher_no", "outstanding"],
+				as_list=1,
+			)
+		)
+
+	def test_outstanding_on_payment_and_cancel(self):
+		si = create_sales_invoice(rate=500)
+		self.assertEqual(self.get_outstanding(si.name), 500)
+
+		pe = get_payment_entry("Sales Invoice", si.name, bank_account="_Test Bank - _TC")
+		pe.paid_amount = pe.received_amount = 200
+		pe.references[0].allocated_amount = 200
+		pe.insert()
+		pe.submit()
+		self.assertEqual(self.get_outstanding(si.name), 300)
+
+		# payment against credit note is considered against the original invoice
+		return_si = create_sales_invoice(qty=-1, rate=500, is_return=1, return_against=si.name)
+		self.assertEqual(self.get_outstanding(si.name), -200)
+		self.assertFalse(self.get_outstanding(return_si.name))
+
+		pe.cancel()
+		self.assertEqual(self.get_outstanding(si.name), 0)
+
+		voucher_nos = [si.name, return_si.name, pe.name]
+		expected = self.get_outstanding_of_vouchers(voucher_nos)
+		rebuild_party_voucher_outstanding("_Test Company")
+		self.assertEqual(
+			[row for row in expected if row[-1]],
+			[row for row in self.get_outstanding_of_vouchers(voucher_nos) if row[-1]],
+		)
@@ -1,6 +1,8 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors and contributors
 # For license information, please see license.txt
 import collections
+import pickle
+import time
 
 import frappe
 from frappe import _
@@ -18,12 +20,19 @@ from erpnext.accounts.doctype.sales_invoice.sales_invoice import (
 )
 from erpnext.accounts.party import get_due_date, get_party_account
 from erpnext.stock.doctype.batch.batch import get_batch_qty, get_pos_reserved_batch_qty
+from erpnext.stock.doctype.bin.bin import (
+	clear_stock_availability_cache,
+	get_stock_availability_cache_key,
+)
 from erpnext.stock.doctype.serial_no.serial_no import (
 	get_delivered_serial_nos,
 	get_pos_reserved_serial_nos,
 	get_serial_nos,
 )
 
+# seconds for which stock availability of items is cached for POS item browsing
+STOCK_AVAILABILITY_CACHE_TTL = 60
+
 
 class POSInvoice(SalesInvoice):
 	def __init__(self, *args, **kwargs):
@@ -73,6 +82,7 @@ class POSInvoice(SalesInvoice):
 			self.apply_loyalty_points()
 		self.check_phone_payments()
 		self.set_status(update=True)
+		self.clear_stock_availability_cache()
 
 		if self.coupon_code:
 			from erpnext.accounts.doctype.pricing_rule.utils import update_coupon_code_count
@@ -113,6 +123,13 @@ class POSInvoice(SalesInvoice):
 
 			update_coupon_code_count(self.coupon_code, "cancelled")
 
+		self.clear_stock_availability_cache()
+
+	def clear_stock_availability_cache(self):
+		# reserved qty of the items in POS has changed
+		for warehouse in {d.warehouse for d in self.items if d.warehouse}:
+			clear_stock_availability_cache(warehouse)
+
 	def check_phone_payments(self):
 		for pay in self.payments:
 			if pay.type == "Phone" and pay.amount >= 0:
@@ -675,7 +692,7 @@ def get_bundle_availability(bundle_item_code, warehouse):
 		item_pos_reserved_qty = get_pos_reserved_qty(item.item_code, warehouse)
 		available_qty = item_bin_qty - item_pos_reserved_qty
 
-		max_available_bundles = available_qty / item.stock_qty
+		max_available_bundles = available_qty / item.qty
 		if bundle_bin_qty > max_available_bundles and frappe.get_value(
 			"Item", item.item_code, "is_stock_item"
 		):
@@ -718,6 +735,187 @@ def get_pos_reserved_qty(item_code, warehouse):
 	return flt(reserved_qty[0].stock_qty) if reserved_qty else 0
 
 
+def get_items_stock_availability(item_codes, warehouse):
+	"""Returns {item_code: (available qty, is_stock_item)} for items shown in POS.
+
+	Availability of each item is cached for `STOCK_AVAILABILITY_CACHE_TTL` seconds along with
+	`modified` of the bins it was computed from, and is computed again once any of them is
+	updated or a POS invoice of the warehouse is submitted or cancelled."""
+	if not item_codes:
+		return {}
+
+	cache = frappe.cache()
+	cache_key = get_stock_availability_cache_key(warehouse)
+	timestamp = time.time()
+
+	cached_availability = {}
+	for item_code, cached in zip(item_codes, cache.hmget(cache.make_key(cache_key), item_codes)):
+		cached = pickle.loads(cached) if cached else None
+		if cached and timestamp - cached["timestamp"] < STOCK_AVAILABILITY_CACHE_TTL:
+			cached_availability[item_code] = cached
+
+	bin_versions = get_bin_versions(
+		{d for cached in cached_availability.values() for d in cached["bin_versions"]}, warehouse
+	)
+
+	availability, pending_items = {}, []
+	for item_code in item_codes:
+		cached = cached_availability.get(item_code)
+		if cached and all(
+			bin_versions.get(d) == version for d, version in cached["bin_versions"].items()
+		):
+			availability[item_code] = cached["availability"]
+		else:
+			pending_items.append(item_code)
+
+	if pending_items:
+		bundle_items = get_bundle_items(pending_items)
+		bin_items = {
+			item_code: {item_code} | {d.item_code for d in bundle_items.get(item_code, [])}
+			for item_code in pending_items
+		}
+		# read before the availability, so that a bin updated meanwhile invalidates it
+		bin_versions = get_bin_versions(set().union(*bin_items.values()), warehouse)
+
+		for item_code, item_availability in get_stock_availability_of_items(
+			pending_items, warehouse, bundle_items
+		).items():
+			availability[item_code] = item_availability
+			cache.hset(
+				cache_key,
+				item_code,
+				{
+					"availability": item_availability,
+					"bin_versions": {d: bin_versions.get(d) for d in bin_items[item_code]},
+					"timestamp": timestamp,
+				},
+			)
+
+		cache.expire(cache.make_key(cache_key), STOCK_AVAILABILITY_CACHE_TTL)
+
+	return availability
+
+
+def get_bin_versions(item_codes, warehouse):
+	if not item_codes:
+		return {}
+
+	return dict(
+		frappe.get_all(
+			"Bin",
+			filters={"item_code": ("in", list(item_codes)), "warehouse": warehouse},
+			fields=["item_code", "modified"],
+			as_list=1,
+		)
+	)
+
+
+def get_bundle_items(item_codes):
+	# bundles without items are available too
+	bundle_items = {
+		name: []
+		for name in frappe.get_all("Product Bundle", filters={"name": ("in", item_codes)}, pluck="name")
+	}
+	if not bundle_items:
+		return bundle_items
+
+	for d in frappe.get_all(
+		"Product Bundle Item",
+		filters={"parent": ("in", list(bundle_items)), "parenttype": "Product Bundle"},
+		fields=["parent", "item_code", "qty"],
+		order_by="idx",
+	):
+		bundle_items.setdefault(d.parent, []).append(d)
+
+	return bundle_items
+
+
+def get_stock_availability_of_items(item_codes, warehouse, bundle_items=None):
+	"""Same as `get_stock_availability` for many items, with a fixed number of queries."""
+	is_stock_item = dict(
+		frappe.get_all(
+			"Item", filters={"name": ("in", item_codes)}, fields=["name", "is_stock_item"], as_list=1
+		)
+	)
+
+	if bundle_items is None:
+		non_stock_items = [item_code for item_code in item_codes if not is_stock_item.get(item_code)]
+		bundle_items = get_bundle_items(non_stock_items) if non_stock_items else {}
+
+	component_items = list(
+		{d.item_code for items in bundle_items.values() for d in items} - set(is_stock_item)
+	)
+	if component_items:
+		is_stock_item.update(
+			frappe.get_all(
+				"Item",
+				filters={"name": ("in", component_items)},
+				fields=["name", "is_stock_item"],
+				as_list=1,
+			)
+		)
+
+	all_items = list(
+		set(item_codes) | {d.item_code for items in bundle_items.values() for d in items}
+	)
+	bin_qty = get_bin_qty_of_items(all_items, warehouse)
+	pos_reserved_qty = get_pos_reserved_qty_of_items(all_items, warehouse)
+
+	def get_available_qty(item_code):
+		return bin_qty.get(item_code, 0) - pos_reserved_qty.get(item_code, 0)
+
+	availability = {}
+	for item_code in item_codes:
+		if is_stock_item.get(item_code):
+			availability[item_code] = (get_available_qty(item_code), True)
+		elif item_code in bundle_items:
+			bundle_bin_qty = 1000000
+			for item in bundle_items[item_code]:
+				max_available_bundles = get_available_qty(item.item_code) / item.qty
+				if bundle_bin_qty > max_available_bundles and is_stock_item.get(item.item_code):
+					bundle_bin_qty = max_available_bundles
+
+			availability[item_code] = (bundle_bin_qty - pos_reserved_qty.get(item_code, 0), True)
+		else:
+			# Is a service item or non_stock item
+			availability[item_code] = (0, False)
+
+	return availability
+
+
+def get_bin_qty_of_items(item_codes, warehouse):
+	return {
+		d.item_code: d.actual_qty or 0
+		for d in frappe.get_all(
+			"Bin",
+			filters={"item_code": ("in", item_codes), "warehouse": warehouse},
+			fields=["item_code", "actual_qty"],
+		)
+	}
+
+
+def get_pos_reserved_qty_of_items(item_codes, warehouse):
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+
+	reserved_qty = (
+		frappe.qb.from_(p_inv)
+		.from_(p_item)
+		.select(p_item.item_code, Sum(p_item.stock_qty).as_("stock_qty"))
+		.where(
+			(p_inv.name == p_item.parent)
+			& (IfNull(p_inv.consolidated_invoice, "") == "")
+			& (p_inv.is_return == 0)
+			& (p_item.docstatus == 1)
+			& (p_item.item_code.isin(item_codes))
+			& (p_item.warehouse == warehouse)
+		)
+		.groupby(p_item.item_code)
+	).run(as_dict=True)
+
+	return {d.item_code: flt(d.stock_qty) for d in reserved_qty}
+
+
 @frappe.whitelist()
 def make_sales_return(source_name, target_doc=None):
 	from erpnext.controllers.sales_and_purchase_return import make_return_doc
@@ -6,9 +6,15 @@ import unittest
 
 import frappe
 
-from erpnext.accounts.doctype.pos_invoice.pos_invoice import make_sales_return
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import (
+	get_items_stock_availability,
+	get_stock_availability,
+	make_sales_return,
+)
 from erpnext.accounts.doctype.pos_profile.test_pos_profile import make_pos_profile
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.selling.doctype.product_bundle.test_product_bundle import make_product_bundle
+from erpnext.stock.doctype.bin.bin import get_stock_availability_cache_key
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
@@ -827,6 +833,38 @@ class TestPOSInvoice(unittest.TestCase):
 			pos_inv.delete()
 			pr.delete()
 
+	def test_items_stock_availability(self):
+		warehouse = "_Test Warehouse - _TC"
+		stock_item = make_item("_Test POS Availability Item", {"is_stock_item": 1}).name
+		service_item = make_item("_Test POS Availability Service", {"is_stock_item": 0}).name
+		bundle_item = make_item("_Test POS Availability Bundle", {"is_stock_item": 0}).name
+		make_product_bundle(bundle_item, [stock_item, service_item], qty=2)
+
+		make_stock_entry(item_code=stock_item, target=warehouse, qty=10, basic_rate=100)
+
+		item_codes = [stock_item, service_item, bundle_item]
+		expected = {item_code: get_stock_availability(item_code, warehouse) for item_code in item_codes}
+		self.assertEqual(get_items_stock_availability(item_codes, warehouse), expected)
+		self.assertEqual(expected[bundle_item], (expected[stock_item][0] / 2, True))
+		self.assertEqual(expected[service_item], (0, False))
+
+		# cached availability is not used once the bin is updated
+		make_stock_entry(item_code=stock_item, target=warehouse, qty=4, basic_rate=100)
+		self.assertEqual(
+			get_items_stock_availability([stock_item], warehouse)[stock_item],
+			get_stock_availability(stock_item, warehouse),
+		)
+
+		# even if cached by a request that read the stock before the update was committed
+		cache_key = get_stock_availability_cache_key(warehouse)
+		stale = frappe.cache().hget(cache_key, bundle_item)
+		make_stock_entry(item_code=stock_item, target=warehouse, qty=6, basic_rate=100)
+		frappe.cache().hset(cache_key, bundle_item, stale)
+		self.assertEqual(
+			get_items_stock_availability([bundle_item], warehouse)[bundle_item],
+			get_stock_availability(bundle_item, warehouse),
+		)
+
 	def test_delivered_serial_no_case(self):
 		from erpnext.accounts.doctype.pos_invoice_merge_log.test_pos_invoice_merge_log import (
 			init_user_and_profile,
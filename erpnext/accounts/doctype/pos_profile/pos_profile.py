@@ -8,6 +8,8 @@ from frappe.model.document import Document
 from frappe.utils import get_link_to_form, now
 from six import iteritems
 
+from erpnext.utilities.tree_index import get_tree_index
+
 
 class POSProfile(Document):
 	def validate(self):
@@ -143,14 +145,11 @@ def get_item_groups(pos_profile):
 
 
 def get_child_nodes(group_type, root):
-	lft, rgt = frappe.db.get_value(group_type, root, ["lft", "rgt"])
-	return frappe.db.sql(
-		""" Select name, lft, rgt from `tab{tab}` where
-			lft >= {lft} and rgt <= {rgt} order by lft""".format(
-			tab=group_type, lft=lft, rgt=rgt
-		),
-		as_dict=1,
-	)
+	tree_index = get_tree_index(group_type)
+	return [
+		frappe._dict(name=name, lft=tree_index.bounds[name][0], rgt=tree_index.bounds[name][1])
+		for name in tree_index.descendants(root, include_self=True)
+	]
 
 
 @frappe.whitelist()
@@ -3,7 +3,6 @@
 # For license information, please see license.txt
 
 
-import copy
 import json
 import re
 
@@ -183,6 +182,16 @@ class PricingRule(Document):
 		):
 			frappe.throw(_("Invalid condition expression"))
 
+	def on_update(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import clear_pricing_rule_index
+
+		clear_pricing_rule_index()
+
+	def on_trash(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import clear_pricing_rule_index
+
+		clear_pricing_rule_index()
+
 
 # --------------------------------------------------------------------------------
 
@@ -226,38 +235,65 @@ def apply_pricing_rule(args, doc=None):
 	item_list = args.get("items")
 	args.pop("items")
 
+	if isinstance(doc, string_types):
+		doc = json.loads(doc)
+
+	if doc:
+		# build document once, not for every row
+		doc = frappe.get_doc(doc)
+
 	set_serial_nos_based_on_fifo = frappe.db.get_single_value(
 		"Stock Settings", "automatically_set_serial_nos_based_on_fifo"
 	)
 
 	item_code_list = tuple(item.get("item_code") for item in item_list)
-	query_items = frappe.get_all(
-		"Item",
-		fields=["item_code", "has_serial_no"],
-		filters=[["item_code", "in", item_code_list]],
-		as_list=1,
-	)
-	serialized_items = dict()
-	for item_code, val in query_items:
-		serialized_items.setdefault(item_code, val)
-
-	for item in item_list:
-		args_copy = copy.deepcopy(args)
-		args_copy.update(item)
-		data = get_pricing_rule_for_item(args_copy, item.get("price_list_rate"), doc=doc)
-		out.append(data)
+	item_details = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item",
+			fields=["name", "has_serial_no", "item_group", "brand", "variant_of"],
+			filters=[["item_code", "in", item_code_list]],
+		)
+	}
 
-		if (
-			serialized_items.get(item.get("item_code"))
-			and not item.get("serial_no")
-			and set_serial_nos_based_on_fifo
-			and not args.get("is_return")
-		):
-			out[0].update(get_serial_no_for_item(args_copy))
+	update_party_details_for_pricing_rule(args)
+
+	# candidate rules, cumulative data and rule items are shared by all rows of the document
+	frappe.flags.pricing_rule_batch_cache = {}
+	try:
+		for item in item_list:
+			args_copy = frappe._dict(args)
+			args_copy.update(item)
+			set_item_details_for_pricing_rule(args_copy, item_details.get(item.get("item_code")))
+
+			data = get_pricing_rule_for_item(args_copy, item.get("price_list_rate"), doc=doc)
+			out.append(data)
+
+			if (
+				item_details.get(item.get("item_code"), {}).get("has_serial_no")
+				and not item.get("serial_no")
+				and set_serial_nos_based_on_fifo
+				and not args.get("is_return")
+			):
+				out[0].update(get_serial_no_for_item(args_copy))
+	finally:
+		frappe.flags.pricing_rule_batch_cache = None
 
 	return out
 
 
+def set_item_details_for_pricing_rule(args, item_details):
+	"Set item group, brand and variant of the row from prefetched item details."
+	if not item_details:
+		return
+
+	if not (args.item_group and args.brand):
+		args.item_group, args.brand = item_details.item_group, item_details.brand
+
+	if "variant_of" not in args:
+		args.variant_of = item_details.variant_of
+
+
 def get_serial_no_for_item(args):
 	from erpnext.stock.get_item_details import get_serial_no
 
@@ -403,6 +439,10 @@ def update_args_for_pricing_rule(args):
 		if not args.item_group:
 			frappe.throw(_("Item Group not mentioned in item master for item {0}").format(args.item_code))
 
+	update_party_details_for_pricing_rule(args)
+
+
+def update_party_details_for_pricing_rule(args):
 	if args.transaction_type == "selling":
 		if args.customer and not (args.customer_group and args.territory):
 
@@ -510,6 +510,59 @@ class TestPricingRule(unittest.TestCase):
 		item = si.items[0]
 		self.assertEqual(item.rate, 900)
 
+	def test_pricing_rule_index_after_rule_changes(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import get_pricing_rule_index
+
+		rule = make_pricing_rule(selling=1, discount_percentage=10)
+		self.assertIn(rule.name, get_pricing_rule_index()["items"]["item_code"]["_Test Item"])
+
+		si = create_sales_invoice(do_not_submit=True)
+		si.items[0].price_list_rate = 1000
+		si.save()
+		self.assertEqual(si.items[0].rate, 900)
+
+		# rules changed without saving the document are picked up by the next request
+		frappe.db.set_value("Pricing Rule", rule.name, "disable", 1)
+		frappe.flags.pricing_rule_index = None
+		self.assertNotIn(rule.name, get_pricing_rule_index()["rules"])
+
+		si = create_sales_invoice(do_not_submit=True)
+		si.items[0].price_list_rate = 1000
+		si.save()
+		self.assertEqual(si.items[0].rate, 100)
+
+	def test_apply_pricing_rule_on_all_rows_of_document(self):
+		from erpnext.accounts.doctype.pricing_rule.pricing_rule import apply_pricing_rule
+
+		make_pricing_rule(selling=1, discount_percentage=10, min_qty=5)
+		so = make_sales_order(item_code="_Test Item", qty=2, do_not_save=True)
+		so.append("items", so.items[0].as_dict().update({"name": "row-2", "idx": 2, "qty": 6}))
+
+		args = {
+			"items": [
+				{
+					"doctype": d.doctype,
+					"name": d.name,
+					"item_code": d.item_code,
+					"qty": d.qty,
+					"stock_qty": d.qty,
+				}
+				for d in so.items
+			],
+			"customer": so.customer,
+			"currency": so.currency,
+			"price_list": so.selling_price_list,
+			"company": so.company,
+			"transaction_date": so.transaction_date,
+			"doctype": so.doctype,
+		}
+
+		result = apply_pricing_rule(args, so.as_json())
+		self.assertEqual(len(result), 2)
+		self.assertFalse(result[0].get("discount_percentage"))
+		self.assertEqual(result[1].get("discount_percentage"), 10)
+		self.assertIsNone(frappe.flags.pricing_rule_batch_cache)
+
 	def test_multiple_pricing_rules(self):
 		make_pricing_rule(
 			discount_percentage=20,
@@ -14,6 +14,7 @@ from frappe.utils import cint, flt, fmt_money, get_link_to_form, getdate, today
 from erpnext.setup.doctype.item_group.item_group import get_child_item_groups
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 from erpnext.stock.get_item_details import get_conversion_factor
+from erpnext.utilities.tree_index import get_tree_index
 
 
 class MultiplePricingRuleConflict(frappe.ValidationError):
@@ -22,16 +23,17 @@ class MultiplePricingRuleConflict(frappe.ValidationError):
 
 apply_on_table = {"Item Code": "items", "Item Group": "item_groups", "Brand": "brands"}
 
+PRICING_RULE_INDEX_CACHE_KEY = "pricing_rule_index"
+
 
 def get_pricing_rules(args, doc=None):
 	pricing_rules = []
-	values = {}
 
-	if not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
+	if not get_pricing_rule_index()["transaction_types"].get(args.transaction_type):
 		return
 
 	for apply_on in ["Item Code", "Item Group", "Brand"]:
-		pricing_rules.extend(_get_pricing_rules(apply_on, args, values))
+		pricing_rules.extend(_get_pricing_rules(apply_on, args))
 		if pricing_rules and not apply_multiple_pricing_rules(pricing_rules):
 			break
 
@@ -80,13 +82,24 @@ def sorted_by_priority(pricing_rules, args, doc=None):
 def filter_pricing_rule_based_on_condition(pricing_rules, doc=None):
 	filtered_pricing_rules = []
 	if doc:
+		doc_dict = None
+		condition_results = {}
 		for pricing_rule in pricing_rules:
 			if pricing_rule.condition:
-				try:
-					if frappe.safe_eval(pricing_rule.condition, None, doc.as_dict()):
-						filtered_pricing_rules.append(pricing_rule)
-				except Exception:
-					pass
+				# condition is evaluated on the document, same result for all rules having it
+				if pricing_rule.condition not in condition_results:
+					if doc_dict is None:
+						doc_dict = doc.as_dict()
+
+					try:
+						condition_results[pricing_rule.condition] = frappe.safe_eval(
+							pricing_rule.condition, None, doc_dict
+						)
+					except Exception:
+						condition_results[pricing_rule.condition] = False
+
+				if condition_results[pricing_rule.condition]:
+					filtered_pricing_rules.append(pricing_rule)
 			else:
 				filtered_pricing_rules.append(pricing_rule)
 	else:
@@ -95,81 +108,145 @@ def filter_pricing_rule_based_on_condition(pricing_rules, doc=None):
 	return filtered_pricing_rules
 
 
-def _get_pricing_rules(apply_on, args, values):
+def get_pricing_rule_index():
+	"""Returns enabled pricing rules indexed by the item code, item group and brand they apply on.
+
+	Index is cached per site and rebuilt when any pricing rule is added, changed or deleted.
+	Changes are checked once per request."""
+	return get_from_pricing_rule_batch_cache("index", _get_pricing_rule_index)
+
+
+def _get_pricing_rule_index():
+	if frappe.flags.pricing_rule_index:
+		return frappe.flags.pricing_rule_index
+
+	version = get_pricing_rule_index_version()
+	index = frappe.cache().get_value(PRICING_RULE_INDEX_CACHE_KEY)
+
+	if not index or index["version"] != version:
+		index = build_pricing_rule_index(version)
+		frappe.cache().set_value(PRICING_RULE_INDEX_CACHE_KEY, index)
+
+	frappe.flags.pricing_rule_index = index
+	return index
+
+
+def get_pricing_rule_index_version():
+	# changes on insert, delete and save of any pricing rule
+	return tuple(frappe.db.sql("select count(*), max(modified) from `tabPricing Rule`")[0])
+
+
+def get_from_pricing_rule_batch_cache(key, generator):
+	"""Returns value shared by all rows of a document while pricing rules are applied on it
+	in `apply_pricing_rule`. Outside of it, value is generated on every call."""
+	batch_cache = frappe.flags.pricing_rule_batch_cache
+	if batch_cache is None:
+		return generator()
+
+	if key not in batch_cache:
+		batch_cache[key] = generator()
+
+	return batch_cache[key]
+
+
+def clear_pricing_rule_index():
+	frappe.flags.pricing_rule_index = None
+	frappe.cache().delete_value(PRICING_RULE_INDEX_CACHE_KEY)
+
+
+def build_pricing_rule_index(version):
+	index = {
+		"version": version,
+		"transaction_types": {},
+		"rules": {},
+		"rule_items": {},
+		"items": {},
+	}
+
+	for rule in frappe.db.sql("select * from `tabPricing Rule` where disable = 0", as_dict=1):
+		index["rules"][rule.name] = rule
+		for transaction_type in ["selling", "buying"]:
+			if rule.get(transaction_type):
+				index["transaction_types"][transaction_type] = True
+
+	for apply_on in apply_on_table:
+		apply_on_field = frappe.scrub(apply_on)
+		rule_items = index["rule_items"][apply_on_field] = {}
+		items = index["items"][apply_on_field] = {}
+
+		for d in frappe.db.sql(
+			"""select parent, {0}, uom from `tabPricing Rule {1}`
+			order by parent, idx""".format(
+				apply_on_field, apply_on
+			),
+			as_dict=1,
+		):
+			if d.parent not in index["rules"]:
+				continue
+
+			rule_items.setdefault(d.parent, []).append((d.get(apply_on_field), d.uom))
+			items.setdefault(d.get(apply_on_field), set()).add(d.parent)
+
+		# rules applied on other item/group/brand are also picked for it
+		for rule in index["rules"].values():
+			if rule.apply_rule_on_other is not None and rule.get("other_" + apply_on_field):
+				items.setdefault(rule.get("other_" + apply_on_field), set()).add(rule.name)
+
+	return index
+
+
+def _get_pricing_rules(apply_on, args):
 	apply_on_field = frappe.scrub(apply_on)
+	value = args.get(apply_on_field)
 
-	if not args.get(apply_on_field):
+	if not value:
 		return []
 
-	child_doc = "`tabPricing Rule {0}`".format(apply_on)
-
-	conditions = item_variant_condition = item_conditions = ""
-	values[apply_on_field] = args.get(apply_on_field)
-	if apply_on_field in ["item_code", "brand"]:
-		item_conditions = "{child_doc}.{apply_on_field}= %({apply_on_field})s".format(
-			child_doc=child_doc, apply_on_field=apply_on_field
-		)
+	index = get_pricing_rule_index()
+	item_values = [value]
 
-		if apply_on_field == "item_code":
-			if args.get("uom", None):
-				item_conditions += (
-					" and ({child_doc}.uom='{item_uom}' or IFNULL({child_doc}.uom, '')='')".format(
-						child_doc=child_doc, item_uom=args.get("uom")
-					)
-				)
-			if "variant_of" not in args:
-				args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+	if apply_on_field == "item_code":
+		if "variant_of" not in args:
+			args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
 
-			if args.variant_of:
-				item_variant_condition = " or {child_doc}.item_code=%(variant_of)s ".format(
-					child_doc=child_doc
-				)
-				values["variant_of"] = args.variant_of
+		if args.variant_of:
+			item_values.append(args.variant_of)
 	elif apply_on_field == "item_group":
-		item_conditions = _get_tree_conditions(args, "Item Group", child_doc, False)
-		if args.get("uom", None):
-			item_conditions += (
-				" and ({child_doc}.uom='{item_uom}' or IFNULL({child_doc}.uom, '')='')".format(
-					child_doc=child_doc, item_uom=args.get("uom")
-				)
-			)
-	conditions += get_other_conditions(conditions, values, args)
-	warehouse_conditions = _get_tree_conditions(args, "Warehouse", "`tabPricing Rule`")
-	if warehouse_conditions:
-		warehouse_conditions = " and {0}".format(warehouse_conditions)
+		item_values = _get_tree_parents(args, "Item Group")
 
 	if not args.price_list:
 		args.price_list = None
 
-	conditions += " and ifnull(`tabPricing Rule`.for_price_list, '') in (%(price_list)s, '')"
-	values["price_list"] = args.get("price_list")
-
-	pricing_rules = (
-		frappe.db.sql(
-			"""select `tabPricing Rule`.*,
-			{child_doc}.{apply_on_field}, {child_doc}.uom
-		from `tabPricing Rule`, {child_doc}
-		where ({item_conditions} or (`tabPricing Rule`.apply_rule_on_other is not null
-			and `tabPricing Rule`.{apply_on_other_field}=%({apply_on_field})s) {item_variant_condition})
-			and {child_doc}.parent = `tabPricing Rule`.name
-			and `tabPricing Rule`.disable = 0 and
-			`tabPricing Rule`.{transaction_type} = 1 {warehouse_cond} {conditions}
-		order by `tabPricing Rule`.priority desc,
-			`tabPricing Rule`.name desc""".format(
-				child_doc=child_doc,
-				apply_on_field=apply_on_field,
-				item_conditions=item_conditions,
-				item_variant_condition=item_variant_condition,
-				transaction_type=args.transaction_type,
-				warehouse_cond=warehouse_conditions,
-				apply_on_other_field="other_{0}".format(apply_on_field),
-				conditions=conditions,
-			),
-			values,
-			as_dict=1,
+	def item_matches(rule, item_value, uom):
+		if apply_on_field == "item_group":
+			matches = item_value in item_values
+		else:
+			matches = item_value == value
+
+		if matches and args.get("uom") and apply_on_field != "brand":
+			matches = (uom or "") in (args.get("uom"), "")
+
+		return (
+			matches
+			or (apply_on_field == "item_code" and bool(args.variant_of) and item_value == args.variant_of)
+			or (rule.apply_rule_on_other is not None and rule.get("other_" + apply_on_field) == value)
 		)
-		or []
-	)
+
+	rule_names = set()
+	for item_value in item_values:
+		rule_names.update(index["items"][apply_on_field].get(item_value, ()))
+
+	rules = [index["rules"][name] for name in rule_names]
+	rules = [rule for rule in rules if _rule_matches_args(rule, args)]
+	rules.sort(key=lambda rule: (rule.priority or "", rule.name), reverse=True)
+
+	pricing_rules = []
+	for rule in rules:
+		for item_value, uom in index["rule_items"][apply_on_field].get(rule.name, []):
+			if item_matches(rule, item_value, uom):
+				pricing_rule = frappe._dict(rule)
+				pricing_rule.update({apply_on_field: item_value, "uom": uom})
+				pricing_rules.append(pricing_rule)
 
 	return pricing_rules
 
@@ -185,50 +262,46 @@ def apply_multiple_pricing_rules(pricing_rules):
 	return True
 
 
-def _get_tree_conditions(args, parenttype, table, allow_blank=True):
+def _get_tree_parents(args, parenttype):
+	"""Returns `parenttype` record in args with all its parents, cached for the request.
+
+	Root of Customer Group, Item Group and Territory tree is always included."""
 	field = frappe.scrub(parenttype)
-	condition = ""
-	if args.get(field):
-		if not frappe.flags.tree_conditions:
-			frappe.flags.tree_conditions = {}
-		key = (parenttype, args.get(field))
-		if key in frappe.flags.tree_conditions:
-			return frappe.flags.tree_conditions[key]
-
-		try:
-			lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
-		except TypeError:
-			frappe.throw(_("Invalid {0}").format(args.get(field)))
-
-		parent_groups = frappe.db.sql_list(
-			"""select name from `tab%s`
-			where lft<=%s and rgt>=%s"""
-			% (parenttype, "%s", "%s"),
-			(lft, rgt),
-		)
+	if not args.get(field):
+		return []
 
-		if parenttype in ["Customer Group", "Item Group", "Territory"]:
-			parent_field = "parent_{0}".format(frappe.scrub(parenttype))
-			root_name = frappe.db.get_list(
-				parenttype,
-				{"is_group": 1, parent_field: ("is", "not set")},
-				"name",
-				as_list=1,
-				ignore_permissions=True,
-			)
+	if not frappe.flags.tree_parents:
+		frappe.flags.tree_parents = {}
 
-			if root_name and root_name[0][0]:
-				parent_groups.append(root_name[0][0])
+	key = (parenttype, args.get(field))
+	if key in frappe.flags.tree_parents:
+		return frappe.flags.tree_parents[key]
+
+	tree_index = get_tree_index(parenttype)
+	if not tree_index.exists(args.get(field)):
+		frappe.throw(_("Invalid {0}").format(args.get(field)))
+
+	parent_groups = tree_index.ancestors(args.get(field), include_self=True)
+
+	if parenttype in ["Customer Group", "Item Group", "Territory"] and tree_index.roots:
+		parent_groups.append(tree_index.roots[0])
+
+	frappe.flags.tree_parents[key] = parent_groups
+	return parent_groups
 
-		if parent_groups:
-			if allow_blank:
-				parent_groups.append("")
-			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
-				table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
-			)
 
-			frappe.flags.tree_conditions[key] = condition
-	return condition
+def _get_tree_conditions(args, parenttype, table, allow_blank=True):
+	field = frappe.scrub(parenttype)
+	parent_groups = _get_tree_parents(args, parenttype)
+	if not parent_groups:
+		return ""
+
+	if allow_blank:
+		parent_groups = parent_groups + [""]
+
+	return "ifnull({table}.{field}, '') in ({parent_groups})".format(
+		table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
+	)
 
 
 def get_other_conditions(conditions, values, args):
@@ -252,6 +325,32 @@ def get_other_conditions(conditions, values, args):
 	return conditions
 
 
+def _rule_matches_args(rule, args):
+	"Check if pricing rule is applicable for the party, warehouse, date etc. of the transaction."
+	if not rule.get(args.transaction_type):
+		return False
+
+	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
+		if (rule.get(field) or "") not in (args.get(field) or "", ""):
+			return False
+
+	for parenttype in ["Warehouse", "Customer Group", "Territory", "Supplier Group"]:
+		parent_groups = _get_tree_parents(args, parenttype)
+		if parent_groups and (rule.get(frappe.scrub(parenttype)) or "") not in parent_groups + [""]:
+			return False
+
+	if args.get("transaction_date"):
+		transaction_date = getdate(args.get("transaction_date"))
+		if not (
+			getdate(rule.valid_from or "2000-01-01")
+			<= transaction_date
+			<= getdate(rule.valid_upto or "2500-12-31")
+		):
+			return False
+
+	return (rule.for_price_list or "") in (args.price_list or "", "")
+
+
 def filter_pricing_rules(args, pricing_rules, doc=None):
 	if not isinstance(pricing_rules, list):
 		pricing_rules = [pricing_rules]
@@ -482,8 +581,16 @@ def get_qty_and_rate_for_other_item(doc, pr_doc, pricing_rules):
 def get_qty_amount_data_for_cumulative(pr_doc, doc, items=None):
 	if items is None:
 		items = []
-	sum_qty, sum_amt = [0, 0]
+
 	doctype = doc.get("parenttype") or doc.doctype
+	return get_from_pricing_rule_batch_cache(
+		("cumulative", pr_doc.name, doctype, tuple(items)),
+		lambda: _get_qty_amount_data_for_cumulative(pr_doc, doctype, items),
+	)
+
+
+def _get_qty_amount_data_for_cumulative(pr_doc, doctype, items):
+	sum_qty, sum_amt = [0, 0]
 
 	date_field = (
 		"transaction_date" if frappe.get_meta(doctype).has_field("transaction_date") else "posting_date"
@@ -670,6 +777,15 @@ def apply_pricing_rule_for_free_items(doc, pricing_rule_args, set_missing_values
 
 
 def get_pricing_rule_items(pr_doc):
+	if not pr_doc.name:
+		return _get_pricing_rule_items(pr_doc)
+
+	return get_from_pricing_rule_batch_cache(
+		("rule_items", pr_doc.name), lambda: _get_pricing_rule_items(pr_doc)
+	)
+
+
+def _get_pricing_rule_items(pr_doc):
 	apply_on_data = []
 	apply_on = frappe.scrub(pr_doc.get("apply_on"))
 
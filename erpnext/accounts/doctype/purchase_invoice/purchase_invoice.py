@@ -11,6 +11,10 @@ from six import iteritems
 import erpnext
 from erpnext.accounts.deferred_revenue import validate_service_stop_date
 from erpnext.accounts.doctype.gl_entry.gl_entry import update_outstanding_amt
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	delete_item_wise_tax_details,
+	make_item_wise_tax_details,
+)
 from erpnext.accounts.doctype.sales_invoice.sales_invoice import (
 	check_if_return_invoice_linked_with_payment_entry,
 	get_total_in_party_account_currency,
@@ -508,6 +512,7 @@ class PurchaseInvoice(BuyingController):
 
 		# this sequence because outstanding may get -negative
 		self.make_gl_entries()
+		make_item_wise_tax_details(self)
 
 		if self.update_stock == 1:
 			self.repost_future_sle_and_gle()
@@ -1368,6 +1373,7 @@ class PurchaseInvoice(BuyingController):
 			self.set_consumed_qty_in_po()
 
 		self.make_gl_entries_on_cancel()
+		delete_item_wise_tax_details(self.doctype, self.name)
 
 		if self.update_stock == 1:
 			self.repost_future_sle_and_gle()
@@ -12,6 +12,10 @@ from six import iteritems
 
 import erpnext
 from erpnext.accounts.deferred_revenue import validate_service_stop_date
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	delete_item_wise_tax_details,
+	make_item_wise_tax_details,
+)
 from erpnext.accounts.doctype.loyalty_program.loyalty_program import (
 	get_loyalty_program_details_with_points,
 	validate_loyalty_points,
@@ -264,6 +268,7 @@ class SalesInvoice(SellingController):
 
 		# this sequence because outstanding may get -ve
 		self.make_gl_entries()
+		make_item_wise_tax_details(self)
 
 		if self.update_stock == 1:
 			self.repost_future_sle_and_gle()
@@ -375,6 +380,7 @@ class SalesInvoice(SellingController):
 			self.update_stock_ledger()
 
 		self.make_gl_entries_on_cancel()
+		delete_item_wise_tax_details(self.doctype, self.name)
 
 		if self.update_stock == 1:
 			self.repost_future_sle_and_gle()
@@ -2596,6 +2596,55 @@ class TestSalesInvoice(unittest.TestCase):
 		einvoice_settings.save()
 		frappe.flags.country = country
 
+	def test_bulk_irn_generation(self):
+		from erpnext.regional.india.e_invoice.utils import GSPConnector
+
+		invoices = []
+		for i in range(3):
+			si = get_sales_invoice_for_e_invoice()
+			si.save()
+			invoices.append(si.name)
+
+		einvoice_settings = frappe.get_doc("E Invoice Settings")
+		einvoice_settings.enable = 1
+		einvoice_settings.applicable_from = nowdate()
+		einvoice_settings.set("credentials", [])
+		einvoice_settings.append(
+			"credentials",
+			{
+				"company": "_Test Company",
+				"gstin": "27AAECE4835E1ZR",
+				"username": "test",
+				"password": "test",
+			},
+		)
+		einvoice_settings.save()
+
+		gsp_server = make_mock_gsp_server()
+		frappe.conf.einvoice_gsp_url = "http://127.0.0.1:{}".format(gsp_server.server_port)
+
+		try:
+			failed = GSPConnector.bulk_generate_irn(invoices, max_workers=2)
+			self.assertEqual(failed, [])
+			for invoice in invoices:
+				self.assertEqual(
+					frappe.db.get_value("Sales Invoice", invoice, ["irn", "einvoice_status"]),
+					("IRN-" + invoice, "Generated"),
+				)
+
+			# token is fetched once, invoices with IRN are skipped
+			GSPConnector.bulk_generate_irn(invoices)
+			self.assertEqual(gsp_server.requests.count("/gsp/authenticate"), 1)
+			self.assertEqual(len(gsp_server.requests), len(invoices) + 1)
+
+		finally:
+			gsp_server.shutdown()
+			frappe.conf.pop("einvoice_gsp_url", None)
+			einvoice_settings = frappe.get_doc("E Invoice Settings")
+			einvoice_settings.enable = 0
+			einvoice_settings.auth_token = None
+			einvoice_settings.save()
+
 	def test_einvoice_json(self):
 		from erpnext.regional.india.e_invoice.utils import make_einvoice, validate_totals
 
@@ -3633,6 +3682,50 @@ def get_sales_invoice_for_e_invoice():
 	return si
 
 
+def make_mock_gsp_server():
+	"""Start a local server which responds to e-invoice requests like the GSP."""
+	import json
+	import threading
+	from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+	import jwt
+
+	class MockGSPHandler(BaseHTTPRequestHandler):
+		def do_POST(self):
+			path = self.path.split("?")[0]
+			data = json.loads(self.rfile.read(int(self.headers.get("content-length") or 0)) or "{}")
+			self.server.requests.append(path)
+
+			if path == "/gsp/authenticate":
+				res = {"token_type": "Bearer", "access_token": "test_token", "expires_in": 21600}
+			else:
+				res = {
+					"success": True,
+					"result": {
+						"Irn": "IRN-" + data["DocDtls"]["No"],
+						"AckNo": 1,
+						"AckDt": "2021-01-01 10:00:00",
+						"SignedInvoice": jwt.encode({"data": json.dumps(data)}, "secret"),
+						"SignedQRCode": jwt.encode({"data": "{}"}, "secret"),
+					},
+				}
+
+			body = json.dumps(res).encode()
+			self.send_response(200)
+			self.send_header("content-type", "application/json")
+			self.send_header("content-length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def log_message(self, *args):
+			pass
+
+	server = ThreadingHTTPServer(("127.0.0.1", 0), MockGSPHandler)
+	server.requests = []
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server
+
+
 def make_test_address_for_ewaybill():
 	if not frappe.db.exists("Address", "_Test Address for Eway bill-Billing"):
 		address = frappe.get_doc(
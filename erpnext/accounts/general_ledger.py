@@ -8,10 +8,22 @@ from frappe.model.meta import get_field_precision
 from frappe.utils import cint, cstr, flt, formatdate, getdate, now
 
 import erpnext
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	remove_account_period_balance,
+	update_account_period_balance,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
-from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
+from erpnext.accounts.doctype.budget.budget import validate_expenses_against_budget
+from erpnext.accounts.doctype.budget_consumption.budget_consumption import (
+	remove_budget_consumption,
+	update_budget_consumption,
+)
+from erpnext.accounts.doctype.party_voucher_outstanding.party_voucher_outstanding import (
+	remove_party_voucher_outstanding,
+	update_party_voucher_outstanding,
+)
 
 
 class ClosedAccountingPeriod(frappe.ValidationError):
@@ -219,8 +231,16 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 	if gl_map:
 		check_freezing_date(gl_map[0]["posting_date"], adv_adj)
 
+	gl_entries = []
 	for entry in gl_map:
-		make_entry(entry, adv_adj, update_outstanding, from_repost)
+		gl_entries.append(make_entry(entry, adv_adj, update_outstanding, from_repost))
+
+	update_party_voucher_outstanding(gl_entries)
+	update_account_period_balance(gl_entries)
+	update_budget_consumption(gl_entries)
+
+	if not from_repost:
+		validate_budget(gl_map)
 
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
@@ -233,8 +253,14 @@ def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 	gle.flags.notify_update = False
 	gle.submit()
 
-	if not from_repost and gle.voucher_type != "Period Closing Voucher":
-		validate_expense_against_budget(args)
+	return gle
+
+
+def validate_budget(gl_map):
+	"""Validate expenses against budgets, once GL entries of the voucher are booked"""
+	validate_expenses_against_budget(
+		[entry for entry in gl_map if entry.get("voucher_type") != "Period Closing Voucher"]
+	)
 
 
 def validate_cwip_accounts(gl_map):
@@ -398,6 +424,9 @@ def make_reverse_gl_entries(
 	if gl_entries:
 		validate_accounting_period(gl_entries)
 		check_freezing_date(gl_entries[0]["posting_date"], adv_adj)
+		remove_party_voucher_outstanding(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
+		remove_account_period_balance(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
+		remove_budget_consumption(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 		set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 
 		for entry in gl_entries:
@@ -419,6 +448,8 @@ def make_reverse_gl_entries(
 			if entry["debit"] or entry["credit"]:
 				make_entry(entry, adv_adj, "Yes")
 
+		validate_budget([entry for entry in gl_entries if entry["debit"] or entry["credit"]])
+
 
 def check_freezing_date(posting_date, adv_adj=False):
 	"""
@@ -11,6 +11,7 @@ class TestAccountBalance(unittest.TestCase):
 	def test_account_balance(self):
 		frappe.db.sql("delete from `tabSales Invoice` where company='_Test Company 2'")
 		frappe.db.sql("delete from `tabGL Entry` where company='_Test Company 2'")
+		frappe.db.sql("delete from `tabAccount Period Balance` where company='_Test Company 2'")
 
 		filters = {
 			"company": "_Test Company 2",
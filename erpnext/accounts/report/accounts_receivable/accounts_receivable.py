@@ -12,6 +12,9 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
+from erpnext.accounts.doctype.party_voucher_outstanding.party_voucher_outstanding import (
+	PARTY_ACCOUNT_TYPES,
+)
 from erpnext.accounts.utils import get_currency_precision
 
 #  This report gives a summary of all Outstanding Invoices considering the following
@@ -28,6 +31,8 @@ from erpnext.accounts.utils import get_currency_precision
 #  8. Invoice details like Sales Persons, Delivery Notes are also fetched comma separated
 #  9. Report amounts are in "Party Currency" if party is selected, or company currency for multi-party
 # 10. This reports is based on all GL Entries that are made against account_type "Receivable" or "Payable"
+# 11. If there are no GL Entries after the report date, only GL Entries of vouchers with outstanding
+#     as per Party Voucher Outstanding are considered
 
 
 def execute(filters=None):
@@ -70,6 +75,7 @@ class ReceivablePayableReport(object):
 		self.party_type = self.filters.party_type
 		self.party_details = {}
 		self.invoices = set()
+		self.settled_vouchers = set()
 		self.skip_total_row = 0
 
 		if self.filters.get("group_by_party"):
@@ -78,6 +84,9 @@ class ReceivablePayableReport(object):
 			self.skip_total_row = 1
 
 	def get_data(self):
+		# Get return entries
+		self.get_return_entries()
+
 		self.get_gl_entries()
 		self.get_sales_invoices_or_customers_based_on_sales_person()
 		self.voucher_balance = OrderedDict()
@@ -92,9 +101,6 @@ class ReceivablePayableReport(object):
 		# fetch future payments against invoices
 		self.get_future_payments()
 
-		# Get return entries
-		self.get_return_entries()
-
 		# Get Exchange Rate Revaluations
 		self.get_exchange_rate_revaluations()
 
@@ -225,20 +231,11 @@ class ReceivablePayableReport(object):
 		voucher_balance = None
 		if gle.against_voucher:
 			# find invoice
-			against_voucher = gle.against_voucher
-
-			# If payment is made against credit note
-			# and credit note is made against a Sales Invoice
-			# then consider the payment against original sales invoice.
-			if gle.against_voucher_type in ("Sales Invoice", "Purchase Invoice"):
-				if gle.against_voucher in self.return_entries:
-					return_against = self.return_entries.get(gle.against_voucher)
-					if return_against:
-						against_voucher = return_against
-
-			voucher_balance = self.voucher_balance.get(
-				(gle.against_voucher_type, against_voucher, gle.party)
-			)
+			against_voucher_key = self.get_against_voucher_key(gle)
+			if against_voucher_key in self.settled_vouchers:
+				return
+
+			voucher_balance = self.voucher_balance.get(against_voucher_key)
 
 		if not voucher_balance:
 			# no invoice, this is an invoice / stand-alone payment / credit note
@@ -246,6 +243,20 @@ class ReceivablePayableReport(object):
 
 		return voucher_balance
 
+	def get_against_voucher_key(self, gle):
+		against_voucher = gle.against_voucher
+
+		# If payment is made against credit note
+		# and credit note is made against a Sales Invoice
+		# then consider the payment against original sales invoice.
+		if gle.against_voucher_type in ("Sales Invoice", "Purchase Invoice"):
+			if gle.against_voucher in self.return_entries:
+				return_against = self.return_entries.get(gle.against_voucher)
+				if return_against:
+					against_voucher = return_against
+
+		return (gle.against_voucher_type, against_voucher, gle.party)
+
 	def build_data(self):
 		# set outstanding for all the accumulated balances
 		# as we can use this to filter out invoices without outstanding
@@ -674,11 +685,106 @@ class ReceivablePayableReport(object):
 		row["range" + str(index + 1)] = row.outstanding
 
 	def get_gl_entries(self):
+		if self.can_use_party_voucher_outstanding():
+			self.gl_entries = self.get_gl_entries_of_open_vouchers()
+		else:
+			self.gl_entries = self.get_gl_entries_with_conditions()
+
+	def can_use_party_voucher_outstanding(self):
+		# Party Voucher Outstanding has current outstanding of vouchers,
+		# filters on individual GL Entries need all the GL Entries
+		if (
+			self.filters.show_future_payments
+			or self.filters.get("sales_person")
+			or self.filters.cost_center
+			or self.filters.finance_book
+		):
+			return False
+
+		for dimension in get_accounting_dimensions(as_list=False):
+			if self.filters.get(dimension.fieldname):
+				return False
+
+		if self.filters.party_account and (
+			frappe.get_cached_value("Account", self.filters.party_account, "account_type")
+			not in PARTY_ACCOUNT_TYPES
+		):
+			return False
+
+		# outstanding as on a past date
+		return not frappe.db.sql(
+			"""
+			select name from `tabGL Entry`
+			where posting_date > %s and company = %s and party_type = %s and is_cancelled = 0
+			limit 1""",
+			(self.filters.report_date, self.filters.company, self.party_type),
+		)
+
+	def get_gl_entries_of_open_vouchers(self):
+		conditions, values = self.prepare_open_voucher_conditions()
+
+		precision = 0.5 / 10**self.currency_precision
+		open_vouchers = frappe.db.sql(
+			"""
+			select voucher_type, voucher_no, party
+			from `tabParty Voucher Outstanding`
+			where
+				party_type = %s
+				and (abs(outstanding) > {precision} or abs(outstanding_in_account_currency) > {precision})
+				{conditions}""".format(
+				precision=precision, conditions=conditions
+			),
+			values,
+		)
+
+		voucher_nos = {voucher_no for _, voucher_no, _ in open_vouchers}
+		if not voucher_nos:
+			return []
+
+		# payments against credit notes are considered against the original invoice
+		against_vouchers = voucher_nos | {
+			d for d, return_against in self.return_entries.items() if return_against in voucher_nos
+		}
+
+		gl_entries = self.get_gl_entries_with_conditions(
+			"and (voucher_no in %s or against_voucher in %s)",
+			[tuple(voucher_nos), tuple(against_vouchers)],
+		)
+		self.set_settled_vouchers(gl_entries, set(open_vouchers))
+
+		return gl_entries
+
+	def set_settled_vouchers(self, gl_entries, open_vouchers):
+		# GL Entries of settled vouchers are not fetched, payments of open vouchers
+		# booked against them should not be considered as advances
+		vouchers = {(gle.voucher_type, gle.voucher_no, gle.party) for gle in gl_entries}
+		against_vouchers = set()
+		for gle in gl_entries:
+			if gle.against_voucher:
+				against_voucher_key = self.get_against_voucher_key(gle)
+				if against_voucher_key not in vouchers and against_voucher_key not in open_vouchers:
+					against_vouchers.add(against_voucher_key)
+
+		if not against_vouchers:
+			return
+
+		for gle in self.get_gl_entries_with_conditions(
+			"and voucher_no in %s", [tuple({d[1] for d in against_vouchers})]
+		):
+			voucher_key = (gle.voucher_type, gle.voucher_no, gle.party)
+			if voucher_key in against_vouchers:
+				self.settled_vouchers.add(voucher_key)
+
+	def get_gl_entries_with_conditions(self, voucher_condition="", voucher_values=None):
 		# get all the GL entries filtered by the given filters
 
 		conditions, values = self.prepare_conditions()
 		order_by = self.get_order_by_condition()
 
+		if voucher_condition:
+			conditions += " " + voucher_condition
+			values += voucher_values
+
 		if self.filters.show_future_payments:
 			values.insert(2, self.filters.report_date)
 
@@ -696,7 +802,7 @@ class ReceivablePayableReport(object):
 
 		remarks = ", remarks" if self.filters.get("show_remarks") else ""
 
-		self.gl_entries = frappe.db.sql(
+		return frappe.db.sql(
 			"""
 			select
 				name, posting_date, account, party_type, party, voucher_type, voucher_no, cost_center,
@@ -753,6 +859,23 @@ class ReceivablePayableReport(object):
 		self.add_accounting_dimensions_filters(conditions, values)
 		return " and ".join(conditions), values
 
+	def prepare_open_voucher_conditions(self):
+		"""Conditions on Party Voucher Outstanding, which has no report date, cost center,
+		finance book or accounting dimensions to filter on."""
+		conditions = [""]
+		values = [self.party_type]
+		party_type_field = scrub(self.party_type)
+
+		self.add_common_filters(conditions, values, party_type_field)
+
+		if party_type_field == "customer":
+			self.add_customer_filters(conditions, values)
+
+		elif party_type_field == "supplier":
+			self.add_supplier_filters(conditions, values)
+
+		return " and ".join(conditions), values
+
 	def get_cost_center_conditions(self, conditions):
 		lft, rgt = frappe.db.get_value("Cost Center", self.filters.cost_center, ["lft", "rgt"])
 		cost_center_list = [
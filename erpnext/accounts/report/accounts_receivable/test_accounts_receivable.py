@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.tests.utils import FrappeTestCase, change_settings
@@ -7,13 +8,18 @@ from frappe.utils import add_days, flt, getdate, today
 from erpnext import get_default_cost_center
 from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.accounts_receivable.accounts_receivable import execute
+from erpnext.accounts.report.accounts_receivable.accounts_receivable import (
+	ReceivablePayableReport,
+	execute,
+)
 
 
 class TestAccountsReceivable(unittest.TestCase):
 	def setUp(self):
 		frappe.db.sql("delete from `tabSales Invoice` where company='_Test Company 2'")
 		frappe.db.sql("delete from `tabGL Entry` where company='_Test Company 2'")
+		frappe.db.sql("delete from `tabAccount Period Balance` where company='_Test Company 2'")
+		frappe.db.sql("delete from `tabParty Voucher Outstanding` where company='_Test Company 2'")
 		frappe.db.sql("delete from `tabJournal Entry` where company='_Test Company 2'")
 		frappe.db.sql("delete from `tabExchange Rate Revaluation` where company='_Test Company 2'")
 
@@ -164,6 +170,43 @@ class TestAccountsReceivable(unittest.TestCase):
 			],
 		)
 
+	def test_accounts_receivable_from_party_voucher_outstanding(self):
+		filters = {
+			"company": "_Test Company 2",
+			"report_date": today(),
+			"range1": 30,
+			"range2": 60,
+			"range3": 90,
+			"range4": 120,
+		}
+
+		settled_si = make_sales_invoice(no_payment_schedule=True)
+		make_credit_note(settled_si.name)
+
+		si = make_sales_invoice(no_payment_schedule=True)
+		make_payment(si.name)
+		make_sales_invoice(no_payment_schedule=True)
+
+		self.assertTrue(can_use_party_voucher_outstanding(filters))
+		data = execute(filters)[1]
+		self.assertEqual(len(data), 2)
+
+		with patch.object(
+			ReceivablePayableReport, "can_use_party_voucher_outstanding", return_value=False
+		):
+			self.assertEqual(data, execute(filters)[1])
+
+		# outstanding as on a past date is computed from GL Entries
+		filters["report_date"] = add_days(today(), -1)
+		self.assertFalse(can_use_party_voucher_outstanding(filters))
+
+
+def can_use_party_voucher_outstanding(filters):
+	report = ReceivablePayableReport(filters)
+	report.filters.party_type = "Customer"
+	report.set_defaults()
+	return report.can_use_party_voucher_outstanding()
+
 
 def make_sales_invoice(no_payment_schedule=False, do_not_submit=False):
 	frappe.set_user("Administrator")
@@ -4,9 +4,12 @@
 
 import frappe
 from frappe import _
-from frappe.utils import cint, cstr
+from frappe.utils import cint, cstr, flt
 from six import iteritems
 
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	get_gl_balance_sources,
+)
 from erpnext.accounts.report.financial_statements import (
 	get_columns,
 	get_cost_centers_with_children,
@@ -198,20 +201,27 @@ def get_account_type_based_gl_data(company, filters=None):
 		filters.cost_center = get_cost_centers_with_children(filters.cost_center)
 		cond += " and cost_center in %(cost_center)s"
 
-	gl_sum = frappe.db.sql_list(
-		"""
-		select sum(credit) - sum(debit)
-		from `tabGL Entry`
-		where company=%(company)s and posting_date >= %(start_date)s and posting_date <= %(end_date)s
-			and voucher_type != 'Period Closing Voucher'
-			and account in ( SELECT name FROM tabAccount WHERE account_type = %(account_type)s) {cond}
-	""".format(
-			cond=cond
-		),
-		filters,
-	)
+	gl_sum = 0
+	for table, source_condition in get_gl_balance_sources(
+		filters.end_date, start_dates=[filters.start_date]
+	):
+		gl_sum += flt(
+			frappe.db.sql(
+				"""
+			select sum(credit) - sum(debit)
+			from {table}
+			where company=%(company)s and posting_date >= %(start_date)s and posting_date <= %(end_date)s
+				and voucher_type != 'Period Closing Voucher'
+				and account in ( SELECT name FROM tabAccount WHERE account_type = %(account_type)s)
+				and {source_condition} {cond}
+		""".format(
+					table=table, source_condition=source_condition, cond=cond
+				),
+				filters,
+			)[0][0]
+		)
 
-	return gl_sum[0] if gl_sum and gl_sum[0] else 0
+	return gl_sum
 
 
 def get_start_date(period, accumulated_values, company):
@@ -12,12 +12,16 @@ from frappe.utils import add_days, add_months, cint, cstr, flt, formatdate, get_
 from past.builtins import cmp
 from six import itervalues
 
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	get_gl_balance_sources,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
 from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
 from erpnext.accounts.utils import get_fiscal_year
+from erpnext.utilities.tree_index import get_tree_index
 
 
 def get_period_list(
@@ -190,6 +194,7 @@ def get_data(
 			filters,
 			gl_entries_by_account,
 			ignore_closing_entries=ignore_closing_entries,
+			period_list=period_list,
 		)
 
 	calculate_values(
@@ -418,8 +423,12 @@ def set_gl_entries_by_account(
 	filters,
 	gl_entries_by_account,
 	ignore_closing_entries=False,
+	period_list=None,
 ):
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""Returns a dict like { "account": [gl entries], ... }
+
+	If `period_list` is passed, entries of complete months are read as monthly balances
+	from Account Period Balance, if the periods start and end with a month."""
 
 	additional_conditions = get_additional_conditions(from_date, ignore_closing_entries, filters)
 
@@ -448,49 +457,23 @@ def set_gl_entries_by_account(
 			if value:
 				gl_filters.update({key: value})
 
-		distributed_cost_center_query = ""
-		if filters and filters.get("cost_center"):
-			distributed_cost_center_query = """
-			UNION ALL
-			SELECT posting_date,
-				account,
-				debit*(DCC_allocation.percentage_allocation/100) as debit,
-				credit*(DCC_allocation.percentage_allocation/100) as credit,
-				is_opening,
-				fiscal_year,
-				debit_in_account_currency*(DCC_allocation.percentage_allocation/100) as debit_in_account_currency,
-				credit_in_account_currency*(DCC_allocation.percentage_allocation/100) as credit_in_account_currency,
-				account_currency
-			FROM `tabGL Entry`,
-			(
-				SELECT parent, sum(percentage_allocation) as percentage_allocation
-				FROM `tabDistributed Cost Center`
-				WHERE cost_center IN %(cost_center)s
-				AND parent NOT IN %(cost_center)s
-				GROUP BY parent
-			) as DCC_allocation
-			WHERE company=%(company)s
-			{additional_conditions}
-			AND posting_date <= %(to_date)s
-			AND is_cancelled = 0
-			AND cost_center = DCC_allocation.parent
-			""".format(
-				additional_conditions=additional_conditions.replace("and cost_center in %(cost_center)s ", "")
+		if period_list and not filters.get("presentation_currency"):
+			sources = get_gl_balance_sources(
+				to_date,
+				start_dates=[from_date, period_list[0].get("year_start_date")]
+				+ [period.get("from_date") for period in period_list],
+				end_dates=[
+					period.to_date for period in period_list if getdate(period.to_date) != getdate(to_date)
+				],
 			)
+		else:
+			sources = [("`tabGL Entry`", "is_cancelled = 0")]
 
-		gl_entries = frappe.db.sql(
-			"""select posting_date, account, debit, credit, is_opening, fiscal_year, debit_in_account_currency, credit_in_account_currency, account_currency from `tabGL Entry`
-			where company=%(company)s
-			{additional_conditions}
-			and posting_date <= %(to_date)s
-			and is_cancelled = 0
-			{distributed_cost_center_query}""".format(
-				additional_conditions=additional_conditions,
-				distributed_cost_center_query=distributed_cost_center_query,
-			),
-			gl_filters,
-			as_dict=True,
-		)  # nosec
+		gl_entries = []
+		for table, source_condition in sources:
+			gl_entries += get_gl_entries_from_source(
+				table, source_condition, additional_conditions, gl_filters, filters
+			)
 
 		if filters and filters.get("presentation_currency"):
 			convert_to_presentation_currency(gl_entries, get_currency(filters), filters.get("company"))
@@ -501,6 +484,58 @@ def set_gl_entries_by_account(
 		return gl_entries_by_account
 
 
+def get_gl_entries_from_source(
+	table, source_condition, additional_conditions, gl_filters, filters
+):
+	distributed_cost_center_query = ""
+	if filters and filters.get("cost_center"):
+		distributed_cost_center_query = """
+		UNION ALL
+		SELECT posting_date,
+			account,
+			debit*(DCC_allocation.percentage_allocation/100) as debit,
+			credit*(DCC_allocation.percentage_allocation/100) as credit,
+			is_opening,
+			fiscal_year,
+			debit_in_account_currency*(DCC_allocation.percentage_allocation/100) as debit_in_account_currency,
+			credit_in_account_currency*(DCC_allocation.percentage_allocation/100) as credit_in_account_currency,
+			account_currency
+		FROM {table},
+		(
+			SELECT parent, sum(percentage_allocation) as percentage_allocation
+			FROM `tabDistributed Cost Center`
+			WHERE cost_center IN %(cost_center)s
+			AND parent NOT IN %(cost_center)s
+			GROUP BY parent
+		) as DCC_allocation
+		WHERE company=%(company)s
+		{additional_conditions}
+		AND posting_date <= %(to_date)s
+		AND {source_condition}
+		AND cost_center = DCC_allocation.parent
+		""".format(
+			table=table,
+			source_condition=source_condition,
+			additional_conditions=additional_conditions.replace("and cost_center in %(cost_center)s ", ""),
+		)
+
+	return frappe.db.sql(
+		"""select posting_date, account, debit, credit, is_opening, fiscal_year, debit_in_account_currency, credit_in_account_currency, account_currency from {table}
+		where company=%(company)s
+		{additional_conditions}
+		and posting_date <= %(to_date)s
+		and {source_condition}
+		{distributed_cost_center_query}""".format(
+			table=table,
+			source_condition=source_condition,
+			additional_conditions=additional_conditions,
+			distributed_cost_center_query=distributed_cost_center_query,
+		),
+		gl_filters,
+		as_dict=True,
+	)  # nosec
+
+
 def get_additional_conditions(from_date, ignore_closing_entries, filters):
 	additional_conditions = []
 
@@ -563,12 +598,11 @@ def get_cost_centers_with_children(cost_centers):
 	if not isinstance(cost_centers, list):
 		cost_centers = [d.strip() for d in cost_centers.strip().split(",") if d]
 
+	tree_index = get_tree_index("Cost Center")
 	all_cost_centers = []
 	for d in cost_centers:
-		if frappe.db.exists("Cost Center", d):
-			lft, rgt = frappe.db.get_value("Cost Center", d, ["lft", "rgt"])
-			children = frappe.get_all("Cost Center", filters={"lft": [">=", lft], "rgt": ["<=", rgt]})
-			all_cost_centers += [c.name for c in children]
+		if tree_index.exists(d):
+			all_cost_centers += tree_index.descendants(d, include_self=True)
 		else:
 			frappe.throw(_("Cost Center: {0} does not exist").format(d))
 
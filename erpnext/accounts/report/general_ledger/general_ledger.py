@@ -17,10 +17,14 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 from erpnext.accounts.report.financial_statements import get_cost_centers_with_children
 from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
 from erpnext.accounts.utils import get_account_currency
+from erpnext.utilities.tree_index import get_tree_index
 
 # to cache translations
 TRANSLATIONS = frappe._dict()
 
+# approximate number of GL entries fetched by one query
+GL_ENTRY_CHUNK_SIZE = 10000
+
 
 def execute(filters=None):
 	if not filters:
@@ -47,7 +51,8 @@ def execute(filters=None):
 
 	update_translations()
 
-	res = get_result(filters, account_details)
+	# report runner and statement of accounts need all the rows
+	res = list(get_result(filters, account_details))
 
 	return columns, res
 
@@ -150,17 +155,88 @@ def get_result(filters, account_details):
 	if filters.get("include_dimensions"):
 		accounting_dimensions = get_accounting_dimensions()
 
-	gl_entries = get_gl_entries(filters, accounting_dimensions)
-
-	data = get_data_with_opening_closing(filters, account_details, accounting_dimensions, gl_entries)
+	gl_entry_chunks = get_gl_entries_in_chunks(filters, accounting_dimensions)
 
-	result = get_result_as_list(data, filters)
+	data = get_data_with_opening_closing(
+		filters, account_details, accounting_dimensions, gl_entry_chunks
+	)
 
-	return result
+	return get_result_as_list(data, filters)
 
 
 def get_gl_entries(filters, accounting_dimensions):
 	currency_map = get_currency(filters)
+	gl_entries = frappe.db.sql(
+		get_gl_entries_query(filters, accounting_dimensions), filters, as_dict=1
+	)
+
+	if filters.get("presentation_currency"):
+		return convert_to_presentation_currency(gl_entries, currency_map, filters.get("company"))
+	else:
+		return gl_entries
+
+
+def get_gl_entries_in_chunks(filters, accounting_dimensions):
+	"""Yields GL entries of the report in chunks of whole posting dates of about
+	`GL_ENTRY_CHUNK_SIZE` entries each. A chunk is found on the posting date index, so each
+	query only sorts the entries of its own chunk instead of all the remaining entries."""
+	if filters.get("presentation_currency") or filters.get("group_by") == "Group by Account":
+		# conversion depends on the currencies of all the entries and
+		# grouping by account is not ordered by posting date
+		yield get_gl_entries(filters, accounting_dimensions)
+		return
+
+	after_posting_date = None
+	while True:
+		upto_posting_date = get_last_posting_date_of_chunk(filters, after_posting_date)
+		query = get_gl_entries_query(
+			filters,
+			accounting_dimensions,
+			after_posting_date=bool(after_posting_date),
+			upto_posting_date=bool(upto_posting_date),
+		)
+		values = frappe._dict(
+			filters, after_posting_date=after_posting_date, upto_posting_date=upto_posting_date
+		)
+
+		gl_entries = frappe.db.sql(query, values, as_dict=1)
+		if gl_entries:
+			yield gl_entries
+
+		if not upto_posting_date:
+			break
+
+		after_posting_date = upto_posting_date
+
+
+def get_last_posting_date_of_chunk(filters, after_posting_date=None):
+	"""Returns posting date of the last entry of the chunk after `after_posting_date`,
+	or None if the remaining entries fit in one chunk.
+
+	Entries of distributed cost centers are not counted, so a chunk can be larger."""
+	after_condition = "and posting_date > %(after_posting_date)s" if after_posting_date else ""
+
+	last_posting_date = frappe.db.sql(
+		"""
+		select posting_date
+		from `tabGL Entry`
+		where company=%(company)s {conditions} {after_condition}
+		order by posting_date
+		limit %(chunk_offset)s, 1
+		""".format(
+			conditions=get_conditions(filters), after_condition=after_condition
+		),
+		frappe._dict(
+			filters, after_posting_date=after_posting_date, chunk_offset=GL_ENTRY_CHUNK_SIZE - 1
+		),
+	)
+
+	return last_posting_date[0][0] if last_posting_date else None
+
+
+def get_gl_entries_query(
+	filters, accounting_dimensions, after_posting_date=False, upto_posting_date=False
+):
 	select_fields = """, debit, credit, debit_in_account_currency,
 		credit_in_account_currency """
 
@@ -174,6 +250,12 @@ def get_gl_entries(filters, accounting_dimensions):
 	if filters.get("group_by") == "Group by Account":
 		order_by_statement = "order by account, posting_date, creation"
 
+	chunk_conditions = ""
+	if after_posting_date:
+		chunk_conditions += " and `tabGL Entry`.posting_date > %(after_posting_date)s"
+	if upto_posting_date:
+		chunk_conditions += " and `tabGL Entry`.posting_date <= %(upto_posting_date)s"
+
 	if filters.get("include_default_book_entries"):
 		filters["company_fb"] = frappe.db.get_value(
 			"Company", filters.get("company"), "default_finance_book"
@@ -217,14 +299,15 @@ def get_gl_entries(filters, accounting_dimensions):
 		{conditions}
 		AND posting_date <= %(to_date)s
 		AND cost_center = DCC_allocation.parent
+		{chunk_conditions}
 		""".format(
 			dimension_fields=dimension_fields,
 			select_fields_with_percentage=select_fields_with_percentage,
 			conditions=get_conditions(filters).replace("and cost_center in %(cost_center)s ", ""),
+			chunk_conditions=chunk_conditions,
 		)
 
-	gl_entries = frappe.db.sql(
-		"""
+	return """
 		select
 			name as gl_entry, posting_date, account, party_type, party,
 			voucher_type, voucher_no, {dimension_fields}
@@ -232,25 +315,18 @@ def get_gl_entries(filters, accounting_dimensions):
 			against_voucher_type, against_voucher, account_currency,
 			remarks, against, is_opening, creation {select_fields}
 		from `tabGL Entry`
-		where company=%(company)s {conditions}
+		where company=%(company)s {conditions} {chunk_conditions}
 		{distributed_cost_center_query}
 		{order_by_statement}
 		""".format(
-			dimension_fields=dimension_fields,
-			select_fields=select_fields,
-			conditions=get_conditions(filters),
-			distributed_cost_center_query=distributed_cost_center_query,
-			order_by_statement=order_by_statement,
-		),
-		filters,
-		as_dict=1,
+		dimension_fields=dimension_fields,
+		select_fields=select_fields,
+		conditions=get_conditions(filters),
+		chunk_conditions=chunk_conditions,
+		distributed_cost_center_query=distributed_cost_center_query,
+		order_by_statement=order_by_statement,
 	)
 
-	if filters.get("presentation_currency"):
-		return convert_to_presentation_currency(gl_entries, currency_map, filters.get("company"))
-	else:
-		return gl_entries
-
 
 def get_conditions(filters):
 	conditions = []
@@ -337,75 +413,89 @@ def get_accounts_with_children(accounts):
 	if not isinstance(accounts, list):
 		accounts = [d.strip() for d in accounts.strip().split(",") if d]
 
+	tree_index = get_tree_index("Account")
 	all_accounts = []
 	for d in accounts:
-		if frappe.db.exists("Account", d):
-			lft, rgt = frappe.db.get_value("Account", d, ["lft", "rgt"])
-			children = frappe.get_all("Account", filters={"lft": [">=", lft], "rgt": ["<=", rgt]})
-			all_accounts += [c.name for c in children]
+		if tree_index.exists(d):
+			all_accounts += tree_index.descendants(d, include_self=True)
 		else:
 			frappe.throw(_("Account: {0} does not exist").format(d))
 
 	return list(set(all_accounts))
 
 
-def get_data_with_opening_closing(filters, account_details, accounting_dimensions, gl_entries):
-	data = []
-
-	gle_map = initialize_gle_map(gl_entries, filters)
-
-	totals, entries = get_accountwise_gle(filters, accounting_dimensions, gl_entries, gle_map)
+def get_data_with_opening_closing(
+	filters, account_details, accounting_dimensions, gl_entry_chunks
+):
+	totals, entries, gle_map = get_accountwise_gle(filters, accounting_dimensions, gl_entry_chunks)
 
 	# Opening for filtered account
-	data.append(totals.opening)
+	yield totals.opening
 
 	if filters.get("group_by") != "Group by Voucher (Consolidated)":
 		for acc, acc_dict in iteritems(gle_map):
 			# acc
 			if acc_dict.entries:
 				# opening
-				data.append({})
+				yield {}
 				if filters.get("group_by") != "Group by Voucher":
-					data.append(acc_dict.totals.opening)
+					yield acc_dict.totals.opening
 
-				data += acc_dict.entries
+				yield from acc_dict.entries
 
 				# totals
-				data.append(acc_dict.totals.total)
+				yield acc_dict.totals.total
 
 				# closing
 				if filters.get("group_by") != "Group by Voucher":
-					data.append(acc_dict.totals.closing)
-		data.append({})
+					yield acc_dict.totals.closing
+		yield {}
 	else:
-		data += entries
+		yield from entries
 
 	# totals
-	data.append(totals.total)
+	yield totals.total
 
 	# closing
-	data.append(totals.closing)
-
-	return data
+	yield totals.closing
 
 
-def get_totals_dict():
-	def _get_debit_credit_dict(label):
+def get_totals_dict(balances=None):
+	def _get_debit_credit_dict(label, balance):
 		return _dict(
 			account="'{0}'".format(label),
-			debit=0.0,
-			credit=0.0,
-			debit_in_account_currency=0.0,
-			credit_in_account_currency=0.0,
+			debit=balance[0],
+			credit=balance[1],
+			debit_in_account_currency=balance[2],
+			credit_in_account_currency=balance[3],
 		)
 
+	opening, total, closing = balances or get_balances()
 	return _dict(
-		opening=_get_debit_credit_dict(TRANSLATIONS.OPENING),
-		total=_get_debit_credit_dict(TRANSLATIONS.TOTAL),
-		closing=_get_debit_credit_dict(TRANSLATIONS.CLOSING_TOTAL),
+		opening=_get_debit_credit_dict(TRANSLATIONS.OPENING, opening),
+		total=_get_debit_credit_dict(TRANSLATIONS.TOTAL, total),
+		closing=_get_debit_credit_dict(TRANSLATIONS.CLOSING_TOTAL, closing),
 	)
 
 
+def get_balances():
+	"""Returns opening, total and closing balance as lists of debit, credit,
+	debit in account currency and credit in account currency."""
+	return [0.0] * 4, [0.0] * 4, [0.0] * 4
+
+
+def add_to_balances(gle, *balances):
+	debit, credit = gle.debit, gle.credit
+	debit_in_account_currency = gle.debit_in_account_currency
+	credit_in_account_currency = gle.credit_in_account_currency
+
+	for balance in balances:
+		balance[0] += debit
+		balance[1] += credit
+		balance[2] += debit_in_account_currency
+		balance[3] += credit_in_account_currency
+
+
 def group_by_field(group_by):
 	if group_by == "Group by Party":
 		return "party"
@@ -415,19 +505,17 @@ def group_by_field(group_by):
 		return "voucher_no"
 
 
-def initialize_gle_map(gl_entries, filters):
-	gle_map = OrderedDict()
-	group_by = group_by_field(filters.get("group_by"))
-
-	for gle in gl_entries:
-		gle_map.setdefault(gle.get(group_by), _dict(totals=get_totals_dict(), entries=[]))
-	return gle_map
-
+def get_accountwise_gle(filters, accounting_dimensions, gl_entry_chunks):
+	"""Returns totals, consolidated entries and map of each group to its entries and totals.
 
-def get_accountwise_gle(filters, accounting_dimensions, gl_entries, gle_map):
-	totals = get_totals_dict()
+	Balances are summed into plain lists while the chunks are read and converted to
+	totals rows at the end. Entries before the period are only added to the opening
+	balance and are not kept."""
+	opening, total, closing = totals = get_balances()
 	entries = []
 	consolidated_gle = OrderedDict()
+	group_balances = OrderedDict()
+	group_entries = {}
 	group_by = group_by_field(filters.get("group_by"))
 	group_by_voucher_consolidated = filters.get("group_by") == "Group by Voucher (Consolidated)"
 
@@ -467,51 +555,56 @@ def get_accountwise_gle(filters, accounting_dimensions, gl_entries, gle_map):
 	from_date, to_date = getdate(filters.from_date), getdate(filters.to_date)
 	show_opening_entries = filters.get("show_opening_entries")
 
-	for gle in gl_entries:
-		group_by_value = gle.get(group_by)
-
-		if gle.posting_date < from_date or (cstr(gle.is_opening) == "Yes" and not show_opening_entries):
-			if not group_by_voucher_consolidated:
-				update_value_in_dict(gle_map[group_by_value].totals, "opening", gle)
-				update_value_in_dict(gle_map[group_by_value].totals, "closing", gle)
-
-			update_value_in_dict(totals, "opening", gle)
-			update_value_in_dict(totals, "closing", gle)
-
-		elif gle.posting_date <= to_date or (cstr(gle.is_opening) == "Yes" and show_opening_entries):
-			if not group_by_voucher_consolidated:
-				update_value_in_dict(gle_map[group_by_value].totals, "total", gle)
-				update_value_in_dict(gle_map[group_by_value].totals, "closing", gle)
-				update_value_in_dict(totals, "total", gle)
-				update_value_in_dict(totals, "closing", gle)
-
-				gle_map[group_by_value].entries.append(gle)
-
-			elif group_by_voucher_consolidated:
-				keylist = [
-					gle.get("voucher_type"),
-					gle.get("voucher_no"),
-					gle.get("account"),
-					gle.get("party_type"),
-					gle.get("party"),
-				]
-				if filters.get("include_dimensions"):
-					for dim in accounting_dimensions:
-						keylist.append(gle.get(dim))
-					keylist.append(gle.get("cost_center"))
-
-				key = tuple(keylist)
-				if key not in consolidated_gle:
-					consolidated_gle.setdefault(key, gle)
+	for gl_entries in gl_entry_chunks:
+		for gle in gl_entries:
+			group_by_value = gle.get(group_by)
+			if group_by_value not in group_balances:
+				group_balances[group_by_value] = get_balances()
+				group_entries[group_by_value] = []
+
+			group_opening, group_total, group_closing = group_balances[group_by_value]
+
+			if gle.posting_date < from_date or (cstr(gle.is_opening) == "Yes" and not show_opening_entries):
+				if not group_by_voucher_consolidated:
+					add_to_balances(gle, group_opening, group_closing, opening, closing)
 				else:
-					update_value_in_dict(consolidated_gle, key, gle)
+					add_to_balances(gle, opening, closing)
+
+			elif gle.posting_date <= to_date or (cstr(gle.is_opening) == "Yes" and show_opening_entries):
+				if not group_by_voucher_consolidated:
+					add_to_balances(gle, group_total, group_closing, total, closing)
+					group_entries[group_by_value].append(gle)
+
+				elif group_by_voucher_consolidated:
+					keylist = [
+						gle.get("voucher_type"),
+						gle.get("voucher_no"),
+						gle.get("account"),
+						gle.get("party_type"),
+						gle.get("party"),
+					]
+					if filters.get("include_dimensions"):
+						for dim in accounting_dimensions:
+							keylist.append(gle.get(dim))
+						keylist.append(gle.get("cost_center"))
+
+					key = tuple(keylist)
+					if key not in consolidated_gle:
+						consolidated_gle.setdefault(key, gle)
+					else:
+						update_value_in_dict(consolidated_gle, key, gle)
 
 	for key, value in consolidated_gle.items():
-		update_value_in_dict(totals, "total", value)
-		update_value_in_dict(totals, "closing", value)
+		add_to_balances(value, total, closing)
 		entries.append(value)
 
-	return totals, entries
+	gle_map = OrderedDict()
+	for group_by_value, balances in group_balances.items():
+		gle_map[group_by_value] = _dict(
+			totals=get_totals_dict(balances), entries=group_entries[group_by_value]
+		)
+
+	return get_totals_dict(totals), entries, gle_map
 
 
 def get_account_type_map(company):
@@ -538,7 +631,7 @@ def get_result_as_list(data, filters):
 		d["account_currency"] = filters.account_currency
 		d["bill_no"] = inv_details.get(d.get("against_voucher"), "")
 
-	return data
+		yield d
 
 
 def get_supplier_invoice_details():
@@ -1,10 +1,14 @@
 # Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
 # MIT License. See license.txt
 
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
-from frappe.utils import today
+from frappe.utils import add_days, today
 
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.report.general_ledger import general_ledger
 from erpnext.accounts.report.general_ledger.general_ledger import execute
 
 
@@ -150,3 +154,30 @@ class TestGeneralLedger(FrappeTestCase):
 		self.assertEqual(data[2]["credit"], 900)
 		self.assertEqual(data[3]["debit"], 100)
 		self.assertEqual(data[3]["credit"], 100)
+
+	def test_report_with_gl_entries_in_chunks(self):
+		account = "_Test Bank - _TC"
+		for days, amount in ((-5, 100), (0, 200), (0, 300)):
+			make_journal_entry(
+				account,
+				"_Test Account Shipping Charges - _TC",
+				amount,
+				posting_date=add_days(today(), days),
+				submit=True,
+			)
+
+		for group_by in ("Group by Voucher", "Group by Account", "Group by Voucher (Consolidated)"):
+			filters = frappe._dict(
+				company="_Test Company",
+				from_date=add_days(today(), -2),
+				to_date=today(),
+				account=[account],
+				group_by=group_by,
+			)
+			_columns, expected = execute(frappe._dict(filters))
+
+			# same result when entries are fetched and aggregated one at a time
+			with patch.object(general_ledger, "GL_ENTRY_CHUNK_SIZE", 1):
+				_columns, data = execute(frappe._dict(filters))
+
+			self.assertEqual(data, expected)
@@ -468,8 +468,6 @@ def get_tax_accounts(
 	doctype="Sales Invoice",
 	tax_doctype="Sales Taxes and Charges",
 ):
-	import json
-
 	item_row_map = {}
 	tax_columns = []
 	invoice_item_row = {}
@@ -495,7 +493,7 @@ def get_tax_accounts(
 	tax_details = frappe.db.sql(
 		"""
 		select
-			name, parent, description, item_wise_tax_detail, account_head,
+			name, parent, description, account_head,
 			charge_type, {add_deduct_tax}, base_tax_amount_after_discount_amount
 		from `tab%s`
 		where
@@ -521,11 +519,23 @@ def get_tax_accounts(
 
 	tax_accounts = query.run()
 
+	item_wise_tax_details = {}
+	if tax_details:
+		for d in frappe.db.sql(
+			"""
+			select tax_row, item_code, rate, tax_amount
+			from `tabItem Wise Tax Detail`
+			where voucher_type = %s and voucher_no in %s
+		""",
+			(doctype, tuple(invoice_item_row)),
+			as_dict=1,
+		):
+			item_wise_tax_details.setdefault(d.tax_row, []).append(d)
+
 	for (
 		name,
 		parent,
 		description,
-		item_wise_tax_detail,
 		account_head,
 		charge_type,
 		add_deduct_tax,
@@ -536,48 +546,38 @@ def get_tax_accounts(
 			# as description is text editor earlier and markup can break the column convention in reports
 			tax_columns.append(description)
 
-		if item_wise_tax_detail:
-			try:
-				item_wise_tax_detail = json.loads(item_wise_tax_detail)
+		if item_wise_tax_details.get(name):
+			for tax_data in item_wise_tax_details[name]:
+				item_code, tax_rate, tax_amount = tax_data.item_code, tax_data.rate, tax_data.tax_amount
+				itemised_tax.setdefault(item_code, frappe._dict())
 
-				for item_code, tax_data in item_wise_tax_detail.items():
-					itemised_tax.setdefault(item_code, frappe._dict())
+				if charge_type == "Actual" and not tax_rate:
+					tax_rate = "NA"
 
-					if isinstance(tax_data, list):
-						tax_rate, tax_amount = tax_data
-					else:
-						tax_rate = tax_data
-						tax_amount = 0
-
-					if charge_type == "Actual" and not tax_rate:
-						tax_rate = "NA"
+				item_net_amount = sum(
+					[flt(d.base_net_amount) for d in item_row_map.get(parent, {}).get(item_code, [])]
+				)
 
-					item_net_amount = sum(
-						[flt(d.base_net_amount) for d in item_row_map.get(parent, {}).get(item_code, [])]
+				for d in item_row_map.get(parent, {}).get(item_code, []):
+					item_tax_amount = (
+						flt((tax_amount * d.base_net_amount) / item_net_amount) if item_net_amount else 0
 					)
+					if item_tax_amount:
+						tax_value = flt(item_tax_amount, tax_amount_precision)
+						tax_value = (
+							tax_value * -1
+							if (doctype == "Purchase Invoice" and add_deduct_tax == "Deduct")
+							else tax_value
+						)
 
-					for d in item_row_map.get(parent, {}).get(item_code, []):
-						item_tax_amount = (
-							flt((tax_amount * d.base_net_amount) / item_net_amount) if item_net_amount else 0
+						itemised_tax.setdefault(d.name, {})[description] = frappe._dict(
+							{
+								"tax_rate": tax_rate,
+								"tax_amount": tax_value,
+								"is_other_charges": 0 if tuple([account_head]) in tax_accounts else 1,
+							}
 						)
-						if item_tax_amount:
-							tax_value = flt(item_tax_amount, tax_amount_precision)
-							tax_value = (
-								tax_value * -1
-								if (doctype == "Purchase Invoice" and add_deduct_tax == "Deduct")
-								else tax_value
-							)
-
-							itemised_tax.setdefault(d.name, {})[description] = frappe._dict(
-								{
-									"tax_rate": tax_rate,
-									"tax_amount": tax_value,
-									"is_other_charges": 0 if tuple([account_head]) in tax_accounts else 1,
-								}
-							)
-
-			except ValueError:
-				continue
+
 		elif charge_type == "Actual" and tax_amount:
 			for d in invoice_item_row.get(parent, []):
 				itemised_tax.setdefault(d.name, {})[description] = frappe._dict(
@@ -7,6 +7,9 @@ from frappe import _
 from frappe.utils import cstr, flt, formatdate, getdate
 
 import erpnext
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	get_gl_balance_sources,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
@@ -115,6 +118,7 @@ def get_data(filters):
 		filters,
 		gl_entries_by_account,
 		ignore_closing_entries=not flt(filters.with_period_closing_entry),
+		period_list=[frappe._dict(from_date=filters.from_date, to_date=filters.to_date)],
 	)
 
 	calculate_values(accounts, gl_entries_by_account, opening_balances)
@@ -138,10 +142,10 @@ def get_opening_balances(filters):
 
 def get_rootwise_opening_balances(filters, report_type):
 	additional_conditions = ""
-	if not filters.show_unclosed_fy_pl_balances:
-		additional_conditions = (
-			" and posting_date >= %(year_start_date)s" if report_type == "Profit and Loss" else ""
-		)
+	start_dates = [filters.from_date]
+	if not filters.show_unclosed_fy_pl_balances and report_type == "Profit and Loss":
+		additional_conditions = " and posting_date >= %(year_start_date)s"
+		start_dates.append(filters.year_start_date)
 
 	if not flt(filters.with_period_closing_entry):
 		additional_conditions += " and ifnull(voucher_type, '')!='Period Closing Voucher'"
@@ -203,27 +207,32 @@ def get_rootwise_opening_balances(filters, report_type):
 
 				query_filters.update({dimension.fieldname: filters.get(dimension.fieldname)})
 
-	gle = frappe.db.sql(
-		"""
-		select
-			account, sum(debit) as opening_debit, sum(credit) as opening_credit
-		from `tabGL Entry`
-		where
-			company=%(company)s
-			{additional_conditions}
-			and (posting_date < %(from_date)s or (ifnull(is_opening, 'No') = 'Yes' and posting_date <= %(to_date)s))
-			and account in (select name from `tabAccount` where report_type=%(report_type)s)
-			and is_cancelled = 0
-		group by account""".format(
-			additional_conditions=additional_conditions
-		),
-		query_filters,
-		as_dict=True,
-	)
-
 	opening = frappe._dict()
-	for d in gle:
-		opening.setdefault(d.account, d)
+	for table, source_condition in get_gl_balance_sources(filters.to_date, start_dates=start_dates):
+		gle = frappe.db.sql(
+			"""
+			select
+				account, sum(debit) as opening_debit, sum(credit) as opening_credit
+			from {table}
+			where
+				company=%(company)s
+				{additional_conditions}
+				and (posting_date < %(from_date)s or (ifnull(is_opening, 'No') = 'Yes' and posting_date <= %(to_date)s))
+				and account in (select name from `tabAccount` where report_type=%(report_type)s)
+				and {source_condition}
+			group by account""".format(
+				table=table, source_condition=source_condition, additional_conditions=additional_conditions
+			),
+			query_filters,
+			as_dict=True,
+		)
+
+		for d in gle:
+			if d.account in opening:
+				opening[d.account].opening_debit += d.opening_debit
+				opening[d.account].opening_credit += d.opening_credit
+			else:
+				opening[d.account] = d
 
 	return opening
 
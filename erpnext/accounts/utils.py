@@ -2,8 +2,9 @@
 # License: GNU General Public License v3. See license.txt
 
 
+from collections import defaultdict
 from json import loads
-from typing import TYPE_CHECKING, List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple
 
 import frappe
 import frappe.defaults
@@ -26,6 +27,18 @@ import erpnext
 
 # imported to enable erpnext.accounts.utils.get_account_currency
 from erpnext.accounts.doctype.account.account import get_account_currency  # noqa
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	get_gl_balance_sources,
+	remove_account_period_balance,
+)
+from erpnext.accounts.doctype.budget_consumption.budget_consumption import (
+	remove_budget_consumption,
+)
+from erpnext.accounts.doctype.party_voucher_outstanding.party_voucher_outstanding import (
+	get_party_gl_entries,
+	remove_party_voucher_outstanding,
+	update_party_voucher_outstanding,
+)
 from erpnext.stock import get_warehouse_account_map
 from erpnext.stock.utils import get_stock_value_on
 
@@ -175,7 +188,8 @@ def get_balance_on(
 	if not cost_center and frappe.form_dict.get("cost_center"):
 		cost_center = frappe.form_dict.get("cost_center")
 
-	cond = ["is_cancelled=0"]
+	cond = []
+	to_date = date
 	if date:
 		cond.append("posting_date <= %s" % frappe.db.escape(cstr(date)))
 	else:
@@ -257,17 +271,29 @@ def get_balance_on(
 			select_field = "sum(debit_in_account_currency) - sum(credit_in_account_currency)"
 		else:
 			select_field = "sum(debit) - sum(credit)"
-		bal = frappe.db.sql(
-			"""
-			SELECT {0}
-			FROM `tabGL Entry` gle
-			WHERE {1}""".format(
-				select_field, " and ".join(cond)
+
+		if party_type and party:
+			# balances are not kept per party
+			sources = [("`tabGL Entry`", "is_cancelled = 0")]
+		else:
+			sources = get_gl_balance_sources(
+				to_date, start_dates=[year_start_date] if report_type == "Profit and Loss" else None
+			)
+
+		bal = 0.0
+		for table, source_condition in sources:
+			bal += flt(
+				frappe.db.sql(
+					"""
+				SELECT {0}
+				FROM {1} gle
+				WHERE {2}""".format(
+						select_field, table, " and ".join([source_condition] + cond)
+					)
+				)[0][0]
 			)
-		)[0][0]
 
-		# if bal is None, return 0
-		return flt(bal)
+		return bal
 
 
 def get_count_on(account, fieldname, date):
@@ -646,6 +672,16 @@ def unlink_ref_doc_from_payment_entries(ref_doc):
 	remove_ref_doc_link_from_jv(ref_doc.doctype, ref_doc.name)
 	remove_ref_doc_link_from_pe(ref_doc.doctype, ref_doc.name)
 
+	# unlinked payments are considered as advances in outstanding of their own voucher
+	gl_entries = get_party_gl_entries(
+		{
+			"against_voucher_type": ref_doc.doctype,
+			"against_voucher": ref_doc.name,
+			"voucher_no": ("!=", ref_doc.name),
+		}
+	)
+	update_party_voucher_outstanding(gl_entries, cancel=True)
+
 	frappe.db.sql(
 		"""update `tabGL Entry`
 		set against_voucher_type=null, against_voucher=null,
@@ -655,6 +691,10 @@ def unlink_ref_doc_from_payment_entries(ref_doc):
 		(now(), frappe.session.user, ref_doc.doctype, ref_doc.name),
 	)
 
+	for gle in gl_entries:
+		gle.against_voucher_type = gle.against_voucher = None
+	update_party_voucher_outstanding(gl_entries)
+
 	if ref_doc.doctype in ("Sales Invoice", "Purchase Invoice"):
 		ref_doc.set("advances", [])
 
@@ -1190,7 +1230,13 @@ def repost_gle_for_stock_vouchers(
 	company: Optional[str] = None,
 	warehouse_account=None,
 	repost_doc: Optional["RepostItemValuation"] = None,
+	affected_vouchers: Optional[Set[Tuple[str, str]]] = None,
 ):
+	"""Repost GL entries of stock vouchers.
+
+	If `affected_vouchers` is passed, only those are rebuilt. Other vouchers are
+	verified by comparing stock value with GL balance of stock accounts in SQL
+	and only rebuilt if they don't match."""
 	if not stock_vouchers:
 		return
 
@@ -1205,10 +1251,17 @@ def repost_gle_for_stock_vouchers(
 		stock_vouchers = stock_vouchers[cint(repost_doc.gl_reposting_index) :]
 
 	for stock_vouchers_chunk in create_batch(stock_vouchers, GL_REPOSTING_CHUNK):
-		gle = get_voucherwise_gl_entries(stock_vouchers_chunk, posting_date)
-		for voucher_type, voucher_no in stock_vouchers_chunk:
+		vouchers_to_repost = stock_vouchers_chunk
+		if affected_vouchers is not None:
+			vouchers_to_repost = get_vouchers_to_repost(
+				stock_vouchers_chunk, affected_vouchers, warehouse_account, precision
+			)
+
+		gle = get_voucherwise_gl_entries(vouchers_to_repost, posting_date)
+		for voucher_type, voucher_no in vouchers_to_repost:
 			existing_gle = gle.get((voucher_type, voucher_no), [])
-			voucher_obj = frappe.get_doc(voucher_type, voucher_no)
+			# lock voucher, same voucher can be reposted by parallel reposting jobs
+			voucher_obj = frappe.get_doc(voucher_type, voucher_no, for_update=True)
 			expected_gle = voucher_obj.get_gl_entries(warehouse_account)
 			if expected_gle:
 				if not existing_gle or not compare_existing_and_expected_gle(
@@ -1228,7 +1281,68 @@ def repost_gle_for_stock_vouchers(
 			)
 
 
+def get_vouchers_to_repost(stock_vouchers, affected_vouchers, warehouse_account, precision):
+	unaffected_vouchers = [v for v in stock_vouchers if v not in affected_vouchers]
+	mismatched_vouchers = set(
+		get_vouchers_with_mismatched_stock_gle(unaffected_vouchers, warehouse_account, precision)
+	)
+
+	return [v for v in stock_vouchers if v in affected_vouchers or v in mismatched_vouchers]
+
+
+def get_vouchers_with_mismatched_stock_gle(stock_vouchers, warehouse_account, precision):
+	"""Get vouchers where stock value as per SLE doesn't match balance of stock accounts in GL.
+
+	Compares aggregates per voucher and account, so it is much cheaper than
+	regenerating GL entries of each voucher."""
+	if not stock_vouchers:
+		return []
+
+	voucher_nos = list({voucher_no for _, voucher_no in stock_vouchers})
+	placeholders = ", ".join(["%s"] * len(voucher_nos))
+
+	expected_balance = defaultdict(float)
+	for voucher_type, voucher_no, warehouse, stock_value_difference in frappe.db.sql(
+		"""
+		select voucher_type, voucher_no, warehouse, sum(stock_value_difference)
+		from `tabStock Ledger Entry`
+		where voucher_no in ({0}) and is_cancelled = 0
+		group by voucher_type, voucher_no, warehouse""".format(
+			placeholders
+		),
+		tuple(voucher_nos),
+	):
+		if warehouse in warehouse_account:
+			account = warehouse_account[warehouse].account
+			expected_balance[(voucher_type, voucher_no, account)] += flt(stock_value_difference)
+
+	stock_accounts = list({d.account for d in warehouse_account.values()})
+	actual_balance = {}
+	if stock_accounts:
+		for voucher_type, voucher_no, account, balance in frappe.db.sql(
+			"""
+			select voucher_type, voucher_no, account, sum(debit) - sum(credit)
+			from `tabGL Entry`
+			where voucher_no in ({0}) and account in ({1}) and is_cancelled = 0
+			group by voucher_type, voucher_no, account""".format(
+				placeholders, ", ".join(["%s"] * len(stock_accounts))
+			),
+			tuple(voucher_nos + stock_accounts),
+		):
+			actual_balance[(voucher_type, voucher_no, account)] = flt(balance)
+
+	mismatched_vouchers = set()
+	for key in set(expected_balance) | set(actual_balance):
+		if flt(expected_balance.get(key), precision) != flt(actual_balance.get(key), precision):
+			mismatched_vouchers.add(key[:2])
+
+	return [v for v in stock_vouchers if v in mismatched_vouchers]
+
+
 def _delete_gl_entries(voucher_type, voucher_no):
+	remove_party_voucher_outstanding(voucher_type, voucher_no)
+	remove_account_period_balance(voucher_type, voucher_no)
+	remove_budget_consumption(voucher_type, voucher_no)
 	frappe.db.sql(
 		"""delete from `tabGL Entry`
 		where voucher_type=%s and voucher_no=%s""",
@@ -7,6 +7,7 @@ from frappe import _
 from frappe.utils import (
 	add_months,
 	cint,
+	create_batch,
 	flt,
 	get_first_day,
 	get_last_day,
@@ -21,6 +22,10 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_checks_for_pl_and_bs_accounts,
 )
 
+# assets booked together by one background job when depreciation entries are consolidated,
+# also limits the number of rows in a consolidated journal entry
+DEPRECIATION_CHUNK_SIZE = 500
+
 
 def post_depreciation_entries(date=None):
 	# Return if automatic booking of asset depreciation is disabled
@@ -32,6 +37,10 @@ def post_depreciation_entries(date=None):
 	if not date:
 		date = today()
 
+	if cint(frappe.db.get_single_value("Accounts Settings", "consolidate_depreciation_entries")):
+		enqueue_consolidated_depreciation_entries(date)
+		return
+
 	failed_asset_names = []
 	error_log_names = []
 
@@ -99,38 +108,14 @@ def make_depreciation_entry(asset_name, date=None):
 				accumulated_depreciation_account, depreciation_expense_account
 			)
 
-			credit_entry = {
-				"account": credit_account,
-				"credit_in_account_currency": d.depreciation_amount,
-				"reference_type": "Asset",
-				"reference_name": asset.name,
-				"cost_center": depreciation_cost_center,
-			}
-
-			debit_entry = {
-				"account": debit_account,
-				"debit_in_account_currency": d.depreciation_amount,
-				"reference_type": "Asset",
-				"reference_name": asset.name,
-				"cost_center": depreciation_cost_center,
-			}
-
-			for dimension in accounting_dimensions:
-				if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_bs"):
-					credit_entry.update(
-						{
-							dimension["fieldname"]: asset.get(dimension["fieldname"])
-							or dimension.get("default_dimension")
-						}
-					)
-
-				if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_pl"):
-					debit_entry.update(
-						{
-							dimension["fieldname"]: asset.get(dimension["fieldname"])
-							or dimension.get("default_dimension")
-						}
-					)
+			credit_entry, debit_entry = get_depreciation_entry_rows(
+				asset,
+				d.depreciation_amount,
+				credit_account,
+				debit_account,
+				depreciation_cost_center,
+				accounting_dimensions,
+			)
 
 			je.append("accounts", credit_entry)
 
@@ -156,6 +141,265 @@ def make_depreciation_entry(asset_name, date=None):
 	return asset
 
 
+def get_depreciation_entry_rows(
+	asset, depreciation_amount, credit_account, debit_account, cost_center, accounting_dimensions
+):
+	credit_entry = {
+		"account": credit_account,
+		"credit_in_account_currency": depreciation_amount,
+		"reference_type": "Asset",
+		"reference_name": asset.name,
+		"cost_center": cost_center,
+	}
+
+	debit_entry = {
+		"account": debit_account,
+		"debit_in_account_currency": depreciation_amount,
+		"reference_type": "Asset",
+		"reference_name": asset.name,
+		"cost_center": cost_center,
+	}
+
+	for dimension in accounting_dimensions:
+		if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_bs"):
+			credit_entry.update(
+				{
+					dimension["fieldname"]: asset.get(dimension["fieldname"])
+					or dimension.get("default_dimension")
+				}
+			)
+
+		if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_pl"):
+			debit_entry.update(
+				{
+					dimension["fieldname"]: asset.get(dimension["fieldname"])
+					or dimension.get("default_dimension")
+				}
+			)
+
+	return credit_entry, debit_entry
+
+
+def enqueue_consolidated_depreciation_entries(date):
+	"""Book due depreciation in chunks of assets, one background job per chunk.
+
+	Schedule rows are linked to their journal entry as each one is committed, so assets
+	left out by a failed or interrupted job are picked again by the next run."""
+	for asset_names in create_batch(get_depreciable_assets(date), DEPRECIATION_CHUNK_SIZE):
+		frappe.enqueue(
+			make_consolidated_depreciation_entries,
+			queue="long",
+			timeout=3000,
+			asset_names=asset_names,
+			date=date,
+		)
+
+
+def make_consolidated_depreciation_entries(asset_names, date):
+	"""Book due depreciation of the assets in journal entries consolidated by company,
+	finance book, posting date and accounts, with rows for each asset referencing it.
+
+	Each journal entry is committed on its own. If one fails, its assets are booked one by one
+	with `make_depreciation_entry`, so that only the assets that fail are left out."""
+	failed_asset_names = []
+	error_log_names = []
+	booked_asset_names = set()
+	accounting_dimensions = get_checks_for_pl_and_bs_accounts()
+
+	assets = get_assets_for_depreciation(asset_names, accounting_dimensions)
+	schedules_by_entry = {}
+	depreciation_accounts = {}
+
+	for d in get_due_depreciation_schedules(asset_names, date):
+		asset = assets[d.parent]
+		accounts_key = (asset.asset_category, asset.company)
+		try:
+			if accounts_key not in depreciation_accounts:
+				accounts = get_depreciation_accounts(asset)
+				depreciation_accounts[accounts_key] = get_credit_and_debit_accounts(accounts[1], accounts[2])
+		except Exception as e:
+			if asset.name not in failed_asset_names:
+				failed_asset_names.append(asset.name)
+				error_log_names.append(frappe.log_error(e).name)
+			continue
+
+		credit_account, debit_account = depreciation_accounts[accounts_key]
+		key = (asset.company, d.finance_book, d.schedule_date, credit_account, debit_account)
+		schedules_by_entry.setdefault(key, []).append(d)
+
+	for key, schedules in schedules_by_entry.items():
+		schedules = [d for d in schedules if d.parent not in booked_asset_names]
+		try:
+			make_consolidated_depreciation_entry(key, schedules, assets, accounting_dimensions)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			for asset_name in {d.parent for d in schedules}:
+				booked_asset_names.add(asset_name)
+				try:
+					make_depreciation_entry(asset_name, date)
+					frappe.db.commit()
+				except Exception as e:
+					frappe.db.rollback()
+					failed_asset_names.append(asset_name)
+					error_log_names.append(frappe.log_error(e).name)
+
+	if failed_asset_names:
+		set_depr_entry_posting_status_for_failed_assets(failed_asset_names)
+		notify_depr_entry_posting_error(failed_asset_names, error_log_names)
+
+	frappe.db.commit()
+
+
+def get_assets_for_depreciation(asset_names, accounting_dimensions):
+	meta = frappe.get_meta("Asset")
+	fields = [
+		"name",
+		"company",
+		"asset_category",
+		"cost_center",
+		"docstatus",
+		"status",
+		"calculate_depreciation",
+		"journal_entry_for_scrap",
+		"gross_purchase_amount",
+		"value_after_depreciation",
+		"default_finance_book",
+	]
+	for dimension in accounting_dimensions:
+		if meta.has_field(dimension["fieldname"]) and dimension["fieldname"] not in fields:
+			fields.append(dimension["fieldname"])
+
+	return {
+		d.name: d for d in frappe.get_all("Asset", filters={"name": ("in", asset_names)}, fields=fields)
+	}
+
+
+def get_due_depreciation_schedules(asset_names, date):
+	return frappe.get_all(
+		"Depreciation Schedule",
+		filters={
+			"parent": ("in", asset_names),
+			"parenttype": "Asset",
+			"schedule_date": ("<=", date),
+			"journal_entry": ("is", "not set"),
+		},
+		fields=[
+			"name",
+			"parent",
+			"schedule_date",
+			"depreciation_amount",
+			"finance_book",
+			"finance_book_id",
+		],
+		order_by="schedule_date, parent, idx",
+	)
+
+
+def make_consolidated_depreciation_entry(key, schedules, assets, accounting_dimensions):
+	company, finance_book, posting_date, credit_account, debit_account = key
+
+	if not schedules:
+		return
+
+	# rows booked by another run after they were fetched are left out
+	unbooked_schedules = frappe.db.sql_list(
+		"""select name from `tabDepreciation Schedule`
+		where name in %s and ifnull(journal_entry, '') = ''
+		for update""",
+		[tuple(d.name for d in schedules)],
+	)
+	schedules = [d for d in schedules if d.name in unbooked_schedules]
+	if not schedules:
+		return
+
+	depreciation_cost_center, depreciation_series = frappe.get_cached_value(
+		"Company", company, ["depreciation_cost_center", "series_for_depreciation_entry"]
+	)
+
+	je = frappe.new_doc("Journal Entry")
+	je.voucher_type = "Depreciation Entry"
+	je.naming_series = depreciation_series
+	je.posting_date = posting_date
+	je.company = company
+	je.finance_book = finance_book
+	je.remark = "Depreciation Entry against {0} assets worth {1}".format(
+		len({d.parent for d in schedules}), sum(flt(d.depreciation_amount) for d in schedules)
+	)
+
+	for d in schedules:
+		asset = assets[d.parent]
+		credit_entry, debit_entry = get_depreciation_entry_rows(
+			asset,
+			d.depreciation_amount,
+			credit_account,
+			debit_account,
+			asset.cost_center or depreciation_cost_center,
+			accounting_dimensions,
+		)
+		je.append("accounts", credit_entry)
+		je.append("accounts", debit_entry)
+
+	je.flags.ignore_permissions = True
+	je.flags.planned_depr_entry = True
+	je.save()
+
+	frappe.db.sql(
+		"""update `tabDepreciation Schedule` set journal_entry = %s where name in %s""",
+		(je.name, tuple(d.name for d in schedules)),
+	)
+
+	asset_names = list({d.parent for d in schedules})
+	finance_books = get_asset_finance_books(asset_names)
+
+	if not je.meta.get_workflow():
+		je.submit()
+		for d in schedules:
+			finance_book_row = finance_books[d.parent][cint(d.finance_book_id) - 1]
+			finance_book_row.value_after_depreciation -= flt(d.depreciation_amount)
+			frappe.db.sql(
+				"""update `tabAsset Finance Book`
+				set value_after_depreciation = value_after_depreciation - %s
+				where name = %s""",
+				(flt(d.depreciation_amount), finance_book_row.name),
+			)
+
+	for asset_name in asset_names:
+		set_depreciation_status(assets[asset_name], finance_books[asset_name])
+
+
+def get_asset_finance_books(asset_names):
+	finance_books = {}
+	for d in frappe.get_all(
+		"Asset Finance Book",
+		filters={"parent": ("in", asset_names), "parenttype": "Asset"},
+		fields=[
+			"name",
+			"parent",
+			"idx",
+			"finance_book",
+			"expected_value_after_useful_life",
+			"value_after_depreciation",
+		],
+		order_by="parent, idx",
+	):
+		finance_books.setdefault(d.parent, []).append(d)
+
+	return finance_books
+
+
+def set_depreciation_status(asset, finance_books):
+	"""Set status of the asset as `Asset.set_status` would, without loading the Asset doc"""
+	asset_doc = frappe.get_doc(
+		dict(asset, doctype="Asset", finance_books=[dict(d) for d in finance_books])
+	)
+	frappe.db.set_value(
+		"Asset",
+		asset.name,
+		{"status": asset_doc.get_status(), "depr_entry_posting_status": "Successful"},
+	)
+
+
 def get_depreciation_accounts(asset):
 	fixed_asset_account = accumulated_depreciation_account = depreciation_expense_account = None
 
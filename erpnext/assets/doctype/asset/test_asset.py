@@ -20,6 +20,7 @@ from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import make
 from erpnext.assets.doctype.asset.asset import make_sales_invoice, update_maintenance_status
 from erpnext.assets.doctype.asset.depreciation import (
 	is_last_day_of_the_month,
+	make_consolidated_depreciation_entries,
 	post_depreciation_entries,
 	restore_asset,
 	scrap_asset,
@@ -241,6 +242,58 @@ class TestAsset(AssetSetup):
 
 		self.assertEquals(accumulated_depr_amount, 18000.0 + this_month_depr_amount)
 
+	def test_consolidated_depreciation_entries(self):
+		purchase_date = add_months(get_first_day(nowdate()), -2)
+		assets = [
+			create_asset(
+				calculate_depreciation=1,
+				available_for_use_date=purchase_date,
+				purchase_date=purchase_date,
+				expected_value_after_useful_life=10000,
+				total_number_of_depreciations=10,
+				frequency_of_depreciation=1,
+				submit=1,
+			)
+			for i in range(2)
+		]
+		asset_names = [asset.name for asset in assets]
+
+		make_consolidated_depreciation_entries(asset_names, add_months(purchase_date, 2))
+
+		journal_entries = set()
+		for asset in assets:
+			asset.load_from_db()
+			accumulated_depr_amount = flt(
+				asset.gross_purchase_amount - asset.finance_books[0].value_after_depreciation,
+				asset.precision("gross_purchase_amount"),
+			)
+			self.assertEqual(accumulated_depr_amount, 18000.0)
+			self.assertEqual(asset.status, "Partially Depreciated")
+			self.assertEqual(asset.depr_entry_posting_status, "Successful")
+			journal_entries.update(d.journal_entry for d in asset.schedules if d.journal_entry)
+
+		# both assets are booked in the same journal entry for each schedule date
+		for journal_entry in journal_entries:
+			self.assertEqual(
+				set(
+					frappe.get_all(
+						"Journal Entry Account",
+						filters={"parent": journal_entry, "reference_type": "Asset"},
+						pluck="reference_name",
+					)
+				),
+				set(asset_names),
+			)
+
+		# booked schedules are not booked again
+		make_consolidated_depreciation_entries(asset_names, add_months(purchase_date, 2))
+		self.assertEqual(
+			frappe.db.count(
+				"Journal Entry Account", {"reference_type": "Asset", "reference_name": ("in", asset_names)}
+			),
+			4 * len(journal_entries),
+		)
+
 	def test_gle_made_by_asset_sale(self):
 		date = nowdate()
 		purchase_date = add_months(get_first_day(date), -2)
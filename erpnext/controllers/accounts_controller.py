@@ -55,6 +55,7 @@ from erpnext.stock.get_item_details import (
 	get_item_details,
 	get_item_tax_map,
 	get_item_warehouse,
+	get_items_details,
 )
 from erpnext.utilities.transaction_base import TransactionBase
 
@@ -506,26 +507,45 @@ class AccountsController(TransactionBase):
 			):
 				parent_dict.update({"customer": parent_dict.get("party_name")})
 
-			self.pricing_rules = []
-			for item in self.get("items"):
-				if item.get("item_code"):
-					args = parent_dict.copy()
-					args.update(item.as_dict())
-
-					args["doctype"] = self.doctype
-					args["name"] = self.name
-					args["child_docname"] = item.name
-					args["ignore_pricing_rule"] = (
-						self.ignore_pricing_rule if hasattr(self, "ignore_pricing_rule") else 0
-					)
+			def get_item_args(item):
+				args = parent_dict.copy()
+				args.update(item.as_dict())
+
+				args["doctype"] = self.doctype
+				args["name"] = self.name
+				args["child_docname"] = item.name
+				args["ignore_pricing_rule"] = (
+					self.ignore_pricing_rule if hasattr(self, "ignore_pricing_rule") else 0
+				)
+
+				if not args.get("transaction_date"):
+					args["transaction_date"] = args.get("posting_date")
 
-					if not args.get("transaction_date"):
-						args["transaction_date"] = args.get("posting_date")
+				if self.get("is_subcontracted"):
+					args["is_subcontracted"] = self.is_subcontracted
 
-					if self.get("is_subcontracted"):
-						args["is_subcontracted"] = self.is_subcontracted
+				return args
 
-					ret = get_item_details(args, self, for_validate=True, overwrite_warehouse=False)
+			# details of all rows are fetched together
+			rows = [item for item in self.get("items") if item.get("item_code")]
+			items_details = get_items_details(
+				parent_dict,
+				[get_item_args(item) for item in rows],
+				self,
+				for_validate=True,
+				overwrite_warehouse=False,
+			)
+			row_details = {id(item): ret for item, ret in zip(rows, items_details)}
+
+			self.pricing_rules = []
+			for item in self.get("items"):
+				if item.get("item_code"):
+					ret = row_details.get(id(item))
+					if ret is None:
+						# row added while applying pricing rules, e.g. a free item
+						ret = get_item_details(
+							get_item_args(item), self, for_validate=True, overwrite_warehouse=False
+						)
 
 					for fieldname, value in ret.items():
 						if item.meta.get_field(fieldname) and value is not None:
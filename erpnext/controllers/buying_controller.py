@@ -7,7 +7,7 @@ from frappe import ValidationError, _, msgprint
 from frappe.contacts.doctype.address.address import render_address
 from frappe.utils import cint, cstr, flt, getdate
 
-from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
+from erpnext.accounts.doctype.budget.budget import validate_expenses_against_budget
 from erpnext.accounts.party import get_party_details
 from erpnext.buying.utils import update_last_purchase_rate, validate_for_items
 from erpnext.controllers.sales_and_purchase_return import get_rate_for_return
@@ -636,6 +636,7 @@ class BuyingController(StockController, Subcontracting):
 
 	def validate_budget(self):
 		if self.docstatus == 1:
+			items = []
 			for data in self.get("items"):
 				args = data.as_dict()
 				args.update(
@@ -647,8 +648,9 @@ class BuyingController(StockController, Subcontracting):
 						),
 					}
 				)
+				items.append(args)
 
-				validate_expense_against_budget(args)
+			validate_expenses_against_budget(items)
 
 	def process_fixed_asset(self):
 		if self.doctype == "Purchase Invoice" and not self.update_stock:
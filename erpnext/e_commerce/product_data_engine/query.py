@@ -5,7 +5,7 @@ import frappe
 from frappe.utils import flt
 
 from erpnext.e_commerce.doctype.item_review.item_review import get_customer
-from erpnext.e_commerce.shopping_cart.product_info import get_product_info_for_website
+from erpnext.e_commerce.shopping_cart.product_info import get_product_prices_for_website
 from erpnext.utilities.product import get_non_stock_item_status
 
 
@@ -222,28 +222,36 @@ class ProductQuery:
 
 	def add_display_details(self, result, discount_list, cart_items):
 		"""Add price and availability details in result."""
-		for item in result:
-			product_info = get_product_info_for_website(item.item_code, skip_quotation_creation=True).get(
-				"product_info"
-			)
+		item_codes = [item.item_code for item in result]
+		prices = get_product_prices_for_website(item_codes) if item_codes else {}
+		wished_items = self.get_wishlist_items(item_codes)
 
-			if product_info and product_info["price"]:
-				# update/mutate item and discount_list objects
-				self.get_price_discount_info(item, product_info["price"], discount_list)
+		if self.settings.show_stock_availability:
+			self.set_stock_availability(result)
 
-			if self.settings.show_stock_availability:
-				self.get_stock_availability(item)
+		for item in result:
+			price = prices.get(item.item_code)
+			if price:
+				# update/mutate item and discount_list objects
+				self.get_price_discount_info(item, price, discount_list)
 
 			item.in_cart = item.item_code in cart_items
-
-			item.wished = False
-			if frappe.db.exists(
-				"Wishlist Item", {"item_code": item.item_code, "parent": frappe.session.user}
-			):
-				item.wished = True
+			item.wished = item.item_code in wished_items
 
 		return result, discount_list
 
+	def get_wishlist_items(self, item_codes):
+		if not item_codes:
+			return set()
+
+		return set(
+			frappe.get_all(
+				"Wishlist Item",
+				filters={"item_code": ("in", item_codes), "parent": frappe.session.user},
+				pluck="item_code",
+			)
+		)
+
 	def get_price_discount_info(self, item, price_object, discount_list):
 		"""Modify item object and add price details."""
 		fields = ["formatted_mrp", "formatted_price", "price_list_rate"]
@@ -259,11 +267,41 @@ class ProductQuery:
 				"formatted_discount_rate"
 			)
 
-	def get_stock_availability(self, item):
+	def set_stock_availability(self, items):
+		"""Add stock details of all items, with their bins fetched together."""
+		item_codes = [item.item_code for item in items]
+		warehouses = list({item.website_warehouse for item in items if item.get("website_warehouse")})
+		if not item_codes:
+			return
+
+		is_stock_item = dict(
+			frappe.get_all(
+				"Item", filters={"name": ("in", item_codes)}, fields=["name", "is_stock_item"], as_list=1
+			)
+		)
+
+		actual_qty = {}
+		if warehouses:
+			for d in frappe.get_all(
+				"Bin",
+				filters={"item_code": ("in", item_codes), "warehouse": ("in", warehouses)},
+				fields=["item_code", "warehouse", "actual_qty"],
+			):
+				actual_qty[(d.item_code, d.warehouse)] = d.actual_qty
+
+		for item in items:
+			self.get_stock_availability(
+				item,
+				is_stock_item.get(item.item_code),
+				actual_qty.get((item.item_code, item.get("website_warehouse")), 0),
+			)
+
+	def get_stock_availability(self, item, is_stock_item=None, actual_qty=None):
 		"""Modify item object and add stock details."""
 		item.in_stock = False
 		warehouse = item.get("website_warehouse")
-		is_stock_item = frappe.get_cached_value("Item", item.item_code, "is_stock_item")
+		if is_stock_item is None:
+			is_stock_item = frappe.get_cached_value("Item", item.item_code, "is_stock_item")
 
 		if item.get("on_backorder"):
 			return
@@ -276,9 +314,10 @@ class ProductQuery:
 				item.in_stock = True
 		elif warehouse:
 			# stock item and has warehouse
-			actual_qty = frappe.db.get_value(
-				"Bin", {"item_code": item.item_code, "warehouse": item.get("website_warehouse")}, "actual_qty"
-			)
+			if actual_qty is None:
+				actual_qty = frappe.db.get_value(
+					"Bin", {"item_code": item.item_code, "warehouse": warehouse}, "actual_qty"
+				)
 			item.in_stock = bool(flt(actual_qty))
 
 	def get_cart_items(self):
@@ -238,6 +238,76 @@ class TestProductDataEngine(unittest.TestCase):
 		self.assertEqual(len(items), 1)
 		self.assertEqual(items[0].get("item_code"), "Test 12I Laptop")
 
+	def test_product_list_prices_and_wishlist(self):
+		"Test if prices of listed items are same as in product info."
+		from erpnext.e_commerce.doctype.website_item.test_website_item import (
+			make_web_item_price,
+			make_web_pricing_rule,
+		)
+		from erpnext.e_commerce.shopping_cart.product_info import get_product_info_for_website
+
+		make_web_item_price(item_code="Test 11I Laptop")
+		make_web_pricing_rule(
+			title="Test Pricing Rule for Test 11I Laptop",  # 10% discount
+			item_code="Test 11I Laptop",
+			selling=1,
+		)
+		make_web_item_price(item_code="Test 14I Laptop", price_list_rate=500)
+
+		setup_e_commerce_settings({"show_price": 1})
+		frappe.local.shopping_cart_settings = None
+
+		frappe.get_doc(
+			{
+				"doctype": "Wishlist Item",
+				"item_code": "Test 14I Laptop",
+				"parent": frappe.session.user,
+				"parenttype": "Wishlist",
+				"parentfield": "items",
+			}
+		).db_insert()
+
+		engine = ProductQuery()
+		engine.page_length = 10
+		result = engine.query(attributes={}, fields={}, search_term=None, start=0, item_group=None)
+		items = {item.item_code: item for item in result.get("items")}
+
+		for item_code in ("Test 11I Laptop", "Test 14I Laptop"):
+			price = get_product_info_for_website(item_code, skip_quotation_creation=True).product_info[
+				"price"
+			]
+			self.assertEqual(items[item_code].formatted_price, price.formatted_price)
+			self.assertEqual(items[item_code].price_list_rate, price.price_list_rate)
+
+		self.assertEqual(items["Test 11I Laptop"].discount_percent, 10)
+		self.assertTrue(items["Test 14I Laptop"].wished)
+		self.assertFalse(items["Test 11I Laptop"].wished)
+
+	def test_stale_item_prices_are_not_used(self):
+		"Test if prices cached before an Item Price was changed are read again."
+		from erpnext.e_commerce.doctype.website_item.test_website_item import make_web_item_price
+		from erpnext.stock.doctype.item_price.item_price import get_item_prices_cache_key
+		from erpnext.utilities.product import get_item_prices
+
+		item_price = make_web_item_price(item_code="Test 13I Laptop", price_list_rate=700)
+		item_price = frappe.get_doc("Item Price", item_price.name)
+		cache_key = get_item_prices_cache_key(item_price.price_list)
+
+		get_item_prices(item_price.price_list, ["Test 13I Laptop"])
+		stale = frappe.cache().hget(cache_key, "Test 13I Laptop")
+
+		item_price.price_list_rate += 50
+		item_price.save()
+		# cached by a concurrent request that read the prices before the change was committed
+		frappe.cache().hset(cache_key, "Test 13I Laptop", stale)
+
+		prices = get_item_prices(item_price.price_list, ["Test 13I Laptop"])
+		self.assertEqual(
+			[d["price_list_rate"] for d in prices["Test 13I Laptop"]], [item_price.price_list_rate]
+		)
+
+		item_price.delete()
+
 	def test_product_list_with_api(self):
 		"Test products listing using API."
 		from erpnext.e_commerce.api import get_product_filter_data
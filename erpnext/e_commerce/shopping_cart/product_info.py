@@ -12,6 +12,7 @@ from erpnext.e_commerce.shopping_cart.cart import _get_cart_quotation, _set_pric
 from erpnext.utilities.product import (
 	get_non_stock_item_status,
 	get_price,
+	get_prices,
 	get_web_item_qty_in_stock,
 )
 
@@ -82,6 +83,26 @@ def get_product_info_for_website(item_code, skip_quotation_creation=False):
 	return frappe._dict({"product_info": product_info, "cart_settings": cart_settings})
 
 
+def get_product_prices_for_website(item_codes):
+	"""Returns {item_code: price} of items, same as the price in `get_product_info_for_website`
+	without a cart quotation, resolved for all the items together."""
+	cart_settings = get_shopping_cart_settings()
+	if not (cart_settings.enabled and cart_settings.show_price):
+		return {}
+
+	# Show Price if logged in.
+	# If not logged in, check if price is hidden for guest.
+	if frappe.session.user == "Guest" and cart_settings.hide_price_for_guest:
+		return {}
+
+	return get_prices(
+		item_codes,
+		_set_price_list(cart_settings, None),
+		cart_settings.default_customer_group,
+		cart_settings.company,
+	)
+
+
 def set_product_info_for_website(item):
 	"""set product price uom for website"""
 	product_info = get_product_info_for_website(item.item_code, skip_quotation_creation=True).get(
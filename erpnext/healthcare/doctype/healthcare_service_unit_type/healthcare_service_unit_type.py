@@ -7,6 +7,8 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.model.rename_doc import rename_doc
 
+from erpnext.stock.doctype.item_price.item_price import clear_item_prices_cache
+
 
 class HealthcareServiceUnitType(Document):
 	def validate(self):
@@ -65,6 +67,7 @@ class HealthcareServiceUnitType(Document):
 					make_item_price(self.item_code, price_list_name, 0.0)
 			else:
 				frappe.db.set_value("Item Price", item_price, "price_list_rate", self.rate)
+				clear_item_prices_cache(frappe.db.get_value("Item Price", item_price, "price_list"))
 
 			frappe.db.set_value(self.doctype, self.name, "change_in_item", 0)
 		elif not self.is_billable and self.item:
@@ -446,6 +446,20 @@ doc_events = {
 	"Integration Request": {
 		"validate": "erpnext.accounts.doctype.payment_request.payment_request.validate_payment"
 	},
+	(
+		"Account",
+		"Cost Center",
+		"Item Group",
+		"Customer Group",
+		"Territory",
+		"Supplier Group",
+		"Warehouse",
+		"Sales Person",
+	): {
+		"on_update": "erpnext.utilities.tree_index.clear_tree_index",
+		"after_rename": "erpnext.utilities.tree_index.clear_tree_index",
+		"on_trash": "erpnext.utilities.tree_index.clear_tree_index",
+	},
 }
 
 # On cancel event Payment Entry will be exempted and all linked submittable doctype will get cancelled.
@@ -530,6 +544,7 @@ scheduler_events = {
 		"erpnext.loan_management.doctype.process_loan_security_shortfall.process_loan_security_shortfall.create_process_loan_security_shortfall",
 		"erpnext.loan_management.doctype.process_loan_interest_accrual.process_loan_interest_accrual.process_loan_interest_accrual_for_term_loans",
 		"erpnext.crm.doctype.lead.lead.daily_open_lead",
+		"erpnext.stock.doctype.stock_closing_balance.stock_closing_balance.update_stock_closing_balances",
 	],
 	"weekly": ["erpnext.hr.doctype.employee.employee_reminders.send_reminders_in_advance_weekly"],
 	"monthly": ["erpnext.hr.doctype.employee.employee_reminders.send_reminders_in_advance_monthly"],
@@ -608,6 +623,7 @@ accounting_dimension_doctypes = [
 	"Purchase Order",
 	"Purchase Receipt",
 	"Sales Order",
+	"Account Period Balance",
 ]
 
 regional_overrides = {
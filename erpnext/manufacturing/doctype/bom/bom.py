@@ -10,6 +10,7 @@ from typing import Dict, List
 import frappe
 from frappe import _
 from frappe.core.doctype.version.version import get_diff
+from frappe.model import default_fields
 from frappe.model.mapper import get_mapped_doc
 from frappe.utils import cint, cstr, flt, today
 from frappe.website.website_generator import WebsiteGenerator
@@ -18,6 +19,7 @@ import erpnext
 from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.item.item import get_item_details
 from erpnext.stock.get_item_details import get_conversion_factor, get_price_list_rate
+from erpnext.utilities.child_table import bulk_insert_child_rows
 
 form_grid_templates = {"items": "templates/form_grid/item_grid.html"}
 
@@ -703,6 +705,7 @@ class BOM(WebsiteGenerator):
 	def calculate_exploded_cost(self):
 		"Set exploded row cost from it's parent BOM."
 		rm_rate_map = self.get_rm_rate_map()
+		rate_changed = False
 
 		for row in self.get("exploded_items"):
 			old_rate = flt(row.rate)
@@ -710,8 +713,11 @@ class BOM(WebsiteGenerator):
 			row.amount = flt(row.stock_qty) * flt(row.rate)
 
 			if old_rate != row.rate:
-				# Only db_update if changed
-				row.db_update()
+				rate_changed = True
+
+		if rate_changed:
+			# Only rewrite if changed
+			self.db_insert_exploded_items()
 
 	def get_rm_rate_map(self) -> Dict[str, float]:
 		"Create Raw Material-Rate map for Exploded Items. Fetch rate from Items table or Subassembly BOM."
@@ -819,11 +825,9 @@ class BOM(WebsiteGenerator):
 
 	def add_exploded_items(self, save=True):
 		"Add items to Flat BOM table"
+		existing_rows = {d.item_code: d for d in self.get("exploded_items")}
 		self.set("exploded_items", [])
 
-		if save:
-			frappe.db.sql("""delete from `tabBOM Explosion Item` where parent=%s""", self.name)
-
 		for d in sorted(self.cur_exploded_items, key=itemgetter(0)):
 			ch = self.append("exploded_items", {})
 			for i in self.cur_exploded_items[d].keys():
@@ -832,8 +836,48 @@ class BOM(WebsiteGenerator):
 			ch.qty_consumed_per_unit = flt(ch.stock_qty) / flt(self.quantity)
 			ch.docstatus = self.docstatus
 
-			if save:
-				ch.db_insert()
+		if not save:
+			return
+
+		if self.exploded_items_changed(existing_rows):
+			self.db_insert_exploded_items()
+		else:
+			# Flat BOM is unchanged, keep the rows saved in the database
+			self.set("exploded_items", list(existing_rows.values()))
+
+	def exploded_items_changed(self, existing_rows):
+		"Check if any field of any row of the Flat BOM differs from `existing_rows`."
+		if len(existing_rows) != len(self.exploded_items):
+			return True
+
+		for row in self.exploded_items:
+			existing_row = existing_rows.get(row.item_code)
+			if not existing_row:
+				return True
+
+			for field in row.meta.get_valid_columns():
+				if field in default_fields and field != "docstatus":
+					continue
+
+				df = row.meta.get_field(field)
+				if df and df.fieldtype in ("Float", "Currency", "Percent"):
+					changed = flt(row.get(field), row.precision(field)) != flt(
+						existing_row.get(field), row.precision(field)
+					)
+				elif df and df.fieldtype in ("Check", "Int"):
+					changed = cint(row.get(field)) != cint(existing_row.get(field))
+				else:
+					changed = cstr(row.get(field)) != cstr(existing_row.get(field))
+
+				if changed:
+					return True
+
+		return False
+
+	def db_insert_exploded_items(self):
+		"Replace Flat BOM rows in the database, inserting all rows at once."
+		frappe.db.sql("""delete from `tabBOM Explosion Item` where parent=%s""", self.name)
+		bulk_insert_child_rows(self.exploded_items)
 
 	def validate_bom_links(self):
 		if not self.is_active:
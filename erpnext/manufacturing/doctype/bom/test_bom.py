@@ -583,6 +583,44 @@ class TestBOM(FrappeTestCase):
 		bom.submit()
 		self.assertEqual(bom.exploded_items[0].rate, bom.items[0].base_rate)
 
+	def test_exploded_items_rewritten_only_on_change(self):
+		rm_item = make_item(properties={"is_stock_item": 1, "valuation_rate": 99}).name
+		fg_item = make_item(properties={"is_stock_item": 1}).name
+
+		from erpnext.manufacturing.doctype.production_plan.test_production_plan import make_bom
+
+		bom = make_bom(item=fg_item, raw_materials=[rm_item], rm_qty=2)
+
+		def get_exploded_rows():
+			return frappe.get_all(
+				"BOM Explosion Item",
+				filters={"parent": bom.name},
+				fields=["name", "item_code", "stock_qty", "rate"],
+			)
+
+		rows = get_exploded_rows()
+		bom.load_from_db()
+		bom.update_exploded_items()
+		self.assertEqual(get_exploded_rows(), rows)
+
+		bom.items[0].base_rate = 150
+		bom.update_exploded_items()
+		new_rows = get_exploded_rows()
+		self.assertEqual(len(new_rows), 1)
+		self.assertNotEqual(new_rows[0].name, rows[0].name)
+		self.assertEqual(new_rows[0].rate, 150)
+		self.assertEqual(new_rows[0].stock_qty, 2)
+
+		# rows are rewritten when only the source warehouse changes
+		bom.load_from_db()
+		bom.items[0].base_rate = 150
+		bom.items[0].source_warehouse = "_Test Warehouse 1 - _TC"
+		bom.update_exploded_items()
+		self.assertEqual(
+			frappe.db.get_value("BOM Explosion Item", {"parent": bom.name}, "source_warehouse"),
+			"_Test Warehouse 1 - _TC",
+		)
+
 	def test_bom_cost_update_flag(self):
 		rm_item = make_item(
 			properties={"is_stock_item": 1, "valuation_rate": 99, "last_purchase_rate": 89}
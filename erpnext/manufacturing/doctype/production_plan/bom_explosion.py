@@ -0,0 +1,241 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from typing import Dict, Iterable, List, Optional
+
+import frappe
+from frappe.query_builder.functions import IfNull
+from frappe.utils import cint, flt
+
+from erpnext.utilities.tree_index import is_descendant
+
+
+class BOMExplosion:
+	"""Explodes BOMs for production planning.
+
+	The BOM graph is walked level by level, fetching the items of all BOMs of a level in one
+	query. Raw materials per unit of each BOM are memoised, so BOMs shared by many assemblies
+	or sales orders are exploded only once."""
+
+	def __init__(self, company: Optional[str] = None) -> None:
+		self.company = company
+		self.bom_items: Dict[str, List] = {}
+		self.raw_materials: Dict[tuple, Dict] = {}
+
+	def load(self, bom_nos: Iterable[str], sub_bom_field: str = "default_bom") -> None:
+		"Fetch items of `bom_nos` and BOMs below them, one query per level of the BOM tree."
+		level = {bom_no for bom_no in bom_nos if bom_no}
+
+		while level:
+			level -= set(self.bom_items)
+			if not level:
+				break
+
+			for bom_no in level:
+				self.bom_items[bom_no] = []
+
+			for row in get_bom_items(level, self.company):
+				self.bom_items[row.parent].append(row)
+
+			level = {
+				row.get(sub_bom_field)
+				for bom_no in level
+				for row in self.bom_items[bom_no]
+				if row.get(sub_bom_field)
+			}
+
+	def get_bom_items(self, bom_no: str, sub_bom_field: str = "default_bom") -> List:
+		"Returns items of the BOM, in the order they were added."
+		if bom_no not in self.bom_items:
+			self.load([bom_no], sub_bom_field)
+
+		return self.bom_items[bom_no]
+
+	def get_grouped_bom_items(self, bom_no: str) -> List:
+		"Returns items of the BOM with qty per unit of BOM, one row per item."
+		grouped_items = {}
+		for row in self.get_bom_items(bom_no):
+			if row.item_code in grouped_items:
+				grouped_items[row.item_code].qty += row.qty
+			else:
+				grouped_items[row.item_code] = frappe._dict(row)
+
+		return list(grouped_items.values())
+
+	def get_raw_materials(
+		self,
+		bom_no: str,
+		include_non_stock_items: int = 0,
+		include_subcontracted_items: int = 0,
+		include_exploded_items: int = 0,
+	) -> Dict[str, List]:
+		"""Returns {item_code: [item, qty]} of the raw materials required for one unit of `bom_no`.
+
+		With `include_exploded_items`, sub-assemblies having a default BOM are replaced by their
+		raw materials."""
+		key = (
+			bom_no,
+			cint(include_non_stock_items),
+			cint(include_subcontracted_items),
+			cint(include_exploded_items),
+		)
+		if key in self.raw_materials:
+			return self.raw_materials[key]
+
+		# guards against recursion in BOMs
+		self.raw_materials[key] = {}
+
+		raw_materials = {}
+		for d in self.get_grouped_bom_items(bom_no):
+			if not include_non_stock_items and not d.is_stock_item:
+				continue
+
+			if not include_exploded_items or not d.default_bom:
+				add_raw_material(raw_materials, d, d.qty)
+
+			elif is_exploded(d, include_subcontracted_items) and d.qty > 0:
+				for item, qty in self.get_raw_materials(d.default_bom, *key[1:]).values():
+					add_raw_material(raw_materials, item, d.qty * qty)
+
+		self.raw_materials[key] = raw_materials
+		return raw_materials
+
+	def get_sub_assembly_items(self, bom_no: str, to_produce_qty: float, indent: int = 0) -> List:
+		"Returns sub-assemblies to produce `to_produce_qty` of `bom_no`, depth first."
+		bom_data = []
+		for d in self.get_bom_items(bom_no, sub_bom_field="bom_no"):
+			if not d.bom_no:
+				continue
+
+			stock_qty = d.qty * flt(to_produce_qty)
+			bom_data.append(
+				frappe._dict(
+					{
+						"parent_item_code": d.parent_item,
+						"description": d.item_description,
+						"production_item": d.item_code,
+						"item_name": d.item_name,
+						"stock_uom": d.item_stock_uom,
+						"uom": d.item_stock_uom,
+						"bom_no": d.bom_no,
+						"is_sub_contracted_item": d.is_sub_contracted_item,
+						"bom_level": indent,
+						"indent": indent,
+						"stock_qty": stock_qty,
+					}
+				)
+			)
+
+			bom_data.extend(self.get_sub_assembly_items(d.bom_no, stock_qty, indent=indent + 1))
+
+		return bom_data
+
+
+def get_bom_items(bom_nos: Iterable[str], company: Optional[str] = None) -> List:
+	"Returns items of all `bom_nos`, with the item details needed for planning."
+	bom_item = frappe.qb.DocType("BOM Item")
+	bom = frappe.qb.DocType("BOM")
+	item = frappe.qb.DocType("Item")
+	item_default = frappe.qb.DocType("Item Default")
+	item_uom = frappe.qb.DocType("UOM Conversion Detail")
+
+	return (
+		frappe.qb.from_(bom_item)
+		.join(bom)
+		.on(bom.name == bom_item.parent)
+		.join(item)
+		.on(bom_item.item_code == item.name)
+		.left_join(item_default)
+		.on((item.name == item_default.parent) & (item_default.company == company))
+		.left_join(item_uom)
+		.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
+		.select(
+			bom_item.parent,
+			bom.item.as_("parent_item"),
+			bom_item.item_code,
+			bom_item.bom_no,
+			(bom_item.stock_qty / IfNull(bom.quantity, 1)).as_("qty"),
+			bom_item.source_warehouse,
+			bom_item.description,
+			bom_item.stock_uom,
+			item.item_name,
+			item.description.as_("item_description"),
+			item.stock_uom.as_("item_stock_uom"),
+			item.is_stock_item,
+			item.default_material_request_type,
+			item.is_sub_contracted_item,
+			item.is_sub_contracted_item.as_("is_sub_contracted"),
+			item.default_bom,
+			item.min_order_qty,
+			item.safety_stock,
+			item.purchase_uom,
+			item_default.default_warehouse,
+			item_uom.conversion_factor,
+		)
+		.where((bom_item.parent.isin(list(bom_nos))) & (bom_item.docstatus < 2))
+		.orderby(bom_item.parent)
+		.orderby(bom_item.idx)
+	).run(as_dict=True)
+
+
+def is_exploded(item, include_subcontracted_items: int) -> bool:
+	"Returns whether the sub-assembly `item` is planned via the raw materials of its BOM."
+	if item.is_sub_contracted:
+		return bool(include_subcontracted_items)
+
+	return item.default_material_request_type in ["Manufacture", "Purchase"]
+
+
+def add_raw_material(raw_materials: Dict, item, qty: float) -> None:
+	if item.item_code in raw_materials:
+		raw_materials[item.item_code][1] += qty
+	else:
+		raw_materials[item.item_code] = [item, qty]
+
+
+def get_bin_warehouse(item, for_warehouse: Optional[str] = None) -> Optional[str]:
+	return for_warehouse or item.get("source_warehouse") or item.get("default_warehouse")
+
+
+def get_bins_for_items(items: List, company: str, for_warehouse: Optional[str] = None) -> Dict:
+	"""Returns bin of each item in its warehouse (or its child warehouses), fetched in one query.
+
+	Same as the first row of `get_bin_details` of each item."""
+	item_codes = list({d.item_code for d in items})
+	if not item_codes:
+		return {}
+
+	bin = frappe.qb.DocType("Bin")
+	wh = frappe.qb.DocType("Warehouse")
+
+	bins = (
+		frappe.qb.from_(bin)
+		.join(wh)
+		.on(wh.name == bin.warehouse)
+		.select(
+			bin.item_code,
+			bin.warehouse,
+			IfNull(bin.projected_qty, 0).as_("projected_qty"),
+			IfNull(bin.actual_qty, 0).as_("actual_qty"),
+			IfNull(bin.ordered_qty, 0).as_("ordered_qty"),
+			IfNull(bin.reserved_qty_for_production, 0).as_("reserved_qty_for_production"),
+			IfNull(bin.planned_qty, 0).as_("planned_qty"),
+		)
+		.where((bin.item_code.isin(item_codes)) & (wh.company == company))
+		.orderby(bin.item_code)
+		.orderby(bin.warehouse)
+	).run(as_dict=True)
+
+	bins_by_item = {}
+	for d in bins:
+		bins_by_item.setdefault(d.item_code, []).append(d)
+
+	item_bins = {}
+	for d in items:
+		warehouse = get_bin_warehouse(d, for_warehouse)
+		for row in bins_by_item.get(d.item_code, []):
+			if not warehouse or is_descendant("Warehouse", row.warehouse, warehouse, include_self=True):
+				item_bins[(d.item_code, warehouse)] = row
+				break
+
+	return item_bins
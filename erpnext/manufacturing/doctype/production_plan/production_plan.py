@@ -24,7 +24,12 @@ from frappe.utils.csvutils import build_csv_response
 from pypika.terms import ExistsCriterion
 from six import iteritems
 
-from erpnext.manufacturing.doctype.bom.bom import get_children, validate_bom_no
+from erpnext.manufacturing.doctype.bom.bom import validate_bom_no
+from erpnext.manufacturing.doctype.production_plan.bom_explosion import (
+	BOMExplosion,
+	get_bin_warehouse,
+	get_bins_for_items,
+)
 from erpnext.manufacturing.doctype.work_order.work_order import get_item_details
 from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
 from erpnext.stock.get_item_details import get_conversion_factor
@@ -693,12 +698,15 @@ class ProductionPlan(Document):
 	@frappe.whitelist()
 	def get_sub_assembly_items(self, manufacturing_type=None):
 		self.sub_assembly_items = []
+		bom_explosion = BOMExplosion(self.company)
+		bom_explosion.load([row.bom_no for row in self.po_items], sub_bom_field="bom_no")
+
 		for row in self.po_items:
 			if not row.item_code:
 				frappe.throw(_("Row #{0}: Please select Item Code in Assembly Items").format(row.idx))
 
 			bom_data = []
-			get_sub_assembly_items(row.bom_no, bom_data, row.planned_qty)
+			get_sub_assembly_items(row.bom_no, bom_data, row.planned_qty, bom_explosion=bom_explosion)
 			self.set_sub_assembly_items_based_on_level(row, bom_data, manufacturing_type)
 
 		self.sub_assembly_items.sort(key=lambda d: d.bom_level, reverse=True)
@@ -873,74 +881,25 @@ def get_subitems(
 	include_subcontracted_items,
 	parent_qty,
 	planned_qty=1,
+	bom_explosion=None,
 ):
-	bom_item = frappe.qb.DocType("BOM Item")
-	bom = frappe.qb.DocType("BOM")
-	item = frappe.qb.DocType("Item")
-	item_default = frappe.qb.DocType("Item Default")
-	item_uom = frappe.qb.DocType("UOM Conversion Detail")
-
-	items = (
-		frappe.qb.from_(bom_item)
-		.join(bom)
-		.on(bom.name == bom_item.parent)
-		.join(item)
-		.on(bom_item.item_code == item.name)
-		.left_join(item_default)
-		.on((item.name == item_default.parent) & (item_default.company == company))
-		.left_join(item_uom)
-		.on((item.name == item_uom.parent) & (item_uom.uom == item.purchase_uom))
-		.select(
-			bom_item.item_code,
-			item.default_material_request_type,
-			item.item_name,
-			IfNull(parent_qty * Sum(bom_item.stock_qty / IfNull(bom.quantity, 1)) * planned_qty, 0).as_(
-				"qty"
-			),
-			item.is_sub_contracted_item.as_("is_sub_contracted"),
-			bom_item.source_warehouse,
-			item.default_bom.as_("default_bom"),
-			bom_item.description.as_("description"),
-			bom_item.stock_uom.as_("stock_uom"),
-			item.min_order_qty.as_("min_order_qty"),
-			item.safety_stock.as_("safety_stock"),
-			item_default.default_warehouse,
-			item.purchase_uom,
-			item_uom.conversion_factor,
-		)
-		.where(
-			(bom.name == bom_no)
-			& (bom_item.docstatus < 2)
-			& (item.is_stock_item.isin([0, 1]) if include_non_stock_items else item.is_stock_item == 1)
-		)
-		.groupby(bom_item.item_code)
-	).run(as_dict=True)
-
-	for d in items:
-		if not data.get("include_exploded_items") or not d.default_bom:
-			if d.item_code in item_details:
-				item_details[d.item_code].qty = item_details[d.item_code].qty + d.qty
-			else:
-				if not d.conversion_factor and d.purchase_uom:
-					d.conversion_factor = get_uom_conversion_factor(d.item_code, d.purchase_uom)
+	if not bom_explosion:
+		bom_explosion = BOMExplosion(company)
+
+	raw_materials = bom_explosion.get_raw_materials(
+		bom_no,
+		include_non_stock_items,
+		include_subcontracted_items,
+		data.get("include_exploded_items"),
+	)
 
-				item_details[d.item_code] = d
+	for item_code, (item, qty) in raw_materials.items():
+		qty = flt(parent_qty) * qty * flt(planned_qty)
+		if item_code in item_details:
+			item_details[item_code].qty = item_details[item_code].qty + qty
+		else:
+			item_details[item_code] = frappe._dict(item, qty=qty)
 
-		if data.get("include_exploded_items") and d.default_bom:
-			if (
-				d.default_material_request_type in ["Manufacture", "Purchase"] and not d.is_sub_contracted
-			) or (d.is_sub_contracted and include_subcontracted_items):
-				if d.qty > 0:
-					get_subitems(
-						doc,
-						data,
-						item_details,
-						d.default_bom,
-						company,
-						include_non_stock_items,
-						include_subcontracted_items,
-						d.qty,
-					)
 	return item_details
 
 
@@ -971,7 +930,7 @@ def get_material_request_items(
 
 			required_qty = required_qty / row["conversion_factor"]
 
-	if frappe.db.get_value("UOM", row["purchase_uom"], "must_be_whole_number"):
+	if frappe.get_cached_value("UOM", row["purchase_uom"], "must_be_whole_number"):
 		required_qty = ceil(required_qty)
 
 	if include_safety_stock:
@@ -1168,6 +1127,9 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 	ignore_existing_ordered_qty = doc.get("ignore_existing_ordered_qty")
 	include_safety_stock = doc.get("include_safety_stock")
 
+	bom_explosion = BOMExplosion(company)
+	bom_explosion.load([data.get("bom") or data.get("bom_no") for data in po_items])
+
 	so_item_details = frappe._dict()
 	for data in po_items:
 		if not data.get("include_exploded_items") and doc.get("sub_assembly_items"):
@@ -1210,6 +1172,7 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 						include_subcontracted_items,
 						1,
 						planned_qty=planned_qty,
+						bom_explosion=bom_explosion,
 					)
 		elif data.get("item_code"):
 			item_master = frappe.get_doc("Item", data["item_code"]).as_dict()
@@ -1247,12 +1210,17 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 			else:
 				so_item_details[sales_order][item_code] = details
 
+	bins = get_bins_for_items(
+		[details for item_dict in so_item_details.values() for details in item_dict.values()],
+		doc.company,
+		warehouse,
+	)
+
 	mr_items = []
 	for sales_order, item_code in iteritems(so_item_details):
 		item_dict = so_item_details[sales_order]
 		for details in item_dict.values():
-			bin_dict = get_bin_details(details, doc.company, warehouse)
-			bin_dict = bin_dict[0] if bin_dict else {}
+			bin_dict = bins.get((details.item_code, get_bin_warehouse(details, warehouse)), {})
 
 			if details.qty > 0:
 				items = get_material_request_items(
@@ -1354,32 +1322,11 @@ def get_item_data(item_code):
 	}
 
 
-def get_sub_assembly_items(bom_no, bom_data, to_produce_qty, indent=0):
-	data = get_children("BOM", parent=bom_no)
-	for d in data:
-		if d.expandable:
-			parent_item_code = frappe.get_cached_value("BOM", bom_no, "item")
-			stock_qty = (d.stock_qty / d.parent_bom_qty) * flt(to_produce_qty)
-			bom_data.append(
-				frappe._dict(
-					{
-						"parent_item_code": parent_item_code,
-						"description": d.description,
-						"production_item": d.item_code,
-						"item_name": d.item_name,
-						"stock_uom": d.stock_uom,
-						"uom": d.stock_uom,
-						"bom_no": d.value,
-						"is_sub_contracted_item": d.is_sub_contracted_item,
-						"bom_level": indent,
-						"indent": indent,
-						"stock_qty": stock_qty,
-					}
-				)
-			)
+def get_sub_assembly_items(bom_no, bom_data, to_produce_qty, indent=0, bom_explosion=None):
+	if not bom_explosion:
+		bom_explosion = BOMExplosion()
 
-			if d.value:
-				get_sub_assembly_items(d.value, bom_data, stock_qty, indent=indent + 1)
+	bom_data.extend(bom_explosion.get_sub_assembly_items(bom_no, to_produce_qty, indent=indent))
 
 
 def set_default_warehouses(row, default_warehouses):
@@ -350,6 +350,50 @@ class TestProductionPlan(FrappeTestCase):
 		pln.cancel()
 		frappe.delete_doc("Production Plan", pln.name)
 
+	def test_bom_explosion(self):
+		from erpnext.manufacturing.doctype.production_plan.bom_explosion import BOMExplosion
+
+		for item_code in [
+			"Test Explosion FG",
+			"Test Explosion SA",
+			"Test Explosion RM 1",
+			"Test Explosion RM 2",
+		]:
+			create_item(item_code, is_stock_item=1)
+
+		if not frappe.db.get_value("BOM", {"item": "Test Explosion SA", "docstatus": 1}):
+			make_bom(item="Test Explosion SA", raw_materials=["Test Explosion RM 1"], rm_qty=2)
+
+		if not frappe.db.get_value("BOM", {"item": "Test Explosion FG", "docstatus": 1}):
+			make_bom(
+				item="Test Explosion FG",
+				raw_materials=["Test Explosion SA", "Test Explosion RM 2"],
+				rm_qty=3,
+			)
+
+		fg_bom = frappe.db.get_value("Item", "Test Explosion FG", "default_bom")
+		bom_explosion = BOMExplosion("_Test Company")
+		bom_explosion.load([fg_bom])
+
+		# raw materials per unit of FG, with and without exploding the sub-assembly
+		raw_materials = bom_explosion.get_raw_materials(fg_bom, include_exploded_items=1)
+		self.assertEqual(
+			{item_code: qty for item_code, (item, qty) in raw_materials.items()},
+			{"Test Explosion RM 1": 6.0, "Test Explosion RM 2": 3.0},
+		)
+		raw_materials = bom_explosion.get_raw_materials(fg_bom)
+		self.assertEqual(
+			{item_code: qty for item_code, (item, qty) in raw_materials.items()},
+			{"Test Explosion SA": 3.0, "Test Explosion RM 2": 3.0},
+		)
+
+		sub_assembly_items = bom_explosion.get_sub_assembly_items(fg_bom, 2)
+		self.assertEqual(len(sub_assembly_items), 1)
+		self.assertEqual(sub_assembly_items[0].production_item, "Test Explosion SA")
+		self.assertEqual(sub_assembly_items[0].parent_item_code, "Test Explosion FG")
+		self.assertEqual(sub_assembly_items[0].stock_qty, 6.0)
+		self.assertEqual(sub_assembly_items[0].bom_level, 0)
+
 	def test_get_warehouse_list_group(self):
 		"Check if required child warehouses are returned."
 		warehouse_json = '[{"warehouse":"_Test Warehouse Group - _TC"}]'
@@ -0,0 +1,21 @@
+import frappe
+
+from erpnext.accounts.doctype.account_period_balance.account_period_balance import (
+	rebuild_account_period_balance,
+)
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+	make_dimension_in_accounting_doctypes,
+)
+
+
+def execute():
+	frappe.reload_doc("accounts", "doctype", "account_period_balance")
+
+	for dimension in frappe.get_all(
+		"Accounting Dimension", fields=["label", "fieldname", "document_type"]
+	):
+		make_dimension_in_accounting_doctypes(dimension, doclist=["Account Period Balance"])
+
+	for company in frappe.get_all("Company", pluck="name"):
+		rebuild_account_period_balance(company)
+		frappe.db.commit()
@@ -0,0 +1,13 @@
+import frappe
+
+from erpnext.accounts.doctype.budget_consumption.budget_consumption import (
+	rebuild_budget_consumption,
+)
+
+
+def execute():
+	frappe.reload_doc("accounts", "doctype", "budget_consumption")
+
+	for budget in frappe.get_all("Budget", filters={"docstatus": 1}, pluck="name"):
+		rebuild_budget_consumption(frappe.get_doc("Budget", budget))
+		frappe.db.commit()
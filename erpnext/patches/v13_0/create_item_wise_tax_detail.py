@@ -0,0 +1,14 @@
+import frappe
+
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	TAX_DOCTYPES,
+	rebuild_item_wise_tax_details,
+)
+
+
+def execute():
+	frappe.reload_doc("accounts", "doctype", "item_wise_tax_detail")
+
+	for voucher_type in TAX_DOCTYPES:
+		rebuild_item_wise_tax_details(voucher_type)
+		frappe.db.commit()
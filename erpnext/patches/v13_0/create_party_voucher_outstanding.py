@@ -0,0 +1,13 @@
+import frappe
+
+from erpnext.accounts.doctype.party_voucher_outstanding.party_voucher_outstanding import (
+	rebuild_party_voucher_outstanding,
+)
+
+
+def execute():
+	frappe.reload_doc("accounts", "doctype", "party_voucher_outstanding")
+
+	for company in frappe.get_all("Company", pluck="name"):
+		rebuild_party_voucher_outstanding(company)
+		frappe.db.commit()
@@ -13,6 +13,7 @@ from frappe.utils import (
 	add_to_date,
 	cint,
 	comma_and,
+	create_batch,
 	date_diff,
 	flt,
 	get_link_to_form,
@@ -26,6 +27,10 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 from erpnext.accounts.utils import get_fiscal_year
 from erpnext.hr.doctype.employee.employee import get_holiday_list_for_employee
 
+# salary slips of a payroll entry with more employees are created and submitted in
+# background jobs of this many employees each, that can run in parallel
+SALARY_SLIP_CHUNK_SIZE = 100
+
 
 class PayrollEntry(Document):
 	def onload(self):
@@ -183,7 +188,28 @@ class PayrollEntry(Document):
 				}
 			)
 			if len(employees) > 30:
-				frappe.enqueue(create_salary_slips_for_employees, timeout=600, employees=employees, args=args)
+				self.validate_no_salary_slip_jobs_running()
+
+				# salary slips created by an earlier, interrupted run are not created again
+				salary_slips_exists_for = get_existing_salary_slips(employees, args)
+				pending_employees = [emp for emp in employees if emp not in salary_slips_exists_for]
+				self.set_processed_salary_slips(len(salary_slips_exists_for))
+
+				if not pending_employees:
+					self.db_set("salary_slips_created", 1)
+					return
+
+				for chunk in create_batch(pending_employees, SALARY_SLIP_CHUNK_SIZE):
+					frappe.enqueue(
+						create_salary_slips_for_chunk,
+						queue="long",
+						timeout=1500,
+						job_name=self.get_salary_slip_job_name(),
+						payroll_entry=self.name,
+						employees=chunk,
+						args=args,
+						total=len(employees),
+					)
 			else:
 				create_salary_slips_for_employees(employees, args, publish_progress=False)
 				# since this method is called via frm.call this doc needs to be updated manually
@@ -210,12 +236,84 @@ class PayrollEntry(Document):
 		self.check_permission("write")
 		ss_list = self.get_sal_slip_list(ss_status=0)
 		if len(ss_list) > 30:
-			frappe.enqueue(
-				submit_salary_slips_for_employees, timeout=600, payroll_entry=self, salary_slips=ss_list
-			)
+			self.validate_no_salary_slip_jobs_running()
+			self.set_processed_salary_slips(0)
+			for chunk in create_batch(ss_list, SALARY_SLIP_CHUNK_SIZE):
+				frappe.enqueue(
+					submit_salary_slips_for_chunk,
+					queue="long",
+					timeout=1500,
+					job_name=self.get_salary_slip_job_name(),
+					payroll_entry=self.name,
+					salary_slips=[ss[0] for ss in chunk],
+					total=len(ss_list),
+				)
 		else:
 			submit_salary_slips_for_employees(self, ss_list, publish_progress=False)
 
+	def get_salary_slip_job_name(self):
+		return "payroll_entry_salary_slips::{0}".format(self.name)
+
+	def validate_no_salary_slip_jobs_running(self):
+		"""Progress of a run is reset when it is started, so a run can't be started again while
+		chunks of the previous run are still adding to it."""
+		from frappe.core.page.background_jobs.background_jobs import get_info
+
+		if self.get_salary_slip_job_name() in [d.get("job_name") for d in get_info()]:
+			frappe.throw(
+				_("Salary Slips of this Payroll Entry are still being processed. Please try again later."),
+				title=_("Processing Salary Slips"),
+			)
+
+	def set_processed_salary_slips(self, count):
+		frappe.db.set_value(
+			"Payroll Entry", self.name, "processed_salary_slips", count, update_modified=False
+		)
+
+	def add_processed_salary_slips(self, count):
+		"""Adds salary slips processed by a chunk to the progress and returns the total.
+		The update locks the row till the chunk is committed, so that chunks finishing
+		together don't miss each other's salary slips."""
+		frappe.db.sql(
+			"""
+			update `tabPayroll Entry`
+			set processed_salary_slips = processed_salary_slips + %s
+			where name = %s""",
+			(count, self.name),
+		)
+		processed_salary_slips = cint(
+			frappe.db.get_value("Payroll Entry", self.name, "processed_salary_slips")
+		)
+		self.processed_salary_slips = processed_salary_slips
+
+		return processed_salary_slips
+
+	def publish_salary_slip_progress(self, total, title):
+		frappe.publish_progress(
+			min(self.processed_salary_slips * 100 / total, 100),
+			title=title,
+			doctype=self.doctype,
+			docname=self.name,
+		)
+
+	def log_salary_slip_chunk_error(self, title):
+		frappe.db.rollback()
+		frappe.log_error(
+			message=frappe.get_traceback(),
+			title=_("{0} for Payroll Entry {1}").format(title, self.name),
+		)
+		frappe.db.commit()
+
+	def report_not_submitted_salary_slips(self, salary_slips):
+		message = _("Could not submit some Salary Slips: {0}").format(
+			", ".join(get_link_to_form("Salary Slip", ss) for ss in salary_slips)
+		)
+		frappe.log_error(
+			message=message,
+			title=_("{0} for Payroll Entry {1}").format(_("Salary Slip submission failed"), self.name),
+		)
+		frappe.publish_realtime("msgprint", message, user=frappe.session.user)
+
 	def email_salary_slip(self, submitted_ss):
 		if frappe.db.get_single_value("Payroll Settings", "email_salary_slip_to_employee"):
 			for ss in submitted_ss:
@@ -754,20 +852,24 @@ def create_salary_slips_for_employees(employees, args, publish_progress=True):
 	salary_slips_exists_for = get_existing_salary_slips(employees, args)
 	count = 0
 	salary_slips_not_created = []
-	for emp in employees:
-		if emp not in salary_slips_exists_for:
-			args.update({"doctype": "Salary Slip", "employee": emp})
-			ss = frappe.get_doc(args)
-			ss.insert()
-			count += 1
-			if publish_progress:
-				frappe.publish_progress(
-					count * 100 / len(set(employees) - set(salary_slips_exists_for)),
-					title=_("Creating Salary Slips..."),
-				)
+	frappe.flags.salary_slip_batch_cache = {"employees": set(employees)}
+	try:
+		for emp in employees:
+			if emp not in salary_slips_exists_for:
+				args.update({"doctype": "Salary Slip", "employee": emp})
+				ss = frappe.get_doc(args)
+				ss.insert()
+				count += 1
+				if publish_progress:
+					frappe.publish_progress(
+						count * 100 / len(set(employees) - set(salary_slips_exists_for)),
+						title=_("Creating Salary Slips..."),
+					)
 
-		else:
-			salary_slips_not_created.append(emp)
+			else:
+				salary_slips_not_created.append(emp)
+	finally:
+		frappe.flags.salary_slip_batch_cache = None
 
 	payroll_entry = frappe.get_doc("Payroll Entry", args.payroll_entry)
 	payroll_entry.db_set("salary_slips_created", 1)
@@ -783,6 +885,38 @@ def create_salary_slips_for_employees(employees, args, publish_progress=True):
 		)
 
 
+def create_salary_slips_for_chunk(payroll_entry, employees, args, total):
+	"""Creates salary slips for a chunk of employees of the Payroll Entry in a background job.
+
+	Each chunk is committed on its own and adds to the processed salary slips of the Payroll Entry.
+	Salary slips are marked as created by the chunk that completes `total`. If a chunk fails,
+	creating salary slips again only creates the ones that are still missing."""
+	payroll_entry = frappe.get_doc("Payroll Entry", payroll_entry)
+	args = frappe._dict(args)
+
+	frappe.flags.salary_slip_batch_cache = {"employees": set(employees)}
+	try:
+		salary_slips_exists_for = get_existing_salary_slips(employees, args)
+		count = 0
+		for emp in employees:
+			if emp not in salary_slips_exists_for:
+				args.update({"doctype": "Salary Slip", "employee": emp})
+				frappe.get_doc(args).insert()
+				count += 1
+
+		if payroll_entry.add_processed_salary_slips(count) >= total:
+			payroll_entry.db_set("salary_slips_created", 1)
+		frappe.db.commit()
+	except Exception:
+		payroll_entry.log_salary_slip_chunk_error(_("Salary Slip creation failed"))
+		return
+	finally:
+		frappe.flags.salary_slip_batch_cache = None
+
+	payroll_entry.publish_salary_slip_progress(total, _("Creating Salary Slips..."))
+	payroll_entry.notify_update()
+
+
 def get_existing_salary_slips(employees, args):
 	return frappe.db.sql_list(
 		"""
@@ -840,6 +974,78 @@ def submit_salary_slips_for_employees(payroll_entry, salary_slips, publish_progr
 	frappe.flags.via_payroll_entry = False
 
 
+def submit_salary_slips_for_chunk(payroll_entry, salary_slips, total):
+	"""Submits a chunk of salary slips of the Payroll Entry in a background job.
+
+	Each chunk is committed on its own. The chunk that completes `total` enqueues the accrual
+	journal entry, to be made once it is committed, from the salary slips submitted by all chunks."""
+	payroll_entry = frappe.get_doc("Payroll Entry", payroll_entry)
+	salary_slips = [frappe.get_doc("Salary Slip", ss) for ss in salary_slips]
+	submitted_ss, not_submitted_ss = [], []
+
+	frappe.flags.via_payroll_entry = True
+	frappe.flags.salary_slip_batch_cache = {"employees": {ss.employee for ss in salary_slips}}
+	try:
+		for ss_obj in salary_slips:
+			if ss_obj.docstatus != 0:
+				continue
+
+			if ss_obj.net_pay < 0:
+				not_submitted_ss.append(ss_obj.name)
+				continue
+
+			try:
+				ss_obj.submit()
+				submitted_ss.append(ss_obj)
+			except frappe.ValidationError:
+				not_submitted_ss.append(ss_obj.name)
+
+		if payroll_entry.add_processed_salary_slips(len(salary_slips)) >= total:
+			# made in a new job, as salary slips committed by other chunks after this job
+			# started are not visible to it
+			frappe.enqueue(
+				make_accrual_jv_entry_for_salary_slips,
+				queue="long",
+				timeout=1500,
+				payroll_entry=payroll_entry.name,
+				enqueue_after_commit=True,
+				now=frappe.flags.in_test,
+			)
+		frappe.db.commit()
+	except Exception:
+		payroll_entry.log_salary_slip_chunk_error(_("Salary Slip submission failed"))
+		return
+	finally:
+		frappe.flags.salary_slip_batch_cache = None
+		frappe.flags.via_payroll_entry = False
+
+	if not_submitted_ss:
+		payroll_entry.report_not_submitted_salary_slips(not_submitted_ss)
+
+	payroll_entry.email_salary_slip(submitted_ss)
+	payroll_entry.publish_salary_slip_progress(total, _("Submitting Salary Slips..."))
+	payroll_entry.notify_update()
+
+
+def make_accrual_jv_entry_for_salary_slips(payroll_entry):
+	"""Makes the accrual journal entry of the Payroll Entry once all its chunks of salary slips
+	are submitted."""
+	payroll_entry = frappe.get_doc("Payroll Entry", payroll_entry)
+	if payroll_entry.salary_slips_submitted:
+		return
+
+	try:
+		if payroll_entry.get_sal_slip_list(ss_status=1):
+			payroll_entry.make_accrual_jv_entry()
+			payroll_entry.db_set("salary_slips_submitted", 1)
+		frappe.db.commit()
+	except Exception:
+		payroll_entry.log_salary_slip_chunk_error(_("Accrual Journal Entry creation failed"))
+		return
+
+	payroll_entry.notify_update()
+
+
 @frappe.whitelist()
 @frappe.validate_and_sanitize_search_inputs
 def get_payroll_entries_for_jv(doctype, txt, searchfield, start, page_len, filters):
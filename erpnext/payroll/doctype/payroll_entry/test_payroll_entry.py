@@ -2,6 +2,7 @@
 # License: GNU General Public License v3. See license.txt
 
 import unittest
+from unittest.mock import patch
 
 import frappe
 from dateutil.relativedelta import relativedelta
@@ -20,7 +21,12 @@ from erpnext.loan_management.doctype.loan.test_loan import (
 from erpnext.loan_management.doctype.process_loan_interest_accrual.process_loan_interest_accrual import (
 	process_loan_interest_accrual_for_term_loans,
 )
-from erpnext.payroll.doctype.payroll_entry.payroll_entry import get_end_date, get_start_end_dates
+from erpnext.payroll.doctype.payroll_entry.payroll_entry import (
+	create_salary_slips_for_chunk,
+	get_end_date,
+	get_start_end_dates,
+	submit_salary_slips_for_chunk,
+)
 from erpnext.payroll.doctype.salary_slip.test_salary_slip import (
 	create_account,
 	get_salary_component_account,
@@ -250,6 +256,108 @@ class TestPayrollEntry(FrappeTestCase):
 
 			self.assertEqual(je_entries, expected_je)
 
+	def test_salary_slips_in_chunks(self):
+		company = erpnext.get_default_company()
+		company_doc = frappe.get_doc("Company", company)
+		for data in frappe.get_all("Salary Component", fields=["name"]):
+			if not frappe.db.get_value(
+				"Salary Component Account", {"parent": data.name, "company": company}, "name"
+			):
+				get_salary_component_account(data.name)
+
+		employees = [
+			make_employee("test_payroll_chunk{0}@payroll.com".format(i), company=company) for i in range(3)
+		]
+		salary_structure = make_salary_structure(
+			"_Test Salary Structure",
+			"Monthly",
+			employees[0],
+			company=company,
+			currency=company_doc.default_currency,
+		)
+		for employee in employees[1:]:
+			create_salary_structure_assignment(
+				employee, salary_structure.name, company=company, currency=company_doc.default_currency
+			)
+
+		dates = get_start_end_dates("Monthly", nowdate())
+		payroll_entry = frappe.new_doc("Payroll Entry")
+		payroll_entry.update(
+			{
+				"company": company,
+				"posting_date": nowdate(),
+				"payroll_frequency": "Monthly",
+				"start_date": dates.start_date,
+				"end_date": dates.end_date,
+				"payroll_payable_account": company_doc.default_payroll_payable_account,
+				"currency": company_doc.default_currency,
+				"exchange_rate": 1,
+				"payment_account": get_payment_account(),
+			}
+		)
+		payroll_entry.fill_employee_details()
+		payroll_entry.save()
+		payroll_entry.submit()
+
+		# salary slips of an interrupted run, only the first one was created
+		for employee in employees[1:]:
+			frappe.delete_doc(
+				"Salary Slip",
+				frappe.db.get_value(
+					"Salary Slip", {"payroll_entry": payroll_entry.name, "employee": employee}
+				),
+			)
+		payroll_entry.db_set("salary_slips_created", 0)
+		payroll_entry.set_processed_salary_slips(1)
+
+		args = frappe._dict(
+			{
+				"payroll_frequency": "Monthly",
+				"start_date": dates.start_date,
+				"end_date": dates.end_date,
+				"company": company,
+				"posting_date": nowdate(),
+				"payroll_entry": payroll_entry.name,
+				"exchange_rate": 1,
+				"currency": company_doc.default_currency,
+			}
+		)
+		# chunks commit on their own in background jobs, keep the test's transaction instead
+		with patch.object(frappe.local.db, "commit"):
+			# salary slip that already exists is not created again
+			create_salary_slips_for_chunk(payroll_entry.name, employees[:2], args.copy(), total=3)
+			payroll_entry.reload()
+			self.assertEqual(payroll_entry.processed_salary_slips, 2)
+			self.assertFalse(payroll_entry.salary_slips_created)
+
+			# chunk that completes the payroll entry marks salary slips as created
+			create_salary_slips_for_chunk(payroll_entry.name, employees[2:], args.copy(), total=3)
+			payroll_entry.reload()
+			self.assertTrue(payroll_entry.salary_slips_created)
+			self.assertIsNone(frappe.flags.salary_slip_batch_cache)
+
+			salary_slips = [d[0] for d in payroll_entry.get_sal_slip_list(ss_status=0)]
+			self.assertEqual(len(salary_slips), 3)
+
+			payroll_entry.set_processed_salary_slips(0)
+			submit_salary_slips_for_chunk(payroll_entry.name, salary_slips[:1], total=3)
+			payroll_entry.reload()
+			self.assertFalse(payroll_entry.salary_slips_submitted)
+
+			# accrual journal entry is made by a job enqueued by the last chunk
+			submit_salary_slips_for_chunk(payroll_entry.name, salary_slips[1:], total=3)
+			payroll_entry.reload()
+		self.assertTrue(payroll_entry.salary_slips_submitted)
+		self.assertEqual(
+			frappe.db.count("Salary Slip", {"payroll_entry": payroll_entry.name, "docstatus": 1}), 3
+		)
+		self.assertTrue(
+			frappe.db.get_value(
+				"Journal Entry Account",
+				{"reference_type": "Payroll Entry", "reference_name": payroll_entry.name},
+			)
+		)
+
 	def test_get_end_date(self):
 		self.assertEqual(get_end_date("2017-01-01", "monthly"), {"end_date": "2017-01-31"})
 		self.assertEqual(get_end_date("2017-02-01", "monthly"), {"end_date": "2017-02-28"})
@@ -5,9 +5,10 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import add_months, cint, date_diff, flt, formatdate, getdate, month_diff
+from frappe.utils import add_months, cint, cstr, date_diff, flt, formatdate, getdate, month_diff
 
 from erpnext.hr.utils import get_holiday_dates_for_employee
+from erpnext.payroll.utils import get_from_salary_slip_batch_cache
 
 
 class PayrollPeriod(Document):
@@ -84,17 +85,22 @@ def get_payroll_period_days(start_date, end_date, employee, company=None):
 
 
 def get_payroll_period(from_date, to_date, company):
-	payroll_period = frappe.db.sql(
-		"""
-		select name, start_date, end_date
-		from `tabPayroll Period`
-		where start_date<=%s and end_date>= %s and company=%s
-	""",
-		(from_date, to_date, company),
-		as_dict=1,
-	)
+	def _get_payroll_period():
+		payroll_period = frappe.db.sql(
+			"""
+			select name, start_date, end_date
+			from `tabPayroll Period`
+			where start_date<=%s and end_date>= %s and company=%s
+		""",
+			(from_date, to_date, company),
+			as_dict=1,
+		)
 
-	return payroll_period[0] if payroll_period else None
+		return payroll_period[0] if payroll_period else None
+
+	return get_from_salary_slip_batch_cache(
+		("Payroll Period", cstr(from_date), cstr(to_date), company), _get_payroll_period
+	)
 
 
 def get_period_factor(
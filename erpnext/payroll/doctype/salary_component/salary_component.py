@@ -2,14 +2,23 @@
 # For license information, please see license.txt
 
 
+import frappe
 from frappe.model.document import Document
 from frappe.model.naming import append_number_if_name_exists
 
+SALARY_COMPONENT_ABBREVIATIONS_CACHE_KEY = "salary_component_abbreviations"
+
 
 class SalaryComponent(Document):
 	def validate(self):
 		self.validate_abbr()
 
+	def on_update(self):
+		frappe.cache().delete_value(SALARY_COMPONENT_ABBREVIATIONS_CACHE_KEY)
+
+	def on_trash(self):
+		frappe.cache().delete_value(SALARY_COMPONENT_ABBREVIATIONS_CACHE_KEY)
+
 	def validate_abbr(self):
 		if not self.salary_component_abbr:
 			self.salary_component_abbr = "".join([c[0] for c in self.salary_component.split()]).upper()
@@ -22,3 +31,11 @@ class SalaryComponent(Document):
 			separator="_",
 			filters={"name": ["!=", self.name]},
 		)
+
+
+def get_salary_component_abbreviations():
+	"""Returns abbreviations of all salary components, that can be used in formulas."""
+	return frappe.cache().get_value(
+		SALARY_COMPONENT_ABBREVIATIONS_CACHE_KEY,
+		lambda: frappe.get_all("Salary Component", pluck="salary_component_abbr"),
+	)
@@ -25,6 +25,7 @@ from six import iteritems
 
 import erpnext
 from erpnext.accounts.utils import get_fiscal_year
+from erpnext.hr.doctype.employee.employee import get_holiday_list_for_employee
 from erpnext.hr.utils import get_holiday_dates_for_employee, validate_active_employee
 from erpnext.loan_management.doctype.loan_repayment.loan_repayment import (
 	calculate_amounts,
@@ -46,7 +47,19 @@ from erpnext.payroll.doctype.payroll_period.payroll_period import (
 	get_payroll_period,
 	get_period_factor,
 )
-from erpnext.payroll.utils import prepare_error_msg, sanitize_expression
+from erpnext.payroll.doctype.salary_component.salary_component import (
+	get_salary_component_abbreviations,
+)
+from erpnext.payroll.doctype.salary_structure.salary_structure import (
+	compile_salary_structure_row,
+	get_compiled_salary_structure,
+)
+from erpnext.payroll.utils import (
+	evaluate_expression,
+	get_employee_data_from_salary_slip_batch_cache,
+	get_from_salary_slip_batch_cache,
+	prepare_error_msg,
+)
 from erpnext.utilities.transaction_base import TransactionBase
 
 
@@ -231,7 +244,7 @@ class SalarySlip(TransactionBase):
 			struct = self.check_sal_struct(joining_date, relieving_date)
 
 			if struct:
-				self._salary_structure_doc = frappe.get_doc("Salary Structure", struct)
+				self._salary_structure_doc = get_salary_structure_doc(struct)
 				self.salary_slip_based_on_timesheet = (
 					self._salary_structure_doc.salary_slip_based_on_timesheet or 0
 				)
@@ -313,10 +326,9 @@ class SalarySlip(TransactionBase):
 	def get_working_days_details(
 		self, joining_date=None, relieving_date=None, lwp=None, for_preview=0
 	):
-		payroll_based_on = frappe.db.get_value("Payroll Settings", None, "payroll_based_on")
-		include_holidays_in_total_working_days = frappe.db.get_single_value(
-			"Payroll Settings", "include_holidays_in_total_working_days"
-		)
+		payroll_settings = get_payroll_settings()
+		payroll_based_on = payroll_settings.payroll_based_on
+		include_holidays_in_total_working_days = payroll_settings.include_holidays_in_total_working_days
 
 		working_days = date_diff(self.end_date, self.start_date) + 1
 		working_days_list = [add_days(self.start_date, i) for i in range(working_days)]
@@ -370,9 +382,7 @@ class SalarySlip(TransactionBase):
 			if payroll_based_on == "Attendance":
 				self.payment_days -= flt(absent)
 
-			consider_unmarked_attendance_as = (
-				frappe.db.get_value("Payroll Settings", None, "consider_unmarked_attendance_as") or "Present"
-			)
+			consider_unmarked_attendance_as = payroll_settings.consider_unmarked_attendance_as or "Present"
 
 			if payroll_based_on == "Attendance" and consider_unmarked_attendance_as == "Absent":
 				unmarked_days = self.get_unmarked_days(include_holidays_in_total_working_days)
@@ -408,15 +418,7 @@ class SalarySlip(TransactionBase):
 			)
 
 		# exclude days for which attendance has been marked
-		unmarked_days -= frappe.get_all(
-			"Attendance",
-			filters={
-				"attendance_date": ["between", [start_date, end_date]],
-				"employee": self.employee,
-				"docstatus": 1,
-			},
-			fields=["COUNT(*) as marked_days"],
-		)[0].marked_days
+		unmarked_days -= len(self.get_attendance(start_date, end_date))
 
 		return unmarked_days
 
@@ -469,7 +471,46 @@ class SalarySlip(TransactionBase):
 		return payment_days
 
 	def get_holidays_for_employee(self, start_date, end_date):
-		return get_holiday_dates_for_employee(self.employee, start_date, end_date)
+		if not self.is_within_payroll_period(start_date, end_date):
+			return get_holiday_dates_for_employee(self.employee, start_date, end_date)
+
+		# holidays of the payroll period are fetched once for all employees with same holiday list
+		holidays = get_from_salary_slip_batch_cache(
+			(
+				"Holiday",
+				get_holiday_list_for_employee(self.employee),
+				cstr(self.start_date),
+				cstr(self.end_date),
+			),
+			lambda: get_holiday_dates_for_employee(self.employee, self.start_date, self.end_date),
+		)
+
+		return [d for d in holidays if getdate(start_date) <= getdate(d) <= getdate(end_date)]
+
+	def is_within_payroll_period(self, start_date, end_date):
+		return (
+			self.start_date
+			and self.end_date
+			and getdate(self.start_date) <= getdate(start_date)
+			and getdate(end_date) <= getdate(self.end_date)
+		)
+
+	def get_attendance(self, start_date, end_date):
+		"""Returns submitted attendance of the employee between the dates"""
+		if not self.is_within_payroll_period(start_date, end_date):
+			return get_attendance_of_employees([self.employee], start_date, end_date).get(self.employee, [])
+
+		attendance = get_employee_data_from_salary_slip_batch_cache(
+			("Attendance", cstr(self.start_date), cstr(self.end_date)),
+			self.employee,
+			get_attendance_of_employees,
+			self.start_date,
+			self.end_date,
+		)
+
+		return [
+			d for d in attendance if getdate(start_date) <= getdate(d.attendance_date) <= getdate(end_date)
+		]
 
 	def calculate_lwp_or_ppl_based_on_leave_application(
 		self, holidays, working_days_list, relieving_date=None
@@ -478,14 +519,22 @@ class SalarySlip(TransactionBase):
 		lwp = 0
 
 		daily_wages_fraction_for_half_day = (
-			flt(frappe.db.get_value("Payroll Settings", None, "daily_wages_fraction_for_half_day")) or 0.5
+			flt(get_payroll_settings().daily_wages_fraction_for_half_day) or 0.5
+		)
+
+		leave_applications = get_employee_data_from_salary_slip_batch_cache(
+			("Leave Application", cstr(self.start_date), cstr(self.end_date)),
+			self.employee,
+			get_lwp_or_ppl_leave_applications,
+			self.start_date,
+			self.end_date,
 		)
 
 		for d in working_days_list:
 			if relieving_date and getdate(d) > getdate(relieving_date):
 				break
 
-			leave = get_lwp_or_ppl_for_date(d, self.employee, holidays)
+			leave = get_lwp_or_ppl_for_date(d, leave_applications, holidays)
 
 			if leave:
 				equivalent_lwp_count = 0
@@ -514,32 +563,27 @@ class SalarySlip(TransactionBase):
 			end_date = relieving_date
 
 		daily_wages_fraction_for_half_day = (
-			flt(frappe.db.get_value("Payroll Settings", None, "daily_wages_fraction_for_half_day")) or 0.5
+			flt(get_payroll_settings().daily_wages_fraction_for_half_day) or 0.5
 		)
 
-		leave_types = frappe.get_all(
-			"Leave Type",
-			or_filters=[["is_ppl", "=", 1], ["is_lwp", "=", 1]],
-			fields=["name", "is_lwp", "is_ppl", "fraction_of_daily_salary_per_leave", "include_holiday"],
+		leave_types = get_from_salary_slip_batch_cache(
+			("Leave Type",),
+			lambda: frappe.get_all(
+				"Leave Type",
+				or_filters=[["is_ppl", "=", 1], ["is_lwp", "=", 1]],
+				fields=["name", "is_lwp", "is_ppl", "fraction_of_daily_salary_per_leave", "include_holiday"],
+			),
 		)
 
 		leave_type_map = {}
 		for leave_type in leave_types:
 			leave_type_map[leave_type.name] = leave_type
 
-		attendances = frappe.db.sql(  # nosemgrep
-			"""
-			SELECT attendance_date, status, leave_type
-			FROM `tabAttendance`
-			WHERE
-				status in ("Absent", "Half Day", "On leave")
-				AND employee = %s
-				AND docstatus = 1
-				AND attendance_date between %s and %s
-		""",
-			values=(self.employee, self.start_date, end_date),
-			as_dict=1,
-		)
+		attendances = [
+			d
+			for d in self.get_attendance(self.start_date, end_date)
+			if d.status in ("Absent", "Half Day", "On Leave")
+		]
 
 		for d in attendances:
 			if (
@@ -633,7 +677,7 @@ class SalarySlip(TransactionBase):
 
 	def calculate_component_amounts(self, component_type):
 		if not getattr(self, "_salary_structure_doc", None):
-			self._salary_structure_doc = frappe.get_doc("Salary Structure", self.salary_structure)
+			self._salary_structure_doc = get_salary_structure_doc(self.salary_structure)
 
 		payroll_period = get_payroll_period(self.start_date, self.end_date, self.company)
 
@@ -677,6 +721,31 @@ class SalarySlip(TransactionBase):
 
 	def get_data_for_eval(self):
 		"""Returns data for evaluating formula"""
+		data = frappe._dict(self.get_employee_data_for_eval())
+		data.update(self.as_dict())
+
+		# set values for components
+		for abbr in get_salary_component_abbreviations():
+			data.setdefault(abbr, 0)
+
+		# shallow copy of data to store default amounts (without payment days) for tax calculation
+		default_data = data.copy()
+
+		for key in ("earnings", "deductions"):
+			for d in self.get(key):
+				default_data[d.abbr] = d.default_amount or 0
+				data[d.abbr] = d.amount or 0
+
+		return data, default_data
+
+	def get_employee_data_for_eval(self):
+		"""Returns salary structure assignment and employee details, that are same for
+		all the components of the salary slip."""
+		key = (self.employee, self.salary_structure, getdate(self.start_date))
+		cached = getattr(self, "_employee_data_for_eval", None)
+		if cached and cached[0] == key:
+			return cached[1]
+
 		data = frappe._dict()
 		employee = frappe.get_doc("Employee", self.employee).as_dict()
 
@@ -685,18 +754,7 @@ class SalarySlip(TransactionBase):
 			employee.date_of_joining if employee.date_of_joining > start_date else start_date
 		)
 
-		salary_structure_assignment = frappe.get_value(
-			"Salary Structure Assignment",
-			{
-				"employee": self.employee,
-				"salary_structure": self.salary_structure,
-				"from_date": ("<=", date_to_validate),
-				"docstatus": 1,
-			},
-			"*",
-			order_by="from_date desc",
-			as_dict=True,
-		)
+		salary_structure_assignment = self.get_salary_structure_assignment(date_to_validate)
 
 		if not salary_structure_assignment:
 			frappe.throw(
@@ -710,35 +768,49 @@ class SalarySlip(TransactionBase):
 
 		data.update(salary_structure_assignment)
 		data.update(employee)
-		data.update(self.as_dict())
 
-		# set values for components
-		salary_components = frappe.get_all("Salary Component", fields=["salary_component_abbr"])
-		for sc in salary_components:
-			data.setdefault(sc.salary_component_abbr, 0)
+		self._employee_data_for_eval = (key, data)
+		return data
 
-		# shallow copy of data to store default amounts (without payment days) for tax calculation
-		default_data = data.copy()
+	def get_salary_structure_assignment(self, from_date=None):
+		"""Returns latest submitted assignment of the salary structure to the employee,
+		applicable on `from_date` if given"""
+		for d in get_employee_data_from_salary_slip_batch_cache(
+			("Salary Structure Assignment",), self.employee, get_salary_structure_assignments
+		):
+			if d.salary_structure == self.salary_structure and (
+				not from_date or getdate(d.from_date) <= getdate(from_date)
+			):
+				return d
 
-		for key in ("earnings", "deductions"):
-			for d in self.get(key):
-				default_data[d.abbr] = d.default_amount or 0
-				data[d.abbr] = d.amount or 0
+	def get_compiled_row(self, struct_row):
+		compiled_rows = get_compiled_salary_structure(
+			self._salary_structure_doc, self.whitelisted_globals
+		)
 
-		return data, default_data
+		compiled_row = compiled_rows.get(struct_row.name)
+		if not compiled_row:
+			compiled_row = compile_salary_structure_row(struct_row, self.whitelisted_globals)
+
+		return compiled_row
 
 	def eval_condition_and_formula(self, struct_row, data):
+		condition = formula = None
 		try:
-			condition = sanitize_expression(struct_row.condition)
+			compiled_row = self.get_compiled_row(struct_row)
+			condition = compiled_row.condition
 			if condition:
-				if not frappe.safe_eval(condition, self.whitelisted_globals, data):
+				if not evaluate_expression(
+					condition, compiled_row.condition_code, self.whitelisted_globals, data
+				):
 					return None
 			amount = struct_row.amount
 			if struct_row.amount_based_on_formula:
-				formula = sanitize_expression(struct_row.formula)
+				formula = compiled_row.formula
 				if formula:
 					amount = flt(
-						frappe.safe_eval(formula, self.whitelisted_globals, data), struct_row.precision("amount")
+						evaluate_expression(formula, compiled_row.formula_code, self.whitelisted_globals, data),
+						struct_row.precision("amount"),
 					)
 			if amount:
 				data[struct_row.abbr] = amount
@@ -1046,18 +1118,18 @@ class SalarySlip(TransactionBase):
 		return current_tax_amount
 
 	def get_income_tax_slabs(self, payroll_period):
-		income_tax_slab, ss_assignment_name = frappe.db.get_value(
-			"Salary Structure Assignment",
-			{"employee": self.employee, "salary_structure": self.salary_structure, "docstatus": 1},
-			["income_tax_slab", "name"],
-		)
+		salary_structure_assignment = self.get_salary_structure_assignment() or frappe._dict()
+		income_tax_slab = salary_structure_assignment.income_tax_slab
+		ss_assignment_name = salary_structure_assignment.name
 
 		if not income_tax_slab:
 			frappe.throw(
 				_("Income Tax Slab not set in Salary Structure Assignment: {0}").format(ss_assignment_name)
 			)
 
-		income_tax_slab_doc = frappe.get_doc("Income Tax Slab", income_tax_slab)
+		income_tax_slab_doc = get_from_salary_slip_batch_cache(
+			("Income Tax Slab", income_tax_slab), lambda: frappe.get_doc("Income Tax Slab", income_tax_slab)
+		)
 		if income_tax_slab_doc.disabled:
 			frappe.throw(_("Income Tax Slab: {0} is disabled").format(income_tax_slab))
 
@@ -1839,44 +1911,111 @@ def get_payroll_payable_account(company, payroll_entry):
 	return payroll_payable_account
 
 
-def get_lwp_or_ppl_for_date(date, employee, holidays):
+def get_payroll_settings():
+	return get_from_salary_slip_batch_cache(
+		("Payroll Settings",), lambda: frappe.db.get_singles_dict("Payroll Settings")
+	)
+
+
+def get_salary_structure_doc(salary_structure):
+	return get_from_salary_slip_batch_cache(
+		("Salary Structure", salary_structure),
+		lambda: frappe.get_doc("Salary Structure", salary_structure),
+	)
+
+
+def get_salary_structure_assignments(employees):
+	"""Returns submitted salary structure assignments of the employees, latest first"""
+	assignments = {}
+	for d in frappe.get_all(
+		"Salary Structure Assignment",
+		filters={"employee": ("in", employees), "docstatus": 1},
+		fields="*",
+		order_by="from_date desc",
+	):
+		assignments.setdefault(d.employee, []).append(d)
+
+	return assignments
+
+
+def get_attendance_of_employees(employees, start_date, end_date):
+	attendance = {}
+	for d in frappe.get_all(
+		"Attendance",
+		filters={
+			"employee": ("in", employees),
+			"docstatus": 1,
+			"attendance_date": ("between", [start_date, end_date]),
+		},
+		fields=["employee", "attendance_date", "status", "leave_type"],
+	):
+		attendance.setdefault(d.employee, []).append(d)
+
+	return attendance
+
+
+def get_lwp_or_ppl_leave_applications(employees, start_date, end_date):
+	"""Returns approved leave applications of leave types without pay or partially paid,
+	overlapping the period, by employee"""
 	LeaveApplication = frappe.qb.DocType("Leave Application")
 	LeaveType = frappe.qb.DocType("Leave Type")
 
-	is_half_day = (
-		frappe.qb.terms.Case()
-		.when(
-			(
-				(LeaveApplication.half_day_date == date)
-				| (LeaveApplication.from_date == LeaveApplication.to_date)
-			),
-			LeaveApplication.half_day,
-		)
-		.else_(0)
-	).as_("is_half_day")
-
 	query = (
 		frappe.qb.from_(LeaveApplication)
 		.inner_join(LeaveType)
 		.on((LeaveType.name == LeaveApplication.leave_type))
 		.select(
 			LeaveApplication.name,
+			LeaveApplication.employee,
+			LeaveApplication.from_date,
+			LeaveApplication.to_date,
+			LeaveApplication.half_day,
+			LeaveApplication.half_day_date,
 			LeaveType.is_ppl,
 			LeaveType.fraction_of_daily_salary_per_leave,
-			(is_half_day),
+			LeaveType.include_holiday,
 		)
 		.where(
 			(((LeaveType.is_lwp == 1) | (LeaveType.is_ppl == 1)))
 			& (LeaveApplication.docstatus == 1)
 			& (LeaveApplication.status == "Approved")
-			& (LeaveApplication.employee == employee)
+			& (LeaveApplication.employee.isin(employees))
 			& ((LeaveApplication.salary_slip.isnull()) | (LeaveApplication.salary_slip == ""))
-			& ((LeaveApplication.from_date <= date) & (date <= LeaveApplication.to_date))
+			& ((LeaveApplication.from_date <= end_date) & (start_date <= LeaveApplication.to_date))
 		)
+		.orderby(LeaveApplication.from_date)
 	)
 
-	# if it's a holiday only include if leave type has "include holiday" enabled
-	if date in holidays:
-		query = query.where((LeaveType.include_holiday == "1"))
+	leave_applications = {}
+	for d in query.run(as_dict=True):
+		leave_applications.setdefault(d.employee, []).append(d)
+
+	return leave_applications
+
+
+def get_lwp_or_ppl_for_date(date, leave_applications, holidays):
+	"""Returns leave applications from `get_lwp_or_ppl_leave_applications` applicable on the date"""
+	leaves = []
+	for d in leave_applications:
+		if not (getdate(d.from_date) <= getdate(date) <= getdate(d.to_date)):
+			continue
+
+		# if it's a holiday only include if leave type has "include holiday" enabled
+		if date in holidays and not cint(d.include_holiday):
+			continue
+
+		is_half_day = (
+			d.half_day
+			if (d.half_day_date and getdate(d.half_day_date) == getdate(date)) or d.from_date == d.to_date
+			else 0
+		)
+		leaves.append(
+			frappe._dict(
+				name=d.name,
+				is_ppl=d.is_ppl,
+				fraction_of_daily_salary_per_leave=d.fraction_of_daily_salary_per_leave,
+				is_half_day=is_half_day,
+			)
+		)
 
-	return query.run(as_dict=True)
+	return leaves
@@ -1,6 +1,7 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+import ast
 import re
 
 import frappe
@@ -10,6 +11,10 @@ from frappe.model.mapper import get_mapped_doc
 from frappe.utils import cint, cstr, flt
 
 import erpnext
+from erpnext.payroll.utils import compile_expression, prepare_error_msg, sanitize_expression
+
+# compiled conditions and formulas of the latest version of each salary structure
+compiled_salary_structures = {}
 
 
 class SalaryStructure(Document):
@@ -17,6 +22,7 @@ class SalaryStructure(Document):
 		self.set_missing_values()
 		self.validate_amount()
 		self.strip_condition_and_formula_fields()
+		self.validate_conditions_and_formulas()
 		self.validate_max_benefits_with_flexi()
 		self.validate_component_based_on_tax_slab()
 		self.validate_payment_days_based_dependent_component()
@@ -115,6 +121,43 @@ class SalaryStructure(Document):
 			row.condition = row.condition.strip() if row.condition else ""
 			row.formula = row.formula.strip() if row.formula else ""
 
+	def validate_conditions_and_formulas(self):
+		"""Check syntax of conditions and formulas, and warn if a formula uses a component
+		that is only calculated after it."""
+		rows = self.earnings + self.deductions
+		position = {row.abbr: i for i, row in enumerate(rows) if row.abbr}
+
+		for i, row in enumerate(rows):
+			for expression in get_row_expressions(row):
+				try:
+					tree = ast.parse(expression, mode="eval")
+				except SyntaxError as se:
+					message = prepare_error_msg(
+						row=row,
+						error=se,
+						expression=expression,
+						description=_("Please check the syntax of your formula."),
+					)
+					frappe.throw(message, title=_("Syntax error"))
+
+				later_components = {
+					node.id
+					for node in ast.walk(tree)
+					if isinstance(node, ast.Name) and position.get(node.id, -1) > i
+				}
+				if later_components:
+					frappe.msgprint(
+						_(
+							"Row #{0}: {1} uses {2}, which is calculated after it. Move the component below them to use their amounts."
+						).format(
+							row.idx,
+							frappe.bold(row.salary_component),
+							", ".join(frappe.bold(abbr) for abbr in sorted(later_components)),
+						),
+						title=_("Warning"),
+						indicator="orange",
+					)
+
 	def validate_max_benefits_with_flexi(self):
 		have_a_flexi = False
 		if self.earnings:
@@ -202,6 +245,65 @@ class SalaryStructure(Document):
 			frappe.msgprint(_("No Employee Found"))
 
 
+def get_row_expressions(row):
+	"""Returns sanitized condition and formula of the row, that are used in salary slips."""
+	expressions = [sanitize_expression(row.condition)]
+	if row.amount_based_on_formula:
+		expressions.append(sanitize_expression(row.formula))
+
+	return [expression for expression in expressions if expression]
+
+
+def get_compiled_salary_structure(salary_structure, whitelisted_globals):
+	"""Returns compiled condition and formula of each row of the salary structure, by row name.
+
+	Rows are compiled once for each version of the salary structure and shared by all
+	salary slips of it."""
+	key = (frappe.local.site, salary_structure.name)
+	version = (str(salary_structure.modified), get_formula_functions(whitelisted_globals))
+
+	compiled = compiled_salary_structures.get(key)
+	if not compiled or compiled.version != version:
+		compiled = frappe._dict(version=version, rows={})
+		for row in salary_structure.earnings + salary_structure.deductions:
+			if row.name:
+				compiled.rows[row.name] = compile_salary_structure_row(row, whitelisted_globals)
+
+		compiled_salary_structures[key] = compiled
+
+	return compiled.rows
+
+
+def compile_salary_structure_row(row, whitelisted_globals):
+	allowed_functions = get_formula_functions(whitelisted_globals)
+	condition = sanitize_expression(row.condition)
+	formula = sanitize_expression(row.formula) if row.amount_based_on_formula else None
+
+	return frappe._dict(
+		condition=condition,
+		condition_code=get_code(condition, allowed_functions),
+		formula=formula,
+		formula_code=get_code(formula, allowed_functions),
+	)
+
+
+def get_formula_functions(whitelisted_globals):
+	return frozenset(
+		name for name, value in whitelisted_globals.items() if callable(value) and "__" not in name
+	)
+
+
+def get_code(expression, allowed_functions):
+	if not expression:
+		return None
+
+	try:
+		return compile_expression(expression, allowed_functions)
+	except SyntaxError:
+		# evaluated with frappe.safe_eval, that reports the error in the salary slip
+		return None
+
+
 def assign_salary_structure_for_employees(
 	employees,
 	salary_structure,
@@ -4,7 +4,7 @@
 import unittest
 
 import frappe
-from frappe.utils import add_years, date_diff, get_first_day, nowdate
+from frappe.utils import add_years, date_diff, get_first_day, getdate, nowdate
 from frappe.utils.make_random import get_random
 
 import erpnext
@@ -19,6 +19,7 @@ from erpnext.payroll.doctype.salary_slip.test_salary_slip import (
 	make_employee_salary_slip,
 )
 from erpnext.payroll.doctype.salary_structure.salary_structure import make_salary_slip
+from erpnext.payroll.utils import compile_expression, evaluate_expression
 
 test_dependencies = ["Fiscal Year"]
 
@@ -109,6 +110,34 @@ class TestSalaryStructure(unittest.TestCase):
 		for row in salary_structure.deductions:
 			self.assertFalse(("\n" in row.formula) or ("\n" in row.condition))
 
+	def test_formula_syntax_validated_on_save(self):
+		salary_structure = make_salary_structure("Salary Structure Sample", "Monthly", dont_submit=True)
+		salary_structure.earnings[0].amount_based_on_formula = 1
+		salary_structure.earnings[0].formula = "base * (0.5"
+
+		self.assertRaises(frappe.ValidationError, salary_structure.save)
+
+	def test_compiled_formulas(self):
+		whitelisted_globals = {"int": int, "round": round, "getdate": getdate}
+		data = frappe._dict(base=25000, gross_pay=40000, BS=12500, relieving_date=None)
+
+		for expression in (
+			"base * 0.5",
+			"round(BS * 0.12) if gross_pay > 15000 else 0",
+			"not relieving_date and gross_pay >= 40000",
+			"int(base / 3)",
+		):
+			code = compile_expression(expression, whitelisted_globals)
+			self.assertTrue(code)
+			self.assertEqual(
+				evaluate_expression(expression, code, whitelisted_globals, data),
+				frappe.safe_eval(expression, dict(whitelisted_globals), data),
+			)
+
+		# attribute access and calls to other functions are left to frappe.safe_eval
+		for expression in ("getdate().year", "max(base, BS)", "base.__class__"):
+			self.assertIsNone(compile_expression(expression, whitelisted_globals))
+
 	def test_salary_structures_assignment(self):
 		company_currency = erpnext.get_default_currency()
 		salary_structure = make_salary_structure(
@@ -1,4 +1,6 @@
-from typing import Optional
+import ast
+from types import CodeType
+from typing import Any, Callable, Collection, Optional
 
 import frappe
 from frappe import _
@@ -64,3 +66,127 @@ def prepare_error_msg(*, row: dict, error: str, expression: str, description: st
 		msg += "<br><br>{0}: {1}".format(frappe.bold(_("Hint:")), description)
 
 	return msg
+
+
+# expressions made only of these nodes can be evaluated without `frappe.safe_eval`
+SAFE_EXPRESSION_NODES = tuple(
+	getattr(ast, node)
+	for node in (
+		"Expression",
+		"BoolOp",
+		"BinOp",
+		"UnaryOp",
+		"IfExp",
+		"Compare",
+		"Call",
+		"keyword",
+		"Name",
+		"Load",
+		"Constant",
+		"Num",
+		"Str",
+		"NameConstant",
+		"Tuple",
+		"List",
+		"boolop",
+		"operator",
+		"unaryop",
+		"cmpop",
+	)
+	if hasattr(ast, node)
+)
+
+
+def compile_expression(expression: str, allowed_functions: Collection[str]) -> Optional[CodeType]:
+	"""
+	Compiles a sanitized condition or formula of a salary component.
+
+	Args:
+	    expression (str): The sanitized expression.
+	    allowed_functions (Collection[str]): Names of functions the expression can call.
+
+	Returns:
+	    Optional[CodeType]: The code object, or None if the expression uses anything other than
+	    operators, names, constants and calls to `allowed_functions`. Such expressions have to
+	    be evaluated with `frappe.safe_eval`.
+
+	Raises:
+	    SyntaxError: If the expression is not valid.
+	"""
+	tree = ast.parse(expression, mode="eval")
+	if "__" in expression:
+		return None
+
+	for node in ast.walk(tree):
+		if not isinstance(node, SAFE_EXPRESSION_NODES):
+			return None
+
+		if isinstance(node, ast.Name) and "__" in node.id:
+			return None
+
+		if isinstance(node, ast.Call) and not (
+			isinstance(node.func, ast.Name) and node.func.id in allowed_functions
+		):
+			return None
+
+	return compile(tree, "<salary component>", "eval")
+
+
+def evaluate_expression(
+	expression: str, code: Optional[CodeType], eval_globals: dict, data: dict
+) -> object:
+	"""
+	Evaluates a condition or formula with its code object from `compile_expression`,
+	same as `frappe.safe_eval` would evaluate the expression.
+
+	Args:
+	    expression (str): The sanitized expression.
+	    code (Optional[CodeType]): The code object of the expression.
+	    eval_globals (dict): Whitelisted globals.
+	    data (dict): Values of the names used in the expression.
+	"""
+	if code is None:
+		return frappe.safe_eval(expression, eval_globals, data)
+
+	return eval(code, dict(eval_globals, __builtins__={}), data)
+
+
+def get_from_salary_slip_batch_cache(key: tuple, generator: Callable[[], Any]) -> Any:
+	"""
+	Returns a value shared by the salary slips of a chunk of employees processed together
+	by Payroll Entry. Outside of it, value is generated on every call.
+
+	Args:
+	    key (tuple): Key of the value in the batch cache.
+	    generator (Callable): Returns the value if it is not cached yet.
+	"""
+	batch_cache = frappe.flags.salary_slip_batch_cache
+	if batch_cache is None:
+		return generator()
+
+	if key not in batch_cache:
+		batch_cache[key] = generator()
+
+	return batch_cache[key]
+
+
+def get_employee_data_from_salary_slip_batch_cache(
+	key: tuple, employee: str, method: Callable[..., dict], *args: Any
+) -> list:
+	"""
+	Returns rows of `employee` from `method(employees, *args)`. The method is called once for
+	all employees of the chunk being processed by Payroll Entry, or only for `employee`
+	outside of it.
+
+	Args:
+	    key (tuple): Key of the value in the batch cache.
+	    employee (str): Employee to return the rows of.
+	    method (Callable): Returns a dict of rows by employee for a list of employees.
+	"""
+	batch_cache = frappe.flags.salary_slip_batch_cache
+	if batch_cache is None or employee not in batch_cache.get("employees", ()):
+		return method([employee], *args).get(employee, [])
+
+	return get_from_salary_slip_batch_cache(
+		key, lambda: method(list(batch_cache["employees"]), *args)
+	).get(employee, [])
@@ -11,6 +11,9 @@ from frappe.model.document import Document
 from frappe.utils import cstr, flt
 from six import iteritems
 
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	get_item_wise_tax_details,
+)
 from erpnext.regional.india import state_numbers
 
 
@@ -267,53 +270,53 @@ class GSTR3BReport(Document):
 		self.cgst_sgst_invoices = []
 
 		if self.get("invoices"):
-			tax_details = frappe.db.sql(
+			if self.account_heads.get("csamt"):
+				for parent, tax_amount in frappe.db.sql(
+					"""
+					SELECT
+						parent, base_tax_amount_after_discount_amount
+					FROM `tab%s`
+					WHERE
+						parenttype = %s and docstatus = 1
+						and parent in (%s) and account_head in (%s)
+					ORDER BY account_head
 				"""
-				SELECT
-					parent, account_head, item_wise_tax_detail, base_tax_amount_after_discount_amount
-				FROM `tab%s`
-				WHERE
-					parenttype = %s and docstatus = 1
-					and parent in (%s)
-				ORDER BY account_head
-			"""
-				% (tax_template, "%s", ", ".join(["%s"] * len(self.invoices))),
-				tuple([doctype] + list(self.invoices)),
-			)
+					% (
+						tax_template,
+						"%s",
+						", ".join(["%s"] * len(self.invoices)),
+						", ".join(["%s"] * len(self.account_heads.get("csamt"))),
+					),
+					tuple([doctype] + list(self.invoices) + list(self.account_heads.get("csamt"))),
+				):
+					self.invoice_cess.setdefault(parent, tax_amount)
 
-			for parent, account, item_wise_tax_detail, tax_amount in tax_details:
+			for d in get_item_wise_tax_details(doctype, self.invoices):
+				parent, account, item_code = d.parent, d.account_head, d.item_code
 				if account in self.account_heads.get("csamt"):
-					self.invoice_cess.setdefault(parent, tax_amount)
-				else:
-					if item_wise_tax_detail:
-						try:
-							item_wise_tax_detail = json.loads(item_wise_tax_detail)
-							cgst_or_sgst = False
-							if account in self.account_heads.get("camt") or account in self.account_heads.get("samt"):
-								cgst_or_sgst = True
-
-							for item_code, tax_amounts in item_wise_tax_detail.items():
-								if not (
-									cgst_or_sgst
-									or account in self.account_heads.get("iamt")
-									or (item_code in self.is_non_gst + self.is_nil_exempt)
-								):
-									continue
+					continue
 
-								tax_rate = tax_amounts[0]
-								if tax_rate:
-									if cgst_or_sgst:
-										tax_rate *= 2
-										if parent not in self.cgst_sgst_invoices:
-											self.cgst_sgst_invoices.append(parent)
+				cgst_or_sgst = False
+				if account in self.account_heads.get("camt") or account in self.account_heads.get("samt"):
+					cgst_or_sgst = True
 
-									rate_based_dict = self.items_based_on_tax_rate.setdefault(parent, {}).setdefault(
-										tax_rate, []
-									)
-									if item_code not in rate_based_dict:
-										rate_based_dict.append(item_code)
-						except ValueError:
-							continue
+				if not (
+					cgst_or_sgst
+					or account in self.account_heads.get("iamt")
+					or (item_code in self.is_non_gst + self.is_nil_exempt)
+				):
+					continue
+
+				tax_rate = d.rate
+				if tax_rate:
+					if cgst_or_sgst:
+						tax_rate *= 2
+						if parent not in self.cgst_sgst_invoices:
+							self.cgst_sgst_invoices.append(parent)
+
+					rate_based_dict = self.items_based_on_tax_rate.setdefault(parent, {}).setdefault(tax_rate, [])
+					if item_code not in rate_based_dict:
+						rate_based_dict.append(item_code)
 
 		if self.get("invoice_items"):
 			# Build itemised tax for export invoices, nil and exempted where tax table is blank
@@ -9,6 +9,7 @@ import os
 import re
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 import frappe
 import jwt
@@ -35,6 +36,11 @@ from pyqrcode import create as qrcreate
 
 from erpnext.regional.india.utils import get_gst_accounts, get_place_of_supply
 
+GSP_URL = "https://gsp.adaequare.com"
+GSP_REQUEST_TIMEOUT = 60
+EINVOICE_BULK_WORKERS = 8
+EINVOICE_BULK_CHUNK_SIZE = 50
+
 
 @frappe.whitelist()
 def validate_eligibility(doc):
@@ -826,20 +832,23 @@ class CancellationNotAllowed(Exception):
 
 
 class GSPConnector:
-	def __init__(self, doctype=None, docname=None):
+	def __init__(self, doctype=None, docname=None, session=None):
 		self.doctype = doctype
 		self.docname = docname
+		# keep-alive session used by bulk actions, see get_gsp_session
+		self.session = session
+		self.seller_gstins = {}
+		self.passwords = {}
 
 		self.set_invoice()
 		self.set_credentials()
 
+		# url can be set in site config to test against a mock GSP
+		gsp_url = frappe.conf.einvoice_gsp_url or GSP_URL
+
 		# authenticate url is same for sandbox & live
-		self.authenticate_url = "https://gsp.adaequare.com/gsp/authenticate?grant_type=token"
-		self.base_url = (
-			"https://gsp.adaequare.com"
-			if not self.e_invoice_settings.sandbox_mode
-			else "https://gsp.adaequare.com/test"
-		)
+		self.authenticate_url = gsp_url + "/gsp/authenticate?grant_type=token"
+		self.base_url = gsp_url if not self.e_invoice_settings.sandbox_mode else gsp_url + "/test"
 
 		self.cancel_irn_url = self.base_url + "/enriched/ei/api/invoice/cancel"
 		self.irn_details_url = self.base_url + "/enriched/ei/api/invoice/irn"
@@ -884,7 +893,9 @@ class GSPConnector:
 			)
 
 	def get_seller_gstin(self):
-		gstin = frappe.db.get_value("Address", self.invoice.company_address, "gstin")
+		gstin = self.seller_gstins.get(self.invoice.name) or frappe.db.get_value(
+			"Address", self.invoice.company_address, "gstin"
+		)
 		if not gstin:
 			frappe.throw(
 				_("Cannot retrieve Company GSTIN. Please select company address with valid GSTIN.")
@@ -900,7 +911,9 @@ class GSPConnector:
 	def make_request(self, request_type, url, headers=None, data=None):
 		res = None
 		try:
-			if request_type == "post":
+			if self.session:
+				res = send_gsp_request(self.session, request_type, url, headers, data)
+			elif request_type == "post":
 				res = make_post_request(url, headers=headers, data=data)
 			else:
 				res = make_get_request(url, headers=headers, data=data)
@@ -961,12 +974,18 @@ class GSPConnector:
 		return {
 			"content-type": "application/json",
 			"user_name": self.credentials.username,
-			"password": self.credentials.get_password(),
+			"password": self.get_password(),
 			"gstin": self.credentials.gstin,
 			"authorization": self.get_auth_token(),
 			"requestid": str(base64.b64encode(os.urandom(18))),
 		}
 
+	def get_password(self):
+		if self.credentials.name not in self.passwords:
+			self.passwords[self.credentials.name] = self.credentials.get_password()
+
+		return self.passwords[self.credentials.name]
+
 	def fetch_gstin_details(self, gstin):
 		headers = self.get_headers()
 
@@ -1000,13 +1019,20 @@ class GSPConnector:
 		frappe.cache().hset("gstin_cache", key, details)
 		return details
 
-	def generate_irn(self):
-		data = {}
+	def generate_irn(self, data=None, res=None, error=None):
+		"""Generate IRN of the invoice.
+
+		Bulk generation sends requests from worker threads and passes the request `data` and
+		`res` or `error` of the request here."""
 		try:
-			headers = self.get_headers()
-			einvoice = make_einvoice(self.invoice)
-			data = json.dumps(einvoice, indent=4)
-			res = self.make_request("post", self.generate_irn_url, headers, data)
+			if error:
+				raise error
+
+			if not data:
+				headers = self.get_headers()
+				einvoice = make_einvoice(self.invoice)
+				data = json.dumps(einvoice, indent=4)
+				res = self.make_request("post", self.generate_irn_url, headers, data)
 
 			if res.get("success"):
 				self.set_einvoice_data(res.get("result"))
@@ -1038,24 +1064,119 @@ class GSPConnector:
 			self.raise_error(True)
 
 	@staticmethod
-	def bulk_generate_irn(invoices):
-		gsp_connector = GSPConnector()
+	def bulk_generate_irn(invoices, max_workers=None):
+		"""Generate IRNs of `invoices`, sending requests to the GSP concurrently.
+
+		E-invoices are made and responses are saved in the calling thread, only the requests are
+		sent from a bounded pool of worker threads over a keep-alive session. Invoices which
+		already have an IRN are skipped, so an interrupted run can be started again."""
+		max_workers = cint(max_workers or frappe.conf.einvoice_bulk_workers) or EINVOICE_BULK_WORKERS
+		gsp_connector = GSPConnector(session=get_gsp_session(max_workers))
 		gsp_connector.doctype = "Sales Invoice"
 
+		pending_invoices = gsp_connector.get_invoices_pending_irn(invoices)
 		failed = []
 
-		for invoice in invoices:
-			try:
-				gsp_connector.docname = invoice
-				gsp_connector.set_invoice()
-				gsp_connector.set_credentials()
-				gsp_connector.generate_irn()
-
-			except Exception as e:
-				failed.append({"docname": invoice, "message": str(e)})
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			for i in range(0, len(pending_invoices), EINVOICE_BULK_CHUNK_SIZE):
+				irn_requests = []
+				for invoice in pending_invoices[i : i + EINVOICE_BULK_CHUNK_SIZE]:
+					try:
+						gsp_connector.docname = invoice
+						gsp_connector.set_invoice()
+						gsp_connector.set_credentials()
+						headers, data = gsp_connector.get_irn_request()
+					except Exception as e:
+						failed.append({"docname": invoice, "message": str(e)})
+						continue
+
+					future = executor.submit(
+						send_gsp_request,
+						gsp_connector.session,
+						"post",
+						gsp_connector.generate_irn_url,
+						headers,
+						data,
+					)
+					irn_requests.append((gsp_connector.invoice, gsp_connector.credentials, headers, data, future))
+
+				for invoice, credentials, headers, data, future in irn_requests:
+					try:
+						# reuse the invoice loaded while preparing its request
+						gsp_connector.docname = invoice.name
+						gsp_connector.invoice = invoice
+						gsp_connector.credentials = credentials
+						gsp_connector.set_irn_from_response(headers, data, future)
+						frappe.db.commit()
+
+					except Exception as e:
+						failed.append({"docname": invoice.name, "message": str(e)})
+
+				frappe.publish_realtime(
+					"bulk_einvoice_generation_progress",
+					{
+						"processed": min(i + EINVOICE_BULK_CHUNK_SIZE, len(pending_invoices)),
+						"total": len(pending_invoices),
+					},
+					user=frappe.session.user,
+				)
 
 		return failed
 
+	def get_invoices_pending_irn(self, invoices):
+		"""Returns invoices without IRN, and sets their seller GSTIN in one query."""
+		if not invoices:
+			return []
+
+		pending_invoices = []
+		for name, irn, gstin in frappe.db.sql(
+			"""
+			select si.name, si.irn, address.gstin
+			from `tabSales Invoice` si
+			left join `tabAddress` address on address.name = si.company_address
+			where si.name in %s""",
+			(tuple(invoices),),
+		):
+			if gstin:
+				self.seller_gstins[name] = gstin
+			if not irn:
+				pending_invoices.append(name)
+
+		# keep the order in which invoices were selected
+		pending = set(pending_invoices)
+		return [invoice for invoice in invoices if invoice in pending]
+
+	def get_irn_request(self):
+		"""Returns headers and data of the request to generate IRN of the invoice."""
+		try:
+			headers = self.get_headers()
+			data = json.dumps(make_einvoice(self.invoice), indent=4)
+		except Exception as e:
+			self.generate_irn(error=e)
+
+		return headers, data
+
+	def set_irn_from_response(self, headers, data, future):
+		res, error = None, None
+		try:
+			res = future.result()
+			self.log_request(self.generate_irn_url, headers, data, res)
+
+		except requests.exceptions.HTTPError as e:
+			if e.response.status_code in [401, 403]:
+				# token expired while the batch was running, refresh it once and retry
+				if headers.get("authorization") == self.e_invoice_settings.auth_token:
+					self.fetch_auth_token()
+				res = self.make_request("post", self.generate_irn_url, self.get_headers(), data)
+			else:
+				self.log_request(self.generate_irn_url, headers, data, None)
+				error = e
+
+		except Exception as e:
+			error = e
+
+		self.generate_irn(data=data, res=res, error=error)
+
 	def fetch_and_attach_qrcode_from_irn(self):
 		is_qrcode_file_attached = self.invoice.qrcode_image and frappe.db.exists(
 			"File",
@@ -1446,6 +1567,25 @@ class GSPConnector:
 		return errors
 
 
+def get_gsp_session(pool_size=EINVOICE_BULK_WORKERS):
+	"""Returns a session that keeps connections to the GSP alive and reuses them across requests."""
+	session = requests.Session()
+	adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size, max_retries=3)
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+
+	return session
+
+
+def send_gsp_request(session, request_type, url, headers=None, data=None):
+	"""Send request to the GSP over `session` and return the response.
+
+	Doesn't use `frappe`, so it can be called from worker threads."""
+	res = session.request(request_type, url, headers=headers, data=data, timeout=GSP_REQUEST_TIMEOUT)
+	res.raise_for_status()
+	return res.json()
+
+
 def sanitize_for_json(string):
 	"""Escape JSON specific characters from a string."""
 
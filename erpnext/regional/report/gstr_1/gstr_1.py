@@ -10,6 +10,9 @@ from frappe import _
 from frappe.utils import flt, formatdate, getdate
 from six import iteritems
 
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	get_item_wise_tax_details,
+)
 from erpnext.regional.india.utils import get_gst_accounts
 
 
@@ -371,58 +374,59 @@ class Gstr1Report(object):
 	def get_items_based_on_tax_rate(self):
 		hsn_wise_tax_rate = get_hsn_wise_tax_rates()
 
-		self.tax_details = frappe.db.sql(
-			"""
-			select
-				parent, account_head, item_wise_tax_detail, base_tax_amount_after_discount_amount
-			from `tab%s`
-			where
-				parenttype = %s and docstatus = 1
-				and parent in (%s)
-			order by account_head
-		"""
-			% (self.tax_doctype, "%s", ", ".join(["%s"] * len(self.invoices.keys()))),
-			tuple([self.doctype] + list(self.invoices.keys())),
-		)
-
 		self.items_based_on_tax_rate = {}
 		self.invoice_cess = frappe._dict()
 		self.cgst_sgst_invoices = []
 
+		if self.gst_accounts.cess_account:
+			for parent, tax_amount in frappe.db.sql(
+				"""
+				select parent, base_tax_amount_after_discount_amount
+				from `tab%s`
+				where
+					parenttype = %s and docstatus = 1
+					and parent in (%s) and account_head in (%s)
+				order by account_head
+			"""
+				% (
+					self.tax_doctype,
+					"%s",
+					", ".join(["%s"] * len(self.invoices.keys())),
+					", ".join(["%s"] * len(self.gst_accounts.cess_account)),
+				),
+				tuple([self.doctype] + list(self.invoices.keys()) + list(self.gst_accounts.cess_account)),
+			):
+				self.invoice_cess.setdefault(parent, tax_amount)
+
 		unidentified_gst_accounts = []
 		unidentified_gst_accounts_invoice = []
-		for parent, account, item_wise_tax_detail, tax_amount in self.tax_details:
+		for d in get_item_wise_tax_details(self.doctype, self.invoices.keys()):
+			parent, account = d.parent, d.account_head
 			if account in self.gst_accounts.cess_account:
-				self.invoice_cess.setdefault(parent, tax_amount)
-			else:
-				if item_wise_tax_detail:
-					try:
-						item_wise_tax_detail = json.loads(item_wise_tax_detail)
-						cgst_or_sgst = False
-						if account in self.gst_accounts.cgst_account or account in self.gst_accounts.sgst_account:
-							cgst_or_sgst = True
-
-						if not (cgst_or_sgst or account in self.gst_accounts.igst_account):
-							if "gst" in account.lower() and account not in unidentified_gst_accounts:
-								unidentified_gst_accounts.append(account)
-								unidentified_gst_accounts_invoice.append(parent)
-							continue
-
-						for item_code, tax_amounts in item_wise_tax_detail.items():
-							tax_rate = tax_amounts[0]
-							if tax_rate:
-								if cgst_or_sgst:
-									tax_rate *= 2
-									if parent not in self.cgst_sgst_invoices:
-										self.cgst_sgst_invoices.append(parent)
-
-								rate_based_dict = self.items_based_on_tax_rate.setdefault(parent, {}).setdefault(
-									tax_rate, []
-								)
-								if item_code not in rate_based_dict:
-									rate_based_dict.append(item_code)
-					except ValueError:
-						continue
+				continue
+
+			cgst_or_sgst = False
+			if account in self.gst_accounts.cgst_account or account in self.gst_accounts.sgst_account:
+				cgst_or_sgst = True
+
+			if not (cgst_or_sgst or account in self.gst_accounts.igst_account):
+				if "gst" in account.lower() and account not in unidentified_gst_accounts:
+					unidentified_gst_accounts.append(account)
+					unidentified_gst_accounts_invoice.append(parent)
+				continue
+
+			tax_rate = d.rate
+			if tax_rate:
+				if cgst_or_sgst:
+					tax_rate *= 2
+					if parent not in self.cgst_sgst_invoices:
+						self.cgst_sgst_invoices.append(parent)
+
+				rate_based_dict = self.items_based_on_tax_rate.setdefault(parent, {}).setdefault(
+					tax_rate, []
+				)
+				if d.item_code not in rate_based_dict:
+					rate_based_dict.append(d.item_code)
 		if unidentified_gst_accounts:
 			frappe.msgprint(
 				_("Following accounts might be selected in GST Settings:")
@@ -11,6 +11,9 @@ from frappe.utils import cstr, flt, getdate
 from six import iteritems
 
 import erpnext
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	get_item_wise_tax_details,
+)
 from erpnext.regional.india.utils import get_gst_accounts
 from erpnext.regional.report.gstr_1.gstr_1 import get_company_gstin_number
 
@@ -202,8 +205,7 @@ def get_tax_accounts(
 	tax_details = frappe.db.sql(
 		"""
 		select
-			parent, account_head, item_wise_tax_detail,
-			base_tax_amount_after_discount_amount
+			parent, account_head, base_tax_amount_after_discount_amount
 		from `tab%s`
 		where
 			parenttype = %s and docstatus = 1
@@ -216,43 +218,42 @@ def get_tax_accounts(
 		tuple([doctype] + list(invoice_item_row)),
 	)
 
-	for parent, account_head, item_wise_tax_detail, tax_amount in tax_details:
-
+	for parent, account_head, tax_amount in tax_details:
 		if account_head in output_gst_accounts and account_head not in tax_columns and tax_amount:
 			# as description is text editor earlier and markup can break the column convention in reports
 			tax_columns.append(account_head)
 
-		if item_wise_tax_detail:
-			try:
-				item_wise_tax_detail = json.loads(item_wise_tax_detail)
-
-				for item_code, tax_data in item_wise_tax_detail.items():
-					if not frappe.db.get_value("Item", item_code, "gst_hsn_code"):
-						continue
-					itemised_tax.setdefault(item_code, frappe._dict())
-					if isinstance(tax_data, list):
-						tax_rate = 0
-						is_gst_tax = 0
-						if account_head in output_gst_accounts:
-							is_gst_tax = 1
-							tax_rate = tax_data[0]
-						tax_amount = tax_data[1]
-					else:
-						tax_rate = 0
-						tax_amount = 0
-
-					for d in item_row_map.get(parent, {}).get(item_code, []):
-						item_tax_amount = tax_amount
-						if item_tax_amount:
-							itemised_tax.setdefault((parent, item_code), {})[account_head] = frappe._dict(
-								{
-									"tax_rate": flt(tax_rate, 2),
-									"is_gst_tax": is_gst_tax,
-									"tax_amount": flt(item_tax_amount, tax_amount_precision),
-								}
-							)
-			except ValueError:
-				continue
+	item_wise_tax_details = get_item_wise_tax_details(doctype, invoice_item_row)
+	items_with_hsn_code = set(
+		frappe.get_all(
+			"Item",
+			filters={
+				"name": ("in", list({d.item_code for d in item_wise_tax_details}) or [""]),
+				"gst_hsn_code": ("is", "set"),
+			},
+			pluck="name",
+		)
+	)
+
+	for d in item_wise_tax_details:
+		if d.item_code not in items_with_hsn_code:
+			continue
+
+		itemised_tax.setdefault(d.item_code, frappe._dict())
+		tax_rate = 0
+		is_gst_tax = 0
+		if d.account_head in output_gst_accounts:
+			is_gst_tax = 1
+			tax_rate = d.rate
+
+		if d.tax_amount and item_row_map.get(d.parent, {}).get(d.item_code):
+			itemised_tax.setdefault((d.parent, d.item_code), {})[d.account_head] = frappe._dict(
+				{
+					"tax_rate": flt(tax_rate, 2),
+					"is_gst_tax": is_gst_tax,
+					"tax_amount": flt(d.tax_amount, tax_amount_precision),
+				}
+			)
 
 	tax_columns.sort()
 	for account_head in tax_columns:
@@ -2,11 +2,9 @@
 # For license information, please see license.txt
 
 
-import json
-
 import frappe
 from frappe import _
-from frappe.utils import get_url_to_list
+from frappe.utils import flt, get_url_to_list
 
 
 def execute(filters=None):
@@ -155,41 +153,51 @@ def get_tax_data_for_each_vat_setting(vat_setting, filters, doctype):
 	(KSA, {filters}, 'Sales Invoice') => 500, 153, 10 \n
 	calculates and returns \n
 	total_taxable_amount, total_taxable_adjustment_amount, total_tax"""
-	from_date = filters.get("from_date")
-	to_date = filters.get("to_date")
+	values = {
+		"doctype": doctype,
+		"from_date": filters.get("from_date"),
+		"to_date": filters.get("to_date"),
+		"item_tax_template": vat_setting.item_tax_template,
+		"account": vat_setting.account,
+	}
+	conditions = """item.parent = inv.name and inv.docstatus = 1
+		and inv.posting_date between %(from_date)s and %(to_date)s
+		and item.item_tax_template = %(item_tax_template)s"""
 
 	# Initiate variables
 	total_taxable_amount = 0
 	total_taxable_adjustment_amount = 0
-	total_tax = 0
-	# Fetch All Invoices
-	invoices = frappe.get_all(
-		doctype,
-		filters={"docstatus": 1, "posting_date": ["between", [from_date, to_date]]},
-		fields=["name", "is_return"],
-	)
-
-	for invoice in invoices:
-		invoice_items = frappe.get_all(
-			f"{doctype} Item",
-			filters={
-				"docstatus": 1,
-				"parent": invoice.name,
-				"item_tax_template": vat_setting.item_tax_template,
-			},
-			fields=["item_code", "base_net_amount"],
-		)
 
-		for item in invoice_items:
-			# Summing up total taxable amount
-			if invoice.is_return == 0:
-				total_taxable_amount += item.base_net_amount
-
-			if invoice.is_return == 1:
-				total_taxable_adjustment_amount += item.base_net_amount
-
-			# Summing up total tax
-			total_tax += get_tax_amount(item.item_code, vat_setting.account, doctype, invoice.name)
+	# Summing up total taxable amount of invoices and returns
+	for is_return, amount in frappe.db.sql(
+		"""
+		select inv.is_return, sum(item.base_net_amount)
+		from `tab{doctype} Item` item, `tab{doctype}` inv
+		where {conditions}
+		group by inv.is_return""".format(
+			doctype=doctype, conditions=conditions
+		),
+		values,
+	):
+		if is_return:
+			total_taxable_adjustment_amount += flt(amount)
+		else:
+			total_taxable_amount += flt(amount)
+
+	# Summing up total tax of the items on the VAT account
+	total_tax = flt(
+		frappe.db.sql(
+			"""
+			select sum(itd.tax_amount)
+			from `tab{doctype} Item` item, `tab{doctype}` inv, `tabItem Wise Tax Detail` itd
+			where {conditions}
+				and itd.voucher_type = %(doctype)s and itd.voucher_no = inv.name
+				and itd.item_code = item.item_code and itd.account_head = %(account)s""".format(
+				doctype=doctype, conditions=conditions
+			),
+			values,
+		)[0][0]
+	)
 
 	return total_taxable_amount, total_taxable_adjustment_amount, total_tax
 
@@ -205,27 +213,3 @@ def append_data(data, title, amount, adjustment_amount, vat_amount, company_curr
 			"currency": company_currency,
 		}
 	)
-
-
-def get_tax_amount(item_code, account_head, doctype, parent):
-	if doctype == "Sales Invoice":
-		tax_doctype = "Sales Taxes and Charges"
-
-	elif doctype == "Purchase Invoice":
-		tax_doctype = "Purchase Taxes and Charges"
-
-	item_wise_tax_detail = frappe.get_value(
-		tax_doctype,
-		{"docstatus": 1, "parent": parent, "account_head": account_head},
-		"item_wise_tax_detail",
-	)
-
-	tax_amount = 0
-	if item_wise_tax_detail and len(item_wise_tax_detail) > 0:
-		item_wise_tax_detail = json.loads(item_wise_tax_detail)
-		for key, value in item_wise_tax_detail.items():
-			if key == item_code:
-				tax_amount = value[1]
-				break
-
-	return tax_amount
@@ -2,12 +2,14 @@
 # For license information, please see license.txt
 
 
-import json
-
 import frappe
 from frappe import _
 from frappe.utils import formatdate, get_link_to_form
 
+from erpnext.accounts.doctype.item_wise_tax_detail.item_wise_tax_detail import (
+	get_item_wise_tax_details,
+)
+
 
 def execute(filters=None):
 	return VATAuditReport(filters).run()
@@ -102,48 +104,22 @@ class VATAuditReport(object):
 	def get_items_based_on_tax_rate(self, doctype):
 		self.items_based_on_tax_rate = frappe._dict()
 		self.item_tax_rate = frappe._dict()
-		self.tax_doctype = (
-			"Purchase Taxes and Charges" if doctype == "Purchase Invoice" else "Sales Taxes and Charges"
-		)
-
-		self.tax_details = frappe.db.sql(
-			"""
-			SELECT
-				parent, account_head, item_wise_tax_detail
-			FROM
-				`tab%s`
-			WHERE
-				parenttype = %s and docstatus = 1
-				and parent in (%s)
-			ORDER BY
-				account_head
-			"""
-			% (self.tax_doctype, "%s", ", ".join(["%s"] * len(self.invoices.keys()))),
-			tuple([doctype] + list(self.invoices.keys())),
-		)
 
-		for parent, account, item_wise_tax_detail in self.tax_details:
-			if item_wise_tax_detail:
-				try:
-					if account in self.sa_vat_accounts:
-						item_wise_tax_detail = json.loads(item_wise_tax_detail)
-					else:
-						continue
-					for item_code, taxes in item_wise_tax_detail.items():
-						is_zero_rated = self.invoice_items.get(parent).get(item_code).get("is_zero_rated")
-						# to skip items with non-zero tax rate in multiple rows
-						if taxes[0] == 0 and not is_zero_rated:
-							continue
-						tax_rate = self.get_item_amount_map(parent, item_code, taxes)
-
-						if tax_rate is not None:
-							rate_based_dict = self.items_based_on_tax_rate.setdefault(parent, {}).setdefault(
-								tax_rate, []
-							)
-							if item_code not in rate_based_dict:
-								rate_based_dict.append(item_code)
-				except ValueError:
-					continue
+		if not self.sa_vat_accounts:
+			return
+
+		for d in get_item_wise_tax_details(doctype, self.invoices.keys(), self.sa_vat_accounts):
+			parent, item_code = d.parent, d.item_code
+			is_zero_rated = self.invoice_items.get(parent).get(item_code).get("is_zero_rated")
+			# to skip items with non-zero tax rate in multiple rows
+			if d.rate == 0 and not is_zero_rated:
+				continue
+			tax_rate = self.get_item_amount_map(parent, item_code, [d.rate, d.tax_amount])
+
+			if tax_rate is not None:
+				rate_based_dict = self.items_based_on_tax_rate.setdefault(parent, {}).setdefault(tax_rate, [])
+				if item_code not in rate_based_dict:
+					rate_based_dict.append(item_code)
 
 	def get_item_amount_map(self, parent, item_code, taxes):
 		net_amount = self.invoice_items.get(parent).get(item_code).get("net_amount")
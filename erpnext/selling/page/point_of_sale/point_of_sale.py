@@ -8,8 +8,9 @@ import frappe
 from frappe.utils import cint
 from frappe.utils.nestedset import get_root_of
 
-from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_items_stock_availability
 from erpnext.accounts.doctype.pos_profile.pos_profile import get_child_nodes, get_item_groups
+from erpnext.utilities.tree_index import get_tree_index
 
 
 def search_by_term(search_term, warehouse, price_list):
@@ -35,20 +36,16 @@ def search_by_term(search_term, warehouse, price_list):
 			as_dict=1,
 		)
 
-		item_stock_qty, is_stock_item = get_stock_availability(item_code, warehouse)
-		price_list_rate, currency = frappe.db.get_value(
-			"Item Price",
-			{"price_list": price_list, "item_code": item_code},
-			["price_list_rate", "currency"],
-		) or [None, None]
+		item_stock_qty, is_stock_item = get_items_stock_availability([item_code], warehouse)[item_code]
+		item_price = get_item_prices([item_code], price_list).get(item_code) or {}
 
 		item_info.update(
 			{
 				"serial_no": serial_no,
 				"batch_no": batch_no,
 				"barcode": barcode,
-				"price_list_rate": price_list_rate,
-				"currency": currency,
+				"price_list_rate": item_price.get("price_list_rate"),
+				"currency": item_price.get("currency"),
 				"actual_qty": item_stock_qty,
 			}
 		)
@@ -75,7 +72,7 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	condition = get_conditions(search_term)
 	condition += get_item_group_condition(pos_profile)
 
-	lft, rgt = frappe.db.get_value("Item Group", item_group, ["lft", "rgt"])
+	lft, rgt = get_tree_index("Item Group").bounds[item_group]
 
 	bin_join_selection, bin_join_condition = "", ""
 	if hide_unavailable_items:
@@ -121,20 +118,13 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 
 	if items_data:
 		items = [d.item_code for d in items_data]
-		item_prices_data = frappe.get_all(
-			"Item Price",
-			fields=["item_code", "price_list_rate", "currency"],
-			filters={"price_list": price_list, "item_code": ["in", items]},
-		)
-
-		item_prices = {}
-		for d in item_prices_data:
-			item_prices[d.item_code] = d
+		item_prices = get_item_prices(items, price_list)
+		stock_availability = get_items_stock_availability(items, warehouse)
 
 		for item in items_data:
 			item_code = item.item_code
 			item_price = item_prices.get(item_code) or {}
-			item_stock_qty, is_stock_item = get_stock_availability(item_code, warehouse)
+			item_stock_qty, is_stock_item = stock_availability[item_code]
 
 			row = {}
 			row.update(item)
@@ -150,6 +140,18 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	return {"items": result}
 
 
+def get_item_prices(item_codes, price_list):
+	item_prices = {}
+	for d in frappe.get_all(
+		"Item Price",
+		fields=["item_code", "price_list_rate", "currency"],
+		filters={"price_list": price_list, "item_code": ["in", item_codes]},
+	):
+		item_prices[d.item_code] = d
+
+	return item_prices
+
+
 @frappe.whitelist()
 def search_for_serial_or_batch_or_barcode_number(search_value):
 	# search barcode no
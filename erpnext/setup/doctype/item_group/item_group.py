@@ -14,6 +14,7 @@ from six.moves.urllib.parse import quote
 
 from erpnext.e_commerce.doctype.e_commerce_settings.e_commerce_settings import ECommerceSettings
 from erpnext.e_commerce.product_data_engine.filters import ProductFiltersBuilder
+from erpnext.utilities.tree_index import get_descendants
 
 
 class ItemGroup(NestedSet, WebsiteGenerator):
@@ -141,16 +142,7 @@ def get_child_groups_for_website(item_group_name, immediate=False, include_self=
 
 
 def get_child_item_groups(item_group_name):
-	item_group = frappe.get_cached_value("Item Group", item_group_name, ["lft", "rgt"], as_dict=1)
-
-	child_item_groups = [
-		d.name
-		for d in frappe.get_all(
-			"Item Group", filters={"lft": (">=", item_group.lft), "rgt": ("<=", item_group.rgt)}
-		)
-	]
-
-	return child_item_groups or {}
+	return get_descendants("Item Group", item_group_name, include_self=True) or {}
 
 
 def get_item_for_list_in_html(context):
@@ -112,6 +112,15 @@ def on_doctype_update():
 	frappe.db.add_unique("Bin", ["item_code", "warehouse"], constraint_name="unique_item_warehouse")
 
 
+def get_stock_availability_cache_key(warehouse):
+	"""Cache key of stock availability of items in the warehouse, shown in POS."""
+	return "pos_stock_availability:{0}".format(warehouse)
+
+
+def clear_stock_availability_cache(warehouse):
+	frappe.cache().delete_value(get_stock_availability_cache_key(warehouse))
+
+
 def update_stock(bin_name, args, allow_negative_stock=False, via_landed_cost_voucher=False):
 	"""WARNING: This function is deprecated. Inline this function instead of using it."""
 	from erpnext.stock.stock_ledger import repost_current_voucher
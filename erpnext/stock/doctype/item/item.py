@@ -32,6 +32,7 @@ from erpnext.controllers.item_variant import (
 )
 from erpnext.setup.doctype.item_group.item_group import invalidate_cache_for
 from erpnext.stock.doctype.item_default.item_default import ItemDefault
+from erpnext.stock.doctype.item_price.item_price import clear_item_prices_cache
 
 
 class DuplicateReorderRows(frappe.ValidationError):
@@ -447,10 +448,17 @@ class Item(Document):
 
 	def on_trash(self):
 		frappe.db.sql("""delete from tabBin where item_code=%s""", self.name)
+		self.clear_item_prices_cache(self.name)
 		frappe.db.sql("delete from `tabItem Price` where item_code=%s", self.name)
 		for variant_of in frappe.get_all("Item", filters={"variant_of": self.name}):
 			frappe.delete_doc("Item", variant_of.name)
 
+	def clear_item_prices_cache(self, item_code):
+		for price_list in frappe.get_all(
+			"Item Price", filters={"item_code": item_code}, pluck="price_list", distinct=True
+		):
+			clear_item_prices_cache(price_list)
+
 	def before_rename(self, old_name, new_name, merge=False):
 		if self.item_name == old_name:
 			frappe.db.set_value("Item", old_name, "item_name", new_name)
@@ -474,6 +482,7 @@ class Item(Document):
 			invalidate_cache_for_item(self)
 
 		frappe.db.set_value("Item", new_name, "item_code", new_name)
+		self.clear_item_prices_cache(new_name)
 
 		if merge:
 			self.set_last_purchase_rate(new_name)
@@ -497,6 +506,11 @@ class Item(Document):
 						dt, d.name, "item_wise_tax_detail", json.dumps(item_wise_tax_detail), update_modified=False
 					)
 
+		frappe.db.sql(
+			"update `tabItem Wise Tax Detail` set item_code = %s where item_code = %s",
+			(new_name, old_name),
+		)
+
 	def delete_old_bins(self, old_name):
 		frappe.db.delete("Bin", {"item_code": old_name})
 
@@ -104,3 +104,25 @@ class ItemPrice(Document):
 		if self.buying and not self.selling:
 			# if only buying then remove customer
 			self.customer = None
+
+	def on_update(self):
+		self.clear_item_prices_cache()
+
+	def on_trash(self):
+		self.clear_item_prices_cache()
+
+	def clear_item_prices_cache(self):
+		clear_item_prices_cache(self.price_list)
+
+		doc_before_save = self.get_doc_before_save()
+		if doc_before_save and doc_before_save.price_list != self.price_list:
+			clear_item_prices_cache(doc_before_save.price_list)
+
+
+def get_item_prices_cache_key(price_list):
+	"""Cache key of prices of items in the price list, shown in website."""
+	return "website_item_prices:{0}".format(price_list)
+
+
+def clear_item_prices_cache(price_list):
+	frappe.cache().delete_value(get_item_prices_cache_key(price_list))
@@ -7,6 +7,8 @@ from frappe import _, throw
 from frappe.model.document import Document
 from frappe.utils import cint
 
+from erpnext.stock.doctype.item_price.item_price import clear_item_prices_cache
+
 
 class PriceList(Document):
 	def validate(self):
@@ -36,6 +38,7 @@ class PriceList(Document):
 			buying=%s, selling=%s, modified=NOW() where price_list=%s""",
 			(self.currency, cint(self.buying), cint(self.selling), self.name),
 		)
+		clear_item_prices_cache(self.name)
 
 	def check_impact_on_shopping_cart(self):
 		"Check if Price List currency change impacts E Commerce Cart."
@@ -52,6 +55,7 @@ class PriceList(Document):
 
 	def on_trash(self):
 		self.delete_price_list_details_key()
+		clear_item_prices_cache(self.name)
 
 		def _update_default_price_list(module):
 			b = frappe.get_doc(module + " Settings")
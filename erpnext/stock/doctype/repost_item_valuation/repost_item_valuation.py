@@ -6,12 +6,15 @@ from frappe import _
 from frappe.exceptions import QueryDeadlockError, QueryTimeoutError
 from frappe.model.document import Document
 from frappe.query_builder.functions import Max
-from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.utils import cint, cstr, get_link_to_form, get_weekday, getdate, now, nowtime
 from frappe.utils.user import get_users_with_role
 from rq.timeouts import JobTimeoutException
 
 import erpnext
 from erpnext.accounts.utils import get_future_stock_vouchers, repost_gle_for_stock_vouchers
+from erpnext.stock.doctype.stock_closing_balance.stock_closing_balance import (
+	mark_closing_balance_as_stale,
+)
 from erpnext.stock.stock_ledger import (
 	get_affected_transactions,
 	get_items_to_be_repost,
@@ -20,6 +23,9 @@ from erpnext.stock.stock_ledger import (
 
 RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError)
 
+REPOST_JOB_PREFIX = "repost_item_valuation_batch_"
+REPOST_JOB_TIMEOUT = 6 * 60 * 60
+
 
 class RepostItemValuation(Document):
 	def validate(self):
@@ -106,6 +112,8 @@ class RepostItemValuation(Document):
 
 		        These flags are useful for asserting real time behaviour like quantity updates.
 		"""
+		if self.based_on == "Item and Warehouse":
+			mark_closing_balance_as_stale(self)
 
 		if not frappe.flags.in_test:
 			return
@@ -246,6 +254,7 @@ def repost_gl_entries(doc):
 		doc.posting_date,
 		doc.company,
 		repost_doc=doc,
+		affected_vouchers=repost_affected_transaction,
 	)
 
 
@@ -309,22 +318,170 @@ def repost_entries():
 	if not in_configured_timeslot():
 		return
 
+	if reposting_jobs_in_progress():
+		# previous run is still reposting in parallel jobs
+		return
+
 	riv_entries = get_repost_item_valuation_entries()
+	if not riv_entries:
+		return
 
-	for row in riv_entries:
-		doc = frappe.get_doc("Repost Item Valuation", row.name)
+	parallel_jobs = cint(
+		frappe.db.get_single_value("Stock Reposting Settings", "parallel_reposting_jobs")
+	)
+	batches = get_independent_repost_batches(riv_entries, max(parallel_jobs, 1))
+
+	if len(batches) == 1 or frappe.flags.in_test:
+		for riv_names in batches:
+			repost_batch(riv_names)
+		return
+
+	for idx, riv_names in enumerate(batches):
+		frappe.enqueue(
+			repost_batch,
+			queue="long",
+			timeout=REPOST_JOB_TIMEOUT,
+			job_name=f"{REPOST_JOB_PREFIX}{idx}",
+			riv_names=riv_names,
+		)
+
+
+def repost_batch(riv_names):
+	"""Repost given Repost Item Valuation entries one after another."""
+	for name in riv_names:
+		if not in_configured_timeslot():
+			return
+
+		doc = frappe.get_doc("Repost Item Valuation", name)
 		if doc.status in ("Queued", "In Progress"):
 			repost(doc)
 			doc.deduplicate_similar_repost()
 
-	riv_entries = get_repost_item_valuation_entries()
-	if riv_entries:
-		return
+
+def reposting_jobs_in_progress():
+	from frappe.core.page.background_jobs.background_jobs import get_info
+
+	return any(cstr(d.get("job_name")).startswith(REPOST_JOB_PREFIX) for d in get_info())
+
+
+def get_independent_repost_batches(riv_entries, max_batches):
+	"""Split queued reposts in at most `max_batches` batches which can be reposted concurrently.
+
+	Reposts are dependent if they share an item, either directly or via SLEs
+	linked with `dependant_sle_voucher_detail_no` (e.g. raw material -> finished good),
+	or via a voucher having SLEs of both items, as GL entries of the voucher are reposted
+	from the valuation of all its items. Dependent reposts always end up in the same batch
+	and keep their relative order."""
+
+	riv_items = get_items_of_repost_entries(riv_entries)
+
+	parent = {}
+
+	def find(item):
+		parent.setdefault(item, item)
+		while parent[item] != item:
+			parent[item] = parent[parent[item]]
+			item = parent[item]
+		return item
+
+	def union(item1, item2):
+		parent[find(item1)] = find(item2)
+
+	for items in riv_items.values():
+		for item in items[1:]:
+			union(items[0], item)
+
+	from_date = min(getdate(d.posting_date) for d in riv_entries)
+	for item_code, dependant_item_code in get_dependant_item_links(from_date):
+		union(item_code, dependant_item_code)
+
+	voucher_items = {}
+	for voucher_type, voucher_no, item_code in get_items_of_multi_item_vouchers(from_date):
+		voucher_item = voucher_items.setdefault((voucher_type, voucher_no), item_code)
+		union(voucher_item, item_code)
+
+	components = {}
+	for row in riv_entries:
+		items = riv_items.get(row.name)
+		key = find(items[0]) if items else row.name
+		components.setdefault(key, []).append(row.name)
+
+	# largest components first, each into the currently smallest batch
+	batches = [[] for _ in range(min(max_batches, len(components)))]
+	for riv_names in sorted(components.values(), key=len, reverse=True):
+		min(batches, key=len).extend(riv_names)
+
+	riv_order = {row.name: idx for idx, row in enumerate(riv_entries)}
+	return [sorted(riv_names, key=riv_order.get) for riv_names in batches]
+
+
+def get_items_of_repost_entries(riv_entries):
+	riv_items = {}
+	vouchers = {}
+	for row in riv_entries:
+		if row.based_on == "Transaction":
+			vouchers.setdefault((row.voucher_type, row.voucher_no), []).append(row.name)
+		elif row.item_code:
+			riv_items[row.name] = [row.item_code]
+
+	if vouchers:
+		sles = frappe.get_all(
+			"Stock Ledger Entry",
+			fields=["distinct voucher_type", "voucher_no", "item_code"],
+			filters={"voucher_no": ("in", list({voucher_no for _, voucher_no in vouchers}))},
+		)
+		for sle in sles:
+			for name in vouchers.get((sle.voucher_type, sle.voucher_no), []):
+				riv_items.setdefault(name, []).append(sle.item_code)
+
+	return riv_items
+
+
+def get_dependant_item_links(from_date):
+	"""Get pairs of items whose valuation depends on each other after `from_date`."""
+	return frappe.db.sql(
+		"""
+		select distinct sle.item_code, dependant_sle.item_code
+		from `tabStock Ledger Entry` sle
+		inner join `tabStock Ledger Entry` dependant_sle
+			on dependant_sle.voucher_detail_no = sle.dependant_sle_voucher_detail_no
+			and dependant_sle.voucher_no = sle.voucher_no
+		where
+			sle.dependant_sle_voucher_detail_no is not null
+			and sle.dependant_sle_voucher_detail_no != ''
+			and sle.posting_date >= %s
+			and sle.is_cancelled = 0
+			and dependant_sle.is_cancelled = 0
+			and sle.item_code != dependant_sle.item_code
+	""",
+		from_date,
+	)
+
+
+def get_items_of_multi_item_vouchers(from_date):
+	"""Get items of vouchers posted after `from_date` having SLEs of more than one item."""
+	return frappe.db.sql(
+		"""
+		select distinct sle.voucher_type, sle.voucher_no, sle.item_code
+		from `tabStock Ledger Entry` sle
+		inner join (
+			select voucher_type, voucher_no
+			from `tabStock Ledger Entry`
+			where posting_date >= %(from_date)s and is_cancelled = 0
+			group by voucher_type, voucher_no
+			having count(distinct item_code) > 1
+		) voucher
+			on voucher.voucher_type = sle.voucher_type and voucher.voucher_no = sle.voucher_no
+		where sle.is_cancelled = 0
+	""",
+		{"from_date": from_date},
+	)
 
 
 def get_repost_item_valuation_entries():
 	return frappe.db.sql(
-		""" SELECT name from `tabRepost Item Valuation`
+		""" SELECT name, based_on, item_code, voucher_type, voucher_no, posting_date
+		from `tabRepost Item Valuation`
 		WHERE status in ('Queued', 'In Progress') and creation <= %s and docstatus = 1
 		ORDER BY timestamp(posting_date, posting_time) asc, creation asc
 	""",
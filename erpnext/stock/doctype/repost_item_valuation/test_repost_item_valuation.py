@@ -14,6 +14,7 @@ from erpnext.controllers.stock_controller import create_item_wise_repost_entries
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+	get_independent_repost_batches,
 	in_configured_timeslot,
 )
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
@@ -312,3 +313,65 @@ class TestRepostItemValuation(FrappeTestCase, StockTestMixin):
 		pr.cancel()
 		self.assertTrue(pr.docstatus == 2)
 		self.assertTrue(frappe.db.exists("Repost Item Valuation", {"voucher_no": pr.name}))
+
+	def test_independent_repost_batches(self):
+		item_a = make_item().name
+		item_b = make_item().name
+
+		def _riv(name, item_code):
+			return frappe._dict(
+				name=name, based_on="Item and Warehouse", item_code=item_code, posting_date=today()
+			)
+
+		riv_entries = [_riv("RIV-1", item_a), _riv("RIV-2", item_b), _riv("RIV-3", item_a)]
+
+		batches = get_independent_repost_batches(riv_entries, max_batches=2)
+		self.assertEqual(sorted(batches), [["RIV-1", "RIV-3"], ["RIV-2"]])
+
+		# dependent reposts are never split and keep their order
+		batches = get_independent_repost_batches(riv_entries, max_batches=1)
+		self.assertEqual(batches, [["RIV-1", "RIV-2", "RIV-3"]])
+
+		# items of the same voucher are reposted in the same batch
+		se = make_stock_entry(
+			item_code=item_a, target="_Test Warehouse - _TC", qty=1, rate=10, do_not_save=True
+		)
+		se.append(
+			"items",
+			{
+				"item_code": item_b,
+				"t_warehouse": "_Test Warehouse - _TC",
+				"qty": 1,
+				"basic_rate": 10,
+				"conversion_factor": 1.0,
+				"cost_center": "_Test Cost Center - _TC",
+			},
+		)
+		se.submit()
+
+		batches = get_independent_repost_batches(riv_entries, max_batches=2)
+		self.assertEqual(batches, [["RIV-1", "RIV-2", "RIV-3"]])
+
+	def test_verify_stock_gle_in_sql(self):
+		from erpnext.accounts.utils import get_vouchers_with_mismatched_stock_gle
+		from erpnext.stock import get_warehouse_account_map
+
+		company = "_Test Company with perpetual inventory"
+		se = make_stock_entry(company=company, qty=1, rate=10, target="Stores - TCP1")
+		vouchers = [(se.doctype, se.name)]
+		warehouse_account = get_warehouse_account_map(company)
+
+		self.assertEqual([], get_vouchers_with_mismatched_stock_gle(vouchers, warehouse_account, 2))
+
+		frappe.db.sql(
+			"""update `tabGL Entry` set debit = debit + 1
+			where voucher_no = %s and account = %s and debit > 0""",
+			(se.name, warehouse_account["Stores - TCP1"].account),
+		)
+		self.assertEqual(
+			vouchers, get_vouchers_with_mismatched_stock_gle(vouchers, warehouse_account, 2)
+		)
+
+		# unaffected but mismatched vouchers are rebuilt
+		repost_gle_for_stock_vouchers(vouchers, se.posting_date, company, affected_vouchers=set())
+		self.assertEqual([], get_vouchers_with_mismatched_stock_gle(vouchers, warehouse_account, 2))
@@ -0,0 +1,236 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_months, flt, get_last_day, getdate, now, nowdate
+
+CLOSING_DATE_CACHE_KEY = "stock_closing_balance_date"
+CLOSING_BALANCE_FIELDS = (
+	"company",
+	"item_code",
+	"warehouse",
+	"qty_after_transaction",
+	"valuation_rate",
+	"stock_value",
+)
+
+
+class StockClosingBalance(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Closing Balance", ["closing_date", "item_code", "warehouse"])
+	frappe.db.add_index("Stock Closing Balance", ["item_code", "warehouse"])
+
+
+def get_latest_closing_date():
+	return frappe.cache().get_value(
+		CLOSING_DATE_CACHE_KEY,
+		lambda: frappe.db.sql("select max(closing_date) from `tabStock Closing Balance`")[0][0],
+	)
+
+
+def get_closing_dates(from_date=None):
+	condition = "where closing_date >= %(from_date)s" if from_date else ""
+	return frappe.db.sql_list(
+		"""select distinct closing_date from `tabStock Closing Balance`
+		{0} order by closing_date""".format(
+			condition
+		),
+		{"from_date": from_date},
+	)
+
+
+def mark_closing_balance_as_stale(sle):
+	"""Backdated entries change the balance of all later closings of the item-warehouse,
+	flag them so that reports fall back to the ledger until they are recalculated."""
+	latest_closing_date = get_latest_closing_date()
+	if not latest_closing_date or getdate(sle.posting_date) > getdate(latest_closing_date):
+		return
+
+	filters = {
+		"item_code": sle.item_code,
+		"warehouse": sle.warehouse,
+		"posting_date": sle.posting_date,
+	}
+	frappe.db.sql(
+		"""
+		update `tabStock Closing Balance`
+		set is_stale = 1
+		where item_code = %(item_code)s
+			and warehouse = %(warehouse)s
+			and closing_date >= %(posting_date)s
+	""",
+		filters,
+	)
+
+	existing_closing_dates = set(
+		frappe.db.sql_list(
+			"""
+			select closing_date from `tabStock Closing Balance`
+			where item_code = %(item_code)s
+				and warehouse = %(warehouse)s
+				and closing_date >= %(posting_date)s
+		""",
+			filters,
+		)
+	)
+
+	# item-warehouse had no balance yet on these dates
+	for closing_date in get_closing_dates(sle.posting_date):
+		if closing_date not in existing_closing_dates:
+			insert_closing_balances(
+				closing_date,
+				[frappe._dict(company=sle.company, item_code=sle.item_code, warehouse=sle.warehouse)],
+				is_stale=1,
+			)
+
+
+def mark_closing_balances_as_stale(sl_entries):
+	"""Flag closing balances of the item-warehouses of reposted `sl_entries`, from the
+	earliest reposted entry of each item-warehouse."""
+	earliest_entries = {}
+	for sle in sl_entries:
+		key = (sle.item_code, sle.warehouse)
+		if key not in earliest_entries or getdate(sle.posting_date) < getdate(
+			earliest_entries[key].posting_date
+		):
+			earliest_entries[key] = sle
+
+	for sle in earliest_entries.values():
+		mark_closing_balance_as_stale(sle)
+
+
+def update_stock_closing_balances():
+	"""
+	Recalculate stale closing balances and create closing balance of
+	last month if it doesn't exist yet. Called daily via hooks.py.
+	"""
+	if frappe.db.exists(
+		"Repost Item Valuation", {"status": ("in", ["Queued", "In Progress"]), "docstatus": 1}
+	):
+		# balances are not final till pending reposts are completed
+		return
+
+	refresh_stale_closing_balances()
+
+	last_closing_date = get_last_day(add_months(nowdate(), -1))
+	latest_closing_date = get_latest_closing_date()
+
+	if not latest_closing_date:
+		make_closing_balance(last_closing_date)
+
+	while latest_closing_date and getdate(latest_closing_date) < getdate(last_closing_date):
+		closing_date = get_last_day(add_months(latest_closing_date, 1))
+		make_closing_balance(closing_date, previous_closing_date=latest_closing_date)
+		latest_closing_date = closing_date
+
+	frappe.cache().delete_value(CLOSING_DATE_CACHE_KEY)
+
+
+def make_closing_balance(closing_date, previous_closing_date=None):
+	"""Create closing balance of each item-warehouse on `closing_date`.
+
+	Starts from previous closing balance and only applies the SLEs posted after it."""
+	if previous_closing_date:
+		balances = {
+			(d.item_code, d.warehouse): d
+			for d in frappe.get_all(
+				"Stock Closing Balance",
+				filters={"closing_date": previous_closing_date},
+				fields=CLOSING_BALANCE_FIELDS,
+			)
+		}
+
+		for sle in frappe.db.sql(
+			"""
+			select company, item_code, warehouse, qty_after_transaction, valuation_rate, stock_value
+			from `tabStock Ledger Entry`
+			where posting_date > %s and posting_date <= %s and is_cancelled = 0
+			order by posting_date, posting_time, creation""",
+			(previous_closing_date, closing_date),
+			as_dict=1,
+		):
+			balances[(sle.item_code, sle.warehouse)] = sle
+	else:
+		balances = {}
+		for d in frappe.get_all("Bin", fields=["item_code", "warehouse"]):
+			sle = get_closing_sle(d.item_code, d.warehouse, closing_date)
+			if sle:
+				balances[(d.item_code, d.warehouse)] = sle
+
+	insert_closing_balances(
+		closing_date,
+		[d for d in balances.values() if flt(d.qty_after_transaction) or flt(d.stock_value)],
+	)
+
+
+def refresh_stale_closing_balances():
+	for row in frappe.get_all(
+		"Stock Closing Balance",
+		filters={"is_stale": 1},
+		fields=["name", "item_code", "warehouse", "closing_date"],
+	):
+		sle = get_closing_sle(row.item_code, row.warehouse, row.closing_date)
+		if sle and (flt(sle.qty_after_transaction) or flt(sle.stock_value)):
+			frappe.db.set_value(
+				"Stock Closing Balance",
+				row.name,
+				{
+					"qty_after_transaction": sle.qty_after_transaction,
+					"valuation_rate": sle.valuation_rate,
+					"stock_value": sle.stock_value,
+					"is_stale": 0,
+				},
+				update_modified=False,
+			)
+		else:
+			frappe.db.sql("delete from `tabStock Closing Balance` where name = %s", row.name)
+
+
+def get_closing_sle(item_code, warehouse, closing_date):
+	sle = frappe.db.sql(
+		"""
+		select company, item_code, warehouse, qty_after_transaction, valuation_rate, stock_value
+		from `tabStock Ledger Entry`
+		where item_code = %s and warehouse = %s and posting_date <= %s and is_cancelled = 0
+		order by posting_date desc, posting_time desc, creation desc
+		limit 1""",
+		(item_code, warehouse, closing_date),
+		as_dict=1,
+	)
+
+	return sle[0] if sle else None
+
+
+def insert_closing_balances(closing_date, balances, is_stale=0):
+	if not balances:
+		return
+
+	timestamp = now()
+	fields = ["name", "creation", "modified", "owner", "modified_by", "closing_date", "is_stale"]
+	fields.extend(CLOSING_BALANCE_FIELDS)
+
+	values = []
+	for d in balances:
+		values.append(
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				frappe.session.user,
+				frappe.session.user,
+				closing_date,
+				is_stale,
+				d.company,
+				d.item_code,
+				d.warehouse,
+				flt(d.qty_after_transaction),
+				flt(d.valuation_rate),
+				flt(d.stock_value),
+			)
+		)
+
+	frappe.db.bulk_insert("Stock Closing Balance", fields=fields, values=values)
@@ -0,0 +1,119 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, get_last_day, today
+
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_closing_balance.stock_closing_balance import (
+	CLOSING_DATE_CACHE_KEY,
+	make_closing_balance,
+	refresh_stale_closing_balances,
+)
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.report.stock_balance.stock_balance import execute as stock_balance
+
+
+class TestStockClosingBalance(FrappeTestCase):
+	def setUp(self):
+		frappe.db.sql("delete from `tabStock Closing Balance`")
+		frappe.cache().delete_value(CLOSING_DATE_CACHE_KEY)
+		self.addCleanup(frappe.cache().delete_value, CLOSING_DATE_CACHE_KEY)
+
+	def get_report_row(self, item_code, from_date):
+		filters = frappe._dict(
+			company="_Test Company", item_code=item_code, from_date=from_date, to_date=today()
+		)
+		_columns, data = stock_balance(filters)
+		return {d["warehouse"]: d for d in data}
+
+	def test_report_with_closing_balance(self):
+		item = make_item().name
+		warehouse = "_Test Warehouse - _TC"
+		closing_date = get_last_day(add_days(today(), -40))
+
+		make_stock_entry(
+			item_code=item, target=warehouse, qty=10, rate=10, posting_date=add_days(closing_date, -5)
+		)
+		make_stock_entry(item_code=item, source=warehouse, qty=3, posting_date=add_days(closing_date, 2))
+		make_stock_entry(item_code=item, target=warehouse, qty=5, rate=20, posting_date=today())
+
+		from_date = add_days(closing_date, 10)
+		expected = self.get_report_row(item, from_date)
+
+		make_closing_balance(closing_date)
+		frappe.cache().delete_value(CLOSING_DATE_CACHE_KEY)
+
+		closing_balance = frappe.get_all(
+			"Stock Closing Balance",
+			filters={"item_code": item, "warehouse": warehouse},
+			fields=["qty_after_transaction", "stock_value", "is_stale"],
+		)
+		self.assertEqual(closing_balance[0].qty_after_transaction, 10)
+		self.assertEqual(closing_balance[0].stock_value, 100)
+
+		self.assertEqual(expected, self.get_report_row(item, from_date))
+
+		# backdated entry makes closing balance stale, report falls back to ledger
+		make_stock_entry(
+			item_code=item, target=warehouse, qty=2, rate=10, posting_date=add_days(closing_date, -1)
+		)
+		self.assertTrue(
+			frappe.db.get_value(
+				"Stock Closing Balance", {"item_code": item, "warehouse": warehouse}, "is_stale"
+			)
+		)
+		self.assertEqual(self.get_report_row(item, from_date)[warehouse]["opening_qty"], 9)
+
+		refresh_stale_closing_balances()
+		self.assertEqual(
+			frappe.db.get_value(
+				"Stock Closing Balance",
+				{"item_code": item, "warehouse": warehouse},
+				["qty_after_transaction", "is_stale"],
+			),
+			(12, 0),
+		)
+		self.assertEqual(self.get_report_row(item, from_date)[warehouse]["opening_qty"], 9)
+
+	def test_reposted_warehouses_are_marked_stale(self):
+		item = make_item(properties={"is_stock_item": 1, "valuation_method": "FIFO"}).name
+		source, target = "_Test Warehouse - _TC", "_Test Warehouse 1 - _TC"
+		closing_date = get_last_day(add_days(today(), -40))
+
+		make_stock_entry(
+			item_code=item, target=source, qty=10, rate=10, posting_date=add_days(closing_date, -5)
+		)
+		make_stock_entry(
+			item_code=item, source=source, target=target, qty=5, posting_date=add_days(closing_date, -3)
+		)
+
+		make_closing_balance(closing_date)
+		frappe.cache().delete_value(CLOSING_DATE_CACHE_KEY)
+		self.assertEqual(
+			frappe.db.get_value(
+				"Stock Closing Balance", {"item_code": item, "warehouse": target}, "stock_value"
+			),
+			50,
+		)
+
+		# backdated receipt changes the rate of the transfer, reposting the target warehouse
+		make_stock_entry(
+			item_code=item, target=source, qty=10, rate=30, posting_date=add_days(closing_date, -10)
+		)
+		self.assertTrue(
+			frappe.db.get_value(
+				"Stock Closing Balance", {"item_code": item, "warehouse": target}, "is_stale"
+			)
+		)
+
+		refresh_stale_closing_balances()
+		self.assertEqual(
+			frappe.db.get_value(
+				"Stock Closing Balance",
+				{"item_code": item, "warehouse": target},
+				["stock_value", "is_stale"],
+			),
+			(150, 0),
+		)
@@ -121,8 +121,50 @@ class TestStockEntry(FrappeTestCase):
 			"_Test Item Warehouse Group Wise Reorder", warehouse="_Test Warehouse Group-C1 - _TC"
 		)
 
+	def test_auto_material_request_dry_run(self):
+		mr_count = frappe.db.count("Material Request")
+		self._test_auto_material_request("_Test Item", dry_run=True)
+		self.assertEqual(frappe.db.count("Material Request"), mr_count)
+
+	def test_auto_material_request_in_purchase_uom(self):
+		from erpnext.stock.reorder_item import reorder_item
+
+		item_code = make_item(
+			"_Test Item Reorder Purchase UOM",
+			properties={
+				"is_stock_item": 1,
+				"stock_uom": "Nos",
+				"purchase_uom": "_Test UOM 1",
+				"reorder_levels": [
+					{
+						"material_request_type": "Purchase",
+						"warehouse": "_Test Warehouse - _TC",
+						"warehouse_reorder_level": 20,
+						"warehouse_reorder_qty": 50,
+					}
+				],
+			},
+			uoms=[{"uom": "_Test UOM 1", "conversion_factor": 10}],
+		).name
+
+		frappe.db.set_value("Stock Settings", None, "auto_indent", 1)
+		mr_list = reorder_item()
+		frappe.db.set_value("Stock Settings", None, "auto_indent", 0)
+
+		mr_items = [d for mr in mr_list for d in mr.items if d.item_code == item_code]
+		self.assertEqual(len(mr_items), 1)
+		self.assertTrue(frappe.db.exists("Material Request", mr_items[0].parent))
+		self.assertEqual(mr_items[0].uom, "_Test UOM 1")
+		self.assertEqual(mr_items[0].stock_uom, "Nos")
+		self.assertEqual(mr_items[0].qty, 5)
+		self.assertEqual(mr_items[0].warehouse, "_Test Warehouse - _TC")
+
 	def _test_auto_material_request(
-		self, item_code, material_request_type="Purchase", warehouse="_Test Warehouse - _TC"
+		self,
+		item_code,
+		material_request_type="Purchase",
+		warehouse="_Test Warehouse - _TC",
+		dry_run=False,
 	):
 		variant = frappe.get_doc("Item", item_code)
 
@@ -150,7 +192,7 @@ class TestStockEntry(FrappeTestCase):
 
 		from erpnext.stock.reorder_item import reorder_item
 
-		mr_list = reorder_item()
+		mr_list = reorder_item(dry_run=dry_run)
 
 		frappe.db.set_value("Stock Settings", None, "auto_indent", 0)
 
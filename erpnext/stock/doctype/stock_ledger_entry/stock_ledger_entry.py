@@ -50,8 +50,13 @@ class StockLedgerEntry(Document):
 		self.validate_with_last_transaction_posting_time()
 
 	def on_submit(self):
+		from erpnext.stock.doctype.stock_closing_balance.stock_closing_balance import (
+			mark_closing_balance_as_stale,
+		)
+
 		self.check_stock_frozen_date()
 		self.calculate_batch_qty()
+		mark_closing_balance_as_stale(self)
 
 		if not self.get("via_landed_cost_voucher"):
 			from erpnext.stock.doctype.serial_no.serial_no import process_serial_no
@@ -628,6 +628,42 @@ class TestStockLedgerEntry(FrappeTestCase, StockTestMixin):
 		receipt2 = make_stock_entry(item_code=item, target=warehouse, qty=15, rate=15)
 		self.assertSLEs(receipt2, [{"stock_queue": [[5, 15]], "stock_value_difference": 175}])
 
+	def test_bulk_sle_update_during_repost(self):
+		from unittest.mock import patch
+
+		item = make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(
+			item_code=item, target=warehouse, qty=10, rate=10, posting_date=add_days(today(), -5)
+		)
+		consumptions = [
+			make_stock_entry(
+				item_code=item, source=warehouse, qty=2, posting_date=add_days(today(), -4 + i)
+			)
+			for i in range(4)
+		]
+
+		# small chunks to write repost results in multiple statements
+		with patch("erpnext.stock.stock_ledger.SLE_UPDATE_CHUNK_SIZE", 2):
+			make_stock_entry(
+				item_code=item, target=warehouse, qty=10, rate=20, posting_date=add_days(today(), -6)
+			)
+
+		for i, consumption in enumerate(consumptions, start=1):
+			qty = 20 - 2 * i
+			self.assertSLEs(
+				consumption,
+				[
+					{
+						"qty_after_transaction": qty,
+						"stock_value_difference": -40,
+						"stock_queue": [[10 - 2 * i, 20], [10, 10]],
+						"stock_value": (10 - 2 * i) * 20 + 100,
+					}
+				],
+			)
+
 	def test_dependent_gl_entry_reposting(self):
 		def _get_stock_credit(doc):
 			return frappe.db.get_value(
@@ -11,6 +11,7 @@ from frappe.utils import cint, flt
 from frappe.utils.nestedset import NestedSet
 
 from erpnext.stock import get_warehouse_account
+from erpnext.utilities.tree_index import get_descendants
 
 
 class Warehouse(NestedSet):
@@ -242,9 +243,7 @@ def convert_to_group_or_ledger(docname=None):
 
 
 def get_child_warehouses(warehouse):
-	from frappe.utils.nestedset import get_descendants_of
-
-	children = get_descendants_of("Warehouse", warehouse, ignore_permissions=True, order_by="lft")
+	children = get_descendants("Warehouse", warehouse)
 	return children + [warehouse]  # append self for backward compatibility
 
 
@@ -21,6 +21,7 @@ from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.batch.batch import get_batch_no
 from erpnext.stock.doctype.item.item import get_item_defaults, get_uom_conv_factor
 from erpnext.stock.doctype.item_manufacturer.item_manufacturer import get_item_manufacturer_part_no
+from erpnext.stock.doctype.item_price.item_price import clear_item_prices_cache
 from erpnext.stock.doctype.price_list.price_list import get_price_list_details
 
 sales_doctypes = ["Quotation", "Sales Order", "Delivery Note", "Sales Invoice", "POS Invoice"]
@@ -142,6 +143,125 @@ def get_item_details(args, doc=None, for_validate=False, overwrite_warehouse=Tru
 	return out
 
 
+def get_items_details(args, items, doc=None, for_validate=False, overwrite_warehouse=True):
+	"""
+	Returns `get_item_details` for each row in `items`, in the same order.
+
+	:param args: transaction level args, same as `get_item_details`
+	:param items: list of row level args, each one is merged into `args`
+
+	Item prices, bins and UOM conversion factors of all items are fetched together
+	and pricing rule lookups are shared by all rows.
+	"""
+	items_args = []
+	for item in items:
+		item_args = frappe._dict(args)
+		item_args.update(item)
+		items_args.append(item_args)
+
+	frappe.flags.item_details_batch_cache = get_item_details_batch_data(items_args)
+	frappe.flags.pricing_rule_batch_cache = {}
+
+	try:
+		return [
+			get_item_details(
+				item_args, doc, for_validate=for_validate, overwrite_warehouse=overwrite_warehouse
+			)
+			for item_args in items_args
+		]
+	finally:
+		frappe.flags.item_details_batch_cache = None
+		frappe.flags.pricing_rule_batch_cache = None
+
+
+def get_item_details_batch_data(items_args):
+	item_codes = list(set(d.item_code for d in items_args if d.get("item_code")))
+	if not item_codes:
+		return None
+
+	items = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item",
+			filters={"name": ("in", item_codes)},
+			fields=["name", "variant_of", "default_item_manufacturer", "default_manufacturer_part_no"],
+		)
+	}
+
+	# item prices and conversion factors of templates are used for variants
+	all_item_codes = set(item_codes)
+	all_item_codes.update(d.variant_of for d in items.values() if d.variant_of)
+
+	price_lists = set(
+		d.get("price_list") or d.get("selling_price_list") or d.get("buying_price_list")
+		for d in items_args
+	)
+	price_lists.discard(None)
+
+	batch_data = frappe._dict(
+		items=items,
+		all_item_codes=all_item_codes,
+		price_lists=price_lists,
+		bins={},
+		uom_conversion_factors={},
+		item_prices={},
+		packing_units={},
+		child_warehouses={},
+	)
+
+	for d in frappe.get_all(
+		"Bin",
+		filters={"item_code": ("in", list(all_item_codes))},
+		fields=[
+			"item_code",
+			"warehouse",
+			"projected_qty",
+			"actual_qty",
+			"reserved_qty",
+			"valuation_rate",
+		],
+	):
+		batch_data.bins[(d.item_code, d.warehouse)] = d
+
+	for d in frappe.db.sql(
+		"""select parent, uom, conversion_factor from `tabUOM Conversion Detail`
+		where parent in %s""",
+		[tuple(all_item_codes)],
+		as_dict=1,
+	):
+		batch_data.uom_conversion_factors.setdefault((d.parent, d.uom), d.conversion_factor)
+
+	if price_lists:
+		for d in frappe.get_all(
+			"Item Price",
+			filters={"item_code": ("in", list(all_item_codes)), "price_list": ("in", list(price_lists))},
+			fields=[
+				"name",
+				"item_code",
+				"price_list",
+				"price_list_rate",
+				"uom",
+				"batch_no",
+				"customer",
+				"supplier",
+				"valid_from",
+				"valid_upto",
+				"packing_unit",
+			],
+		):
+			batch_data.item_prices.setdefault((d.item_code, d.price_list), []).append(d)
+			batch_data.packing_units[d.name] = d.packing_unit
+
+	return batch_data
+
+
+def get_item_details_batch_cache(item_code):
+	"Returns data prefetched by `get_items_details` if `item_code` is one of its items."
+	batch_data = frappe.flags.item_details_batch_cache
+	if batch_data and item_code in batch_data.items:
+		return batch_data
+
+
 def update_stock(args, out):
 	if (
 		(
@@ -433,9 +553,13 @@ def get_basic_details(args, item, overwrite_warehouse=True):
 			out["manufacturer_part_no"] = None
 			out["manufacturer"] = None
 	else:
-		data = frappe.get_value(
-			"Item", item.name, ["default_item_manufacturer", "default_manufacturer_part_no"], as_dict=1
-		)
+		batch_data = get_item_details_batch_cache(item.name)
+		if batch_data:
+			data = batch_data.items[item.name]
+		else:
+			data = frappe.get_value(
+				"Item", item.name, ["default_item_manufacturer", "default_manufacturer_part_no"], as_dict=1
+			)
 
 		if data:
 			out.update(
@@ -831,6 +955,10 @@ def insert_item_price(args):
 		frappe.db.get_single_value("Stock Settings", "auto_insert_price_list_rate_if_missing")
 	):
 		if frappe.has_permission("Item Price", "write"):
+			if frappe.flags.item_details_batch_cache:
+				# prices of this price list are changed, read them from db for remaining rows
+				frappe.flags.item_details_batch_cache.price_lists.discard(args.price_list)
+
 			price_list_rate = (
 				(flt(args.rate) + flt(args.discount_amount)) / args.get("conversion_factor")
 				if args.get("conversion_factor")
@@ -848,6 +976,7 @@ def insert_item_price(args):
 					"Stock Settings", "update_existing_price_list_rate"
 				):
 					frappe.db.set_value("Item Price", item_price.name, "price_list_rate", price_list_rate)
+					clear_item_prices_cache(args.price_list)
 					frappe.msgprint(
 						_("Item Price updated for {0} in Price List {1}").format(args.item_code, args.price_list),
 						alert=True,
@@ -881,6 +1010,14 @@ def get_item_price(args, item_code, ignore_party=False):
 
 	args["item_code"] = item_code
 
+	batch_data = frappe.flags.item_details_batch_cache
+	if (
+		batch_data
+		and item_code in batch_data.all_item_codes
+		and args.get("price_list") in batch_data.price_lists
+	):
+		return get_item_price_from_batch_data(batch_data, args, item_code, ignore_party)
+
 	conditions = """where item_code=%(item_code)s
 		and price_list=%(price_list)s
 		and ifnull(uom, '') in ('', %(uom)s)"""
@@ -909,6 +1046,49 @@ def get_item_price(args, item_code, ignore_party=False):
 	)
 
 
+def get_item_price_from_batch_data(batch_data, args, item_code, ignore_party=False):
+	"Same as `get_item_price`, filters item prices prefetched by `get_items_details`."
+	transaction_date = getdate(args.get("transaction_date")) if args.get("transaction_date") else None
+
+	def is_applicable(item_price):
+		if (item_price.uom or "") not in ("", args.get("uom")):
+			return False
+
+		if (item_price.batch_no or "") not in ("", args.get("batch_no")):
+			return False
+
+		if not ignore_party:
+			if args.get("customer"):
+				if item_price.customer != args.get("customer"):
+					return False
+			elif args.get("supplier"):
+				if item_price.supplier != args.get("supplier"):
+					return False
+			elif item_price.customer or item_price.supplier:
+				return False
+
+		if transaction_date and not (
+			getdate(item_price.valid_from or "2000-01-01")
+			<= transaction_date
+			<= getdate(item_price.valid_upto or "2500-12-31")
+		):
+			return False
+
+		return True
+
+	item_prices = [
+		d
+		for d in batch_data.item_prices.get((item_code, args.get("price_list")), [])
+		if is_applicable(d)
+	]
+
+	# order by valid_from desc, batch_no desc, uom desc, nulls last
+	for field in ["uom", "batch_no", "valid_from"]:
+		item_prices.sort(key=lambda d: (d.get(field) is not None, d.get(field)), reverse=True)
+
+	return tuple((d.name, d.price_list_rate, d.uom) for d in item_prices)
+
+
 def get_price_list_rate_for(args, item_code):
 	"""
 	:param customer: link to Customer DocType
@@ -970,9 +1150,14 @@ def check_packing_list(price_list_rate_name, desired_qty, item_code):
 	"""
 
 	flag = True
-	item_price = frappe.get_doc("Item Price", price_list_rate_name)
-	if item_price.packing_unit:
-		packing_increment = desired_qty % item_price.packing_unit
+	batch_data = frappe.flags.item_details_batch_cache
+	if batch_data and price_list_rate_name in batch_data.packing_units:
+		packing_unit = batch_data.packing_units[price_list_rate_name]
+	else:
+		packing_unit = frappe.get_doc("Item Price", price_list_rate_name).packing_unit
+
+	if packing_unit:
+		packing_increment = desired_qty % packing_unit
 
 		if packing_increment != 0:
 			flag = False
@@ -1156,11 +1341,19 @@ def get_serial_no_batchwise(args, sales_order=None):
 
 @frappe.whitelist()
 def get_conversion_factor(item_code, uom):
-	variant_of = frappe.db.get_value("Item", item_code, "variant_of", cache=True)
-	filters = {"parent": item_code, "uom": uom}
-	if variant_of:
-		filters["parent"] = ("in", (item_code, variant_of))
-	conversion_factor = frappe.db.get_value("UOM Conversion Detail", filters, "conversion_factor")
+	batch_data = get_item_details_batch_cache(item_code)
+	if batch_data:
+		variant_of = batch_data.items[item_code].variant_of
+		conversion_factor = batch_data.uom_conversion_factors.get((item_code, uom))
+		if not conversion_factor and variant_of:
+			conversion_factor = batch_data.uom_conversion_factors.get((variant_of, uom))
+	else:
+		variant_of = frappe.db.get_value("Item", item_code, "variant_of", cache=True)
+		filters = {"parent": item_code, "uom": uom}
+		if variant_of:
+			filters["parent"] = ("in", (item_code, variant_of))
+		conversion_factor = frappe.db.get_value("UOM Conversion Detail", filters, "conversion_factor")
+
 	if not conversion_factor:
 		stock_uom = frappe.db.get_value("Item", item_code, "stock_uom")
 		conversion_factor = get_uom_conv_factor(uom, stock_uom)
@@ -1179,8 +1372,25 @@ def get_projected_qty(item_code, warehouse):
 @frappe.whitelist()
 def get_bin_details(item_code, warehouse, company=None, include_child_warehouses=False):
 	bin_details = {"projected_qty": 0, "actual_qty": 0, "reserved_qty": 0}
+	batch_data = get_item_details_batch_cache(item_code)
+
+	if warehouse and batch_data:
+		from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 
-	if warehouse:
+		if include_child_warehouses:
+			if warehouse not in batch_data.child_warehouses:
+				batch_data.child_warehouses[warehouse] = get_child_warehouses(warehouse)
+			warehouses = batch_data.child_warehouses[warehouse]
+		else:
+			warehouses = [warehouse]
+
+		for wh in warehouses:
+			bin = batch_data.bins.get((item_code, wh))
+			if bin:
+				for field in bin_details:
+					bin_details[field] += flt(bin.get(field))
+
+	elif warehouse:
 		from frappe.query_builder.functions import Coalesce, Sum
 
 		from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
@@ -1403,6 +1613,11 @@ def get_valuation_rate(item_code, company, warehouse=None):
 				or brand.get("default_warehouse")
 			)
 
+		batch_data = get_item_details_batch_cache(item_code)
+		if batch_data:
+			bin = batch_data.bins.get((item_code, warehouse))
+			return frappe._dict({"valuation_rate": bin.valuation_rate if bin else 0})
+
 		return frappe.db.get_value(
 			"Bin", {"item_code": item_code, "warehouse": warehouse}, ["valuation_rate"], as_dict=True
 		) or {"valuation_rate": 0}
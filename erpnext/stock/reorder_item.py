@@ -10,19 +10,22 @@ from frappe import _
 from frappe.utils import add_days, cint, flt, nowdate
 
 import erpnext
+from erpnext.utilities.tree_index import get_tree_index
 
 
-def reorder_item():
-	"""Reorder item if stock reaches reorder level"""
+def reorder_item(dry_run=False):
+	"""Reorder item if stock reaches reorder level
+
+	:param dry_run: return planned Material Requests without saving them"""
 	# if initial setup not completed, return
 	if not (frappe.db.a_row_exists("Company") and frappe.db.a_row_exists("Fiscal Year")):
 		return
 
 	if cint(frappe.db.get_value("Stock Settings", None, "auto_indent")):
-		return _reorder_item()
+		return _reorder_item(dry_run=dry_run)
 
 
-def _reorder_item():
+def _reorder_item(dry_run=False):
 	material_requests = {"Purchase": {}, "Transfer": {}, "Material Issue": {}, "Manufacture": {}}
 	warehouse_company = frappe._dict(
 		frappe.db.sql(
@@ -34,8 +37,9 @@ def _reorder_item():
 		erpnext.get_default_company() or frappe.db.sql("""select name from tabCompany limit 1""")[0][0]
 	)
 
-	items_to_consider = frappe.db.sql_list(
-		"""select name from `tabItem` item
+	items_to_consider = frappe._dict(
+		frappe.db.sql(
+			"""select name, variant_of from `tabItem` item
 		where is_stock_item=1 and has_variants=0
 			and disabled=0
 			and (end_of_life is null or end_of_life='0000-00-00' or end_of_life > %(today)s)
@@ -43,13 +47,15 @@ def _reorder_item():
 				or (variant_of is not null and variant_of != ''
 				and exists (select name from `tabItem Reorder` ir where ir.parent=item.variant_of))
 			)""",
-		{"today": nowdate()},
+			{"today": nowdate()},
+		)
 	)
 
 	if not items_to_consider:
 		return
 
-	item_warehouse_projected_qty = get_item_warehouse_projected_qty(items_to_consider)
+	item_warehouse_projected_qty = get_item_warehouse_projected_qty(list(items_to_consider))
+	item_reorder_levels = get_item_reorder_levels(items_to_consider)
 
 	def add_to_material_request(
 		item_code, warehouse, reorder_level, reorder_qty, material_request_type, warehouse_group=None
@@ -79,28 +85,56 @@ def _reorder_item():
 			)
 
 	for item_code in items_to_consider:
-		item = frappe.get_doc("Item", item_code)
-
-		if item.variant_of and not item.get("reorder_levels"):
-			item.update_template_tables()
-
-		if item.get("reorder_levels"):
-			for d in item.get("reorder_levels"):
-				add_to_material_request(
-					item_code,
-					d.warehouse,
-					d.warehouse_reorder_level,
-					d.warehouse_reorder_qty,
-					d.material_request_type,
-					warehouse_group=d.warehouse_group,
-				)
+		for d in item_reorder_levels.get(item_code, []):
+			add_to_material_request(
+				item_code,
+				d.warehouse,
+				d.warehouse_reorder_level,
+				d.warehouse_reorder_qty,
+				d.material_request_type,
+				warehouse_group=d.warehouse_group,
+			)
 
 	if material_requests:
-		return create_material_request(material_requests)
+		return create_material_request(material_requests, dry_run=dry_run)
+
+
+def get_item_reorder_levels(items_to_consider):
+	"""Returns reorder levels of each item, variants without reorder levels
+	use the ones of their template.
+
+	:param items_to_consider: dict of item code and its template"""
+	reorder_levels = {}
+	item_codes = set(items_to_consider)
+	item_codes.update(template for template in items_to_consider.values() if template)
+
+	for d in frappe.db.sql(
+		"""select parent, warehouse_group, warehouse, warehouse_reorder_level,
+			warehouse_reorder_qty, material_request_type
+		from `tabItem Reorder`
+		where parenttype = 'Item' and parent in %s
+		order by parent, idx""",
+		[tuple(item_codes)],
+		as_dict=1,
+	):
+		reorder_levels.setdefault(d.parent, []).append(d)
+
+	item_reorder_levels = {}
+	for item_code, template in items_to_consider.items():
+		if reorder_levels.get(item_code):
+			item_reorder_levels[item_code] = reorder_levels[item_code]
+		elif template:
+			# warehouse group is not copied from template, same as `Item.update_template_tables`
+			item_reorder_levels[item_code] = [
+				frappe._dict(d, warehouse_group=None) for d in reorder_levels.get(template, [])
+			]
+
+	return item_reorder_levels
 
 
 def get_item_warehouse_projected_qty(items_to_consider):
 	item_warehouse_projected_qty = {}
+	warehouse_tree = get_tree_index("Warehouse")
 
 	for item_code, warehouse, projected_qty in frappe.db.sql(
 		"""select item_code, warehouse, projected_qty
@@ -117,24 +151,22 @@ def get_item_warehouse_projected_qty(items_to_consider):
 		if warehouse not in item_warehouse_projected_qty.get(item_code):
 			item_warehouse_projected_qty[item_code][warehouse] = flt(projected_qty)
 
-		warehouse_doc = frappe.get_doc("Warehouse", warehouse)
-
-		while warehouse_doc.parent_warehouse:
-			if not item_warehouse_projected_qty.get(item_code, {}).get(warehouse_doc.parent_warehouse):
-				item_warehouse_projected_qty.setdefault(item_code, {})[warehouse_doc.parent_warehouse] = flt(
-					projected_qty
-				)
-			else:
-				item_warehouse_projected_qty[item_code][warehouse_doc.parent_warehouse] += flt(projected_qty)
-			warehouse_doc = frappe.get_doc("Warehouse", warehouse_doc.parent_warehouse)
+		# roll up projected qty to all parent warehouse groups
+		for parent_warehouse in warehouse_tree.ancestors(warehouse):
+			item_warehouse_projected_qty[item_code][parent_warehouse] = flt(
+				item_warehouse_projected_qty[item_code].get(parent_warehouse)
+			) + flt(projected_qty)
 
 	return item_warehouse_projected_qty
 
 
-def create_material_request(material_requests):
-	"""Create indent on reaching reorder level"""
+def create_material_request(material_requests, dry_run=False):
+	"""Create indent on reaching reorder level
+
+	:param dry_run: only build the Material Requests, don't save them"""
 	mr_list = []
 	exceptions_list = []
+	item_details, uom_conversion_factors = get_item_details_for_material_request(material_requests)
 
 	def _log_exception():
 		if frappe.local.message_log:
@@ -163,19 +195,14 @@ def create_material_request(material_requests):
 
 				for d in items:
 					d = frappe._dict(d)
-					item = frappe.get_doc("Item", d.item_code)
+					item = item_details[d.item_code]
 					uom = item.stock_uom
 					conversion_factor = 1.0
 
 					if request_type == "Purchase":
 						uom = item.purchase_uom or item.stock_uom
 						if uom != item.stock_uom:
-							conversion_factor = (
-								frappe.db.get_value(
-									"UOM Conversion Detail", {"parent": item.name, "uom": uom}, "conversion_factor"
-								)
-								or 1.0
-							)
+							conversion_factor = uom_conversion_factors.get((item.name, uom)) or 1.0
 
 					must_be_whole_number = frappe.db.get_value("UOM", uom, "must_be_whole_number", cache=True)
 					qty = d.reorder_qty / conversion_factor
@@ -202,13 +229,17 @@ def create_material_request(material_requests):
 				schedule_dates = [d.schedule_date for d in mr.items]
 				mr.schedule_date = max(schedule_dates or [nowdate()])
 				mr.flags.ignore_mandatory = True
-				mr.insert()
-				mr.submit()
+				if not dry_run:
+					mr.insert()
+					mr.submit()
 				mr_list.append(mr)
 
 			except Exception:
 				_log_exception()
 
+	if dry_run:
+		return mr_list
+
 	if mr_list:
 		if getattr(frappe.local, "reorder_email_notify", None) is None:
 			frappe.local.reorder_email_notify = cint(
@@ -224,6 +255,48 @@ def create_material_request(material_requests):
 	return mr_list
 
 
+def get_item_details_for_material_request(material_requests):
+	item_codes = list(
+		set(
+			d["item_code"]
+			for company_wise_items in material_requests.values()
+			for items in company_wise_items.values()
+			for d in items
+		)
+	)
+
+	if not item_codes:
+		return {}, {}
+
+	items = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item",
+			filters={"name": ("in", item_codes)},
+			fields=[
+				"name",
+				"stock_uom",
+				"purchase_uom",
+				"lead_time_days",
+				"item_name",
+				"description",
+				"item_group",
+				"brand",
+			],
+		)
+	}
+
+	uom_conversion_factors = {}
+	for parent, uom, conversion_factor in frappe.db.sql(
+		"""select parent, uom, conversion_factor from `tabUOM Conversion Detail`
+		where parent in %s""",
+		[tuple(item_codes)],
+	):
+		uom_conversion_factors.setdefault((parent, uom), conversion_factor)
+
+	return items, uom_conversion_factors
+
+
 def send_email_notification(mr_list):
 	"""Notify user about auto creation of indent"""
 
@@ -3,16 +3,19 @@
 
 
 from operator import itemgetter
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Iterator, List, Tuple, Union
 
 import frappe
 from frappe import _
-from frappe.utils import cint, date_diff, flt
+from frappe.utils import cint, create_batch, date_diff, flt
 
 from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
 
 Filters = frappe._dict
 
+# no. of items whose ledger entries are fetched and processed together
+ITEM_CHUNK_SIZE = 100
+
 
 def execute(filters: Filters = None) -> Tuple:
 	to_date = filters["to_date"]
@@ -230,11 +233,15 @@ class FIFOSlots:
 		        'fifo_queue' -> List: ** list of lists containing entries/slots for existing stock,
 		                consumed/updated and maintained via FIFO. **
 		}
+
+		If SLEs are not passed, they are streamed from the ledger in chunks of items,
+		so only the entries of the current chunk are held in memory at a time.
 		"""
-		if self.sle is None:
-			self.sle = self.__get_stock_ledger_entries()
+		stock_ledger_entries = self.sle
+		if stock_ledger_entries is None:
+			stock_ledger_entries = self.__get_stock_ledger_entries_in_chunks()
 
-		for d in self.sle:
+		for d in stock_ledger_entries:
 			key, fifo_queue, transferred_item_key = self.__init_key_stores(d)
 
 			if d.voucher_type == "Stock Reconciliation":
@@ -381,7 +388,42 @@ class FIFOSlots:
 
 		return item_aggregated_data
 
-	def __get_stock_ledger_entries(self) -> List[Dict]:
+	def __get_stock_ledger_entries_in_chunks(self) -> Iterator[Dict]:
+		"""Yield SLEs ordered by item, processing ITEM_CHUNK_SIZE items per query.
+
+		Items are independent of each other, so all of an item's entries are processed
+		before moving to the next one and per item stores can be dropped after each chunk."""
+		for items in create_batch(self.__get_items_with_stock_ledger_entries(), ITEM_CHUNK_SIZE):
+			yield from self.__get_stock_ledger_entries(items)
+
+			# transfers and serial nos of processed items are not needed anymore
+			self.transferred_item_details.clear()
+			self.serial_no_batch_purchase_details.clear()
+
+	def __get_items_with_stock_ledger_entries(self) -> List[str]:
+		sle = frappe.qb.DocType("Stock Ledger Entry")
+		item = self.__get_item_query()
+
+		sle_query = (
+			frappe.qb.from_(sle)
+			.from_(item)
+			.select(sle.item_code)
+			.distinct()
+			.where(
+				(sle.item_code == item.name)
+				& (sle.company == self.filters.get("company"))
+				& (sle.posting_date <= self.filters.get("to_date"))
+				& (sle.is_cancelled != 1)
+			)
+		)
+
+		if self.filters.get("warehouse"):
+			sle_query = self.__get_warehouse_conditions(sle, sle_query)
+
+		items = sle_query.orderby(sle.item_code).run()
+		return [x[0] for x in items]
+
+	def __get_stock_ledger_entries(self, items: List[str]) -> List[Dict]:
 		sle = frappe.qb.DocType("Stock Ledger Entry")
 		item = self.__get_item_query()  # used as derived table in sle query
 
@@ -410,13 +452,16 @@ class FIFOSlots:
 				& (sle.company == self.filters.get("company"))
 				& (sle.posting_date <= self.filters.get("to_date"))
 				& (sle.is_cancelled != 1)
+				& (sle.item_code.isin(items))
 			)
 		)
 
 		if self.filters.get("warehouse"):
 			sle_query = self.__get_warehouse_conditions(sle, sle_query)
 
-		sle_query = sle_query.orderby(sle.posting_date, sle.posting_time, sle.creation, sle.actual_qty)
+		sle_query = sle_query.orderby(
+			sle.item_code, sle.posting_date, sle.posting_time, sle.creation, sle.actual_qty
+		)
 
 		return sle_query.run(as_dict=True)
 
@@ -1,9 +1,14 @@
 # Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, today
 
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 from erpnext.stock.report.stock_ageing.stock_ageing import FIFOSlots, format_report_data
 
 
@@ -724,6 +729,36 @@ class TestStockAgeing(FrappeTestCase):
 		self.assertEqual(bal_qty, 0.9)
 		self.assertEqual(bal_qty, range_qty_sum)
 
+	def test_slots_from_ledger_in_item_chunks(self):
+		"Test if SLEs streamed from the ledger item by item give the same slots for each item."
+		items = [make_item().name, make_item().name]
+		posting_date = add_days(today(), -5)
+
+		for item in items:
+			make_stock_entry(
+				item_code=item, target="_Test Warehouse - _TC", qty=10, rate=10, posting_date=posting_date
+			)
+			make_stock_entry(
+				item_code=item,
+				source="_Test Warehouse - _TC",
+				target="_Test Warehouse 1 - _TC",
+				qty=4,
+				posting_date=add_days(posting_date, 1),
+			)
+
+		filters = frappe._dict(company="_Test Company", to_date=today(), show_warehouse_wise_stock=True)
+		with patch("erpnext.stock.report.stock_ageing.stock_ageing.ITEM_CHUNK_SIZE", 1):
+			slots = FIFOSlots(filters).generate()
+
+		for item in items:
+			self.assertEqual(
+				slots[(item, "_Test Warehouse - _TC")]["fifo_queue"], [[6.0, getdate(posting_date)]]
+			)
+			self.assertEqual(
+				slots[(item, "_Test Warehouse 1 - _TC")]["fifo_queue"],
+				[[4.0, getdate(add_days(posting_date, 1))]],
+			)
+
 
 def generate_item_and_item_wh_wise_slots(filters, sle):
 	"Return results with and without 'show_warehouse_wise_stock'"
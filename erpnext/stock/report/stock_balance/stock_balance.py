@@ -32,18 +32,25 @@ def execute(filters=None):
 	include_uom = filters.get("include_uom")
 	columns = get_columns(filters)
 	items = get_items(filters)
-	sle = get_stock_ledger_entries(filters, items)
+
+	if filters.get("show_stock_ageing_data"):
+		# ageing needs the complete ledger
+		closing_date, closing_balances, stale_item_warehouses = None, [], []
+	else:
+		closing_date, closing_balances, stale_item_warehouses = get_closing_balances(filters, items)
+
+	sle = get_stock_ledger_entries(filters, items, closing_date, stale_item_warehouses)
 
 	if filters.get("show_stock_ageing_data"):
 		filters["show_warehouse_wise_stock"] = True
 		item_wise_fifo_queue = FIFOSlots(filters, sle).generate()
 
 	# if no stock ledger entry found return
-	if not sle:
+	if not sle and not closing_balances:
 		return columns, []
 
-	iwb_map = get_item_warehouse_map(filters, sle)
-	item_map = get_item_details(items, sle, filters)
+	iwb_map = get_item_warehouse_map(filters, sle, closing_balances)
+	item_map = get_item_details(items, sle + closing_balances, filters)
 	item_reorder_detail_map = get_item_reorder_details(item_map.keys())
 
 	data = []
@@ -228,6 +235,13 @@ def get_conditions(filters):
 	else:
 		frappe.throw(_("'To Date' is required"))
 
+	conditions += get_company_and_warehouse_conditions(filters)
+
+	return conditions
+
+
+def get_company_and_warehouse_conditions(filters):
+	conditions = ""
 	if filters.get("company"):
 		conditions += " and sle.company = %s" % frappe.db.escape(filters.get("company"))
 
@@ -252,15 +266,28 @@ def get_conditions(filters):
 	return conditions
 
 
-def get_stock_ledger_entries(filters, items):
-	item_conditions_sql = ""
-	if items:
-		item_conditions_sql = " and sle.item_code in ({})".format(
-			", ".join(frappe.db.escape(i, percent=False) for i in items)
-		)
+def get_stock_ledger_entries(filters, items, closing_date=None, stale_item_warehouses=None):
+	"""Get SLEs up to `to_date`.
 
+	If `closing_date` is passed, only SLEs after it are fetched, except for
+	`stale_item_warehouses` whose closing balance can't be used."""
+	item_conditions_sql = get_item_conditions(items)
 	conditions = get_conditions(filters)
 
+	if closing_date:
+		stale_condition = ""
+		if stale_item_warehouses:
+			stale_condition = " or (sle.item_code, sle.warehouse) in ({})".format(
+				", ".join(
+					"({}, {})".format(frappe.db.escape(item_code), frappe.db.escape(warehouse))
+					for item_code, warehouse in stale_item_warehouses
+				)
+			)
+
+		conditions += " and (sle.posting_date > {0}{1})".format(
+			frappe.db.escape(closing_date), stale_condition
+		)
+
 	return frappe.db.sql(
 		"""
 		select
@@ -277,6 +304,47 @@ def get_stock_ledger_entries(filters, items):
 	)
 
 
+def get_item_conditions(items):
+	if not items:
+		return ""
+
+	return " and sle.item_code in ({})".format(
+		", ".join(frappe.db.escape(i, percent=False) for i in items)
+	)
+
+
+def get_closing_balances(filters, items):
+	"""Get balances from the latest Stock Closing Balance before `from_date`.
+
+	returns closing date, closing balances and item-warehouses whose closing balance is stale"""
+	closing_date = frappe.db.sql(
+		"select max(closing_date) from `tabStock Closing Balance` where closing_date < %s",
+		filters.get("from_date"),
+	)[0][0]
+
+	if not closing_date:
+		return None, [], []
+
+	balances = frappe.db.sql(
+		"""
+		select
+			sle.company, sle.item_code, sle.warehouse, sle.qty_after_transaction,
+			sle.valuation_rate, sle.stock_value, sle.is_stale
+		from
+			`tabStock Closing Balance` sle
+		where sle.closing_date = %s {0} {1}""".format(
+			get_item_conditions(items), get_company_and_warehouse_conditions(filters)
+		),  # nosec
+		closing_date,
+		as_dict=1,
+	)
+
+	closing_balances = [d for d in balances if not d.is_stale]
+	stale_item_warehouses = [(d.item_code, d.warehouse) for d in balances if d.is_stale]
+
+	return closing_date, closing_balances, stale_item_warehouses
+
+
 def get_opening_vouchers(to_date):
 	opening_vouchers = {"Stock Entry": [], "Stock Reconciliation": []}
 
@@ -305,13 +373,28 @@ def get_opening_vouchers(to_date):
 	return opening_vouchers
 
 
-def get_item_warehouse_map(filters, sle):
+def get_item_warehouse_map(filters, sle, closing_balances=None):
 	iwb_map = {}
 	from_date = getdate(filters.get("from_date"))
 	to_date = getdate(filters.get("to_date"))
 	opening_vouchers = get_opening_vouchers(to_date)
 	float_precision = cint(frappe.db.get_default("float_precision")) or 3
 
+	for d in closing_balances or []:
+		iwb_map[(d.company, d.item_code, d.warehouse)] = frappe._dict(
+			{
+				"opening_qty": flt(d.qty_after_transaction),
+				"opening_val": flt(d.stock_value),
+				"in_qty": 0.0,
+				"in_val": 0.0,
+				"out_qty": 0.0,
+				"out_val": 0.0,
+				"bal_qty": flt(d.qty_after_transaction),
+				"bal_val": flt(d.stock_value),
+				"val_rate": flt(d.valuation_rate),
+			}
+		)
+
 	for d in sle:
 		key = (d.company, d.item_code, d.warehouse)
 		if key not in iwb_map:
@@ -12,6 +12,7 @@ from six import iteritems
 
 from erpnext.stock.report.stock_ageing.stock_ageing import FIFOSlots, get_average_age
 from erpnext.stock.report.stock_balance.stock_balance import (
+	get_closing_balances,
 	get_item_details,
 	get_item_warehouse_map,
 	get_items,
@@ -30,10 +31,11 @@ def execute(filters=None):
 	columns = get_columns(filters)
 
 	items = get_items(filters)
-	sle = get_stock_ledger_entries(filters, items)
+	closing_date, closing_balances, stale_item_warehouses = get_closing_balances(filters, items)
+	sle = get_stock_ledger_entries(filters, items, closing_date, stale_item_warehouses)
 
-	item_map = get_item_details(items, sle, filters)
-	iwb_map = get_item_warehouse_map(filters, sle)
+	item_map = get_item_details(items, sle + closing_balances, filters)
+	iwb_map = get_item_warehouse_map(filters, sle, closing_balances)
 	warehouse_list = get_warehouse_list(filters)
 	item_ageing = FIFOSlots(filters).generate()
 	data = []
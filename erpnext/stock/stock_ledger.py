@@ -8,16 +8,42 @@ from typing import Set, Tuple
 import frappe
 from frappe import _
 from frappe.model.meta import get_field_precision
-from frappe.utils import cint, cstr, flt, get_datetime, get_link_to_form, getdate, now, nowdate
+from frappe.utils import (
+	cint,
+	create_batch,
+	cstr,
+	flt,
+	get_datetime,
+	get_link_to_form,
+	getdate,
+	now,
+	nowdate,
+)
 from six import iteritems
 
 import erpnext
 from erpnext.stock.doctype.bin.bin import update_qty as update_bin_qty
+from erpnext.stock.doctype.stock_closing_balance.stock_closing_balance import (
+	mark_closing_balances_as_stale,
+)
 from erpnext.stock.utils import (
 	get_incoming_outgoing_rate_for_cancel,
 	get_or_make_bin,
 	get_valuation_method,
 )
+from erpnext.stock.valuation import FIFOValuation
+
+# valuation fields rewritten on every SLE during reposting
+SLE_VALUATION_FIELDS = (
+	"qty_after_transaction",
+	"valuation_rate",
+	"stock_value",
+	"stock_queue",
+	"stock_value_difference",
+	"incoming_rate",
+	"outgoing_rate",
+)
+SLE_UPDATE_CHUNK_SIZE = 500
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -372,6 +398,7 @@ class update_entries_after(object):
 		self.new_items_found = False
 		self.distinct_item_warehouses = args.get("distinct_item_warehouses", frappe._dict())
 		self.affected_transactions: Set[Tuple[str, str]] = set()
+		self.pending_sle_updates = {}
 
 		self.data = frappe._dict()
 		self.initialize_previous_data(self.args)
@@ -414,7 +441,7 @@ class update_entries_after(object):
 		warehouse_dict.update(
 			{
 				"prev_stock_value": previous_sle.stock_value or 0.0,
-				"stock_queue": json.loads(previous_sle.stock_queue or "[]"),
+				"stock_queue": FIFOValuation(json.loads(previous_sle.stock_queue or "[]")),
 				"stock_value_difference": 0.0,
 			}
 		)
@@ -424,6 +451,7 @@ class update_entries_after(object):
 
 		if self.args.get("sle_id"):
 			self.process_sle_against_current_timestamp()
+			self.flush_sle_updates()
 			if not future_sle_exists(self.args):
 				self.update_bin()
 		else:
@@ -439,6 +467,7 @@ class update_entries_after(object):
 				if sle.dependant_sle_voucher_detail_no:
 					entries_to_fix = self.get_dependent_entries_to_fix(entries_to_fix, sle)
 
+			self.flush_sle_updates()
 			self.update_bin()
 
 		if self.exceptions:
@@ -540,7 +569,6 @@ class update_entries_after(object):
 
 		# previous sle data for this warehouse
 		self.wh_data = self.data[sle.warehouse]
-		self.affected_transactions.add((sle.voucher_type, sle.voucher_no))
 
 		if (sle.serial_no and not self.via_landed_cost_voucher) or not cint(self.allow_negative_stock):
 			# validate negative stock for serialized items, fifo valuation
@@ -579,7 +607,9 @@ class update_entries_after(object):
 					self.wh_data.valuation_rate
 				)
 				if self.valuation_method != "Moving Average":
-					self.wh_data.stock_queue = [[self.wh_data.qty_after_transaction, self.wh_data.valuation_rate]]
+					self.wh_data.stock_queue = FIFOValuation(
+						[[self.wh_data.qty_after_transaction, self.wh_data.valuation_rate]]
+					)
 			else:
 				if self.valuation_method == "Moving Average":
 					self.get_moving_average_values(sle)
@@ -590,9 +620,7 @@ class update_entries_after(object):
 				else:
 					self.get_fifo_values(sle)
 					self.wh_data.qty_after_transaction += flt(sle.actual_qty)
-					self.wh_data.stock_value = sum(
-						(flt(batch[0]) * flt(batch[1]) for batch in self.wh_data.stock_queue)
-					)
+					_qty, self.wh_data.stock_value = self.wh_data.stock_queue.get_total_stock_and_value()
 
 		# rounding as per precision
 		self.wh_data.stock_value = flt(self.wh_data.stock_value, self.currency_precision)
@@ -601,19 +629,40 @@ class update_entries_after(object):
 		stock_value_difference = self.wh_data.stock_value - self.wh_data.prev_stock_value
 		self.wh_data.prev_stock_value = self.wh_data.stock_value
 
+		# only vouchers with changed stock value need their GL entries reposted
+		if self.args.get("sle_id") or flt(sle.stock_value_difference, self.currency_precision) != flt(
+			stock_value_difference, self.currency_precision
+		):
+			self.affected_transactions.add((sle.voucher_type, sle.voucher_no))
+
 		# update current sle
 		sle.qty_after_transaction = self.wh_data.qty_after_transaction
 		sle.valuation_rate = self.wh_data.valuation_rate
 		sle.stock_value = self.wh_data.stock_value
-		sle.stock_queue = json.dumps(self.wh_data.stock_queue)
+		sle.stock_queue = json.dumps(self.wh_data.stock_queue.state)
 		sle.stock_value_difference = stock_value_difference
 		sle.doctype = "Stock Ledger Entry"
 
-		frappe.get_doc(sle).db_update()
+		# written in bulk by flush_sle_updates
+		self.pending_sle_updates[sle.name] = sle
 
 		if not self.args.get("sle_id"):
 			self.update_outgoing_rate_on_transaction(sle)
 
+	def flush_sle_updates(self):
+		"""Write buffered valuation fields of processed SLEs to the database.
+
+		Called after an item-warehouse is reposted and before any step
+		which reads back valuation of already processed SLEs."""
+		if not self.pending_sle_updates:
+			return
+
+		sl_entries = list(self.pending_sle_updates.values())
+		bulk_update_sle_valuation(sl_entries)
+		# reposted entries change the closing balances of their item-warehouses
+		mark_closing_balances_as_stale(sl_entries)
+		self.pending_sle_updates = {}
+
 	def validate_negative_stock(self, sle):
 		"""
 		validate negative stock for entries current datetime onwards
@@ -661,6 +710,9 @@ class update_entries_after(object):
 				if self.valuation_method == "Moving Average":
 					rate = flt(self.data[self.args.warehouse].previous_sle.valuation_rate)
 				else:
+					# rate of a return is read from the SLEs of the original voucher,
+					# which can be among the processed SLEs of this item
+					self.flush_sle_updates()
 					rate = get_rate_for_return(
 						sle.voucher_type,
 						sle.voucher_no,
@@ -724,6 +776,7 @@ class update_entries_after(object):
 			self.recalculate_amounts_in_stock_entry(sle.voucher_no)
 
 	def recalculate_amounts_in_stock_entry(self, voucher_no):
+		self.flush_sle_updates()
 		stock_entry = frappe.get_doc("Stock Entry", voucher_no, for_update=True)
 		stock_entry.calculate_rate_and_amount(reset_outgoing_rate=False, raise_error_if_no_rate=False)
 		stock_entry.db_update()
@@ -761,6 +814,7 @@ class update_entries_after(object):
 
 		# Recalculate subcontracted item's rate in case of subcontracted purchase receipt/invoice
 		if frappe.get_cached_value(sle.voucher_type, sle.voucher_no, "is_subcontracted") == "Yes":
+			self.flush_sle_updates()
 			doc = frappe.get_doc(sle.voucher_type, sle.voucher_no)
 			doc.update_valuation_rate(reset_outgoing_rate=False)
 			for d in doc.items + doc.supplied_items:
@@ -815,6 +869,9 @@ class update_entries_after(object):
 
 		# Get rate for serial nos which has been transferred to other company
 		invalid_serial_nos = [d.name for d in all_serial_nos if d.company != sle.company]
+		if invalid_serial_nos:
+			self.flush_sle_updates()
+
 		for serial_no in invalid_serial_nos:
 			incoming_rate = frappe.db.sql(
 				"""
@@ -884,80 +941,31 @@ class update_entries_after(object):
 		outgoing_rate = flt(sle.outgoing_rate)
 
 		if actual_qty > 0:
-			if not self.wh_data.stock_queue:
-				self.wh_data.stock_queue.append([0, 0])
-
-			# last row has the same rate, just updated the qty
-			if self.wh_data.stock_queue[-1][1] == incoming_rate:
-				self.wh_data.stock_queue[-1][0] += actual_qty
-			else:
-				# Item has a positive balance qty, add new entry
-				if self.wh_data.stock_queue[-1][0] > 0:
-					self.wh_data.stock_queue.append([actual_qty, incoming_rate])
-				else:  # negative balance qty
-					qty = self.wh_data.stock_queue[-1][0] + actual_qty
-					if qty > 0:  # new balance qty is positive
-						self.wh_data.stock_queue[-1] = [qty, incoming_rate]
-					else:  # new balance qty is still negative, maintain same rate
-						self.wh_data.stock_queue[-1][0] = qty
+			self.wh_data.stock_queue.add_stock(qty=actual_qty, rate=incoming_rate)
 		else:
-			qty_to_pop = abs(actual_qty)
-			while qty_to_pop:
-				if not self.wh_data.stock_queue:
-					# Get valuation rate from last sle if exists or from valuation rate field in item master
-					allow_zero_valuation_rate = self.check_if_allow_zero_valuation_rate(
-						sle.voucher_type, sle.voucher_detail_no
-					)
-					if not allow_zero_valuation_rate:
-						_rate = self.get_fallback_rate(sle)
-					else:
-						_rate = 0
-
-					self.wh_data.stock_queue.append([0, _rate])
 
-				index = None
-				if outgoing_rate > 0:
-					# Find the entry where rate matched with outgoing rate
-					for i, v in enumerate(self.wh_data.stock_queue):
-						if v[1] == outgoing_rate:
-							index = i
-							break
-
-					# If no entry found with outgoing rate, consume as per FIFO
-					if index is None:  # nosemgrep
-						index = 0
+			def rate_generator() -> float:
+				# Get valuation rate from last sle if exists or from valuation rate field in item master
+				allow_zero_valuation_rate = self.check_if_allow_zero_valuation_rate(
+					sle.voucher_type, sle.voucher_detail_no
+				)
+				if not allow_zero_valuation_rate:
+					return self.get_fallback_rate(sle)
 				else:
-					index = 0
-
-				# select first batch or the batch with same rate
-				batch = self.wh_data.stock_queue[index]
-				if qty_to_pop >= batch[0]:
-					# consume current batch
-					qty_to_pop = _round_off_if_near_zero(qty_to_pop - batch[0])
-					self.wh_data.stock_queue.pop(index)
-					if not self.wh_data.stock_queue and qty_to_pop:
-						# stock finished, qty still remains to be withdrawn
-						# negative stock, keep in as a negative batch
-						self.wh_data.stock_queue.append([-qty_to_pop, outgoing_rate or batch[1]])
-						break
+					return 0.0
 
-				else:
-					# qty found in current batch
-					# consume it and exit
-					batch[0] = batch[0] - qty_to_pop
-					qty_to_pop = 0
+			self.wh_data.stock_queue.remove_stock(
+				qty=abs(actual_qty), outgoing_rate=outgoing_rate, rate_generator=rate_generator
+			)
 
-		stock_value = _round_off_if_near_zero(
-			sum((flt(batch[0]) * flt(batch[1]) for batch in self.wh_data.stock_queue))
-		)
-		stock_qty = _round_off_if_near_zero(sum((flt(batch[0]) for batch in self.wh_data.stock_queue)))
+		stock_qty, stock_value = self.wh_data.stock_queue.get_total_stock_and_value()
 
 		if stock_qty:
 			self.wh_data.valuation_rate = stock_value / flt(stock_qty)
 
 		if not self.wh_data.stock_queue:
-			self.wh_data.stock_queue.append(
-				[0, sle.incoming_rate or sle.outgoing_rate or self.wh_data.valuation_rate]
+			self.wh_data.stock_queue = FIFOValuation(
+				[[0, sle.incoming_rate or sle.outgoing_rate or self.wh_data.valuation_rate]]
 			)
 
 	def check_if_allow_zero_valuation_rate(self, voucher_type, voucher_detail_no):
@@ -976,6 +984,7 @@ class update_entries_after(object):
 	def get_fallback_rate(self, sle) -> float:
 		"""When exact incoming rate isn't available use any of other "average" rates as fallback.
 		This should only get used for negative stock."""
+		self.flush_sle_updates()
 		return get_valuation_rate(
 			sle.item_code,
 			sle.warehouse,
@@ -1044,6 +1053,31 @@ class update_entries_after(object):
 			frappe.db.set_value("Bin", bin_name, updated_values)
 
 
+def bulk_update_sle_valuation(sl_entries):
+	"""Update valuation fields of Stock Ledger Entries using one multi-row update per chunk"""
+	for chunk in create_batch(sl_entries, SLE_UPDATE_CHUNK_SIZE):
+		set_clauses, values = [], []
+		for field in SLE_VALUATION_FIELDS:
+			set_clauses.append(
+				"`{0}` = case name {1} end".format(field, " ".join(["when %s then %s"] * len(chunk)))
+			)
+			for sle in chunk:
+				values.extend((sle.name, sle.get(field)))
+
+		values.extend(sle.name for sle in chunk)
+
+		frappe.db.sql(
+			"""
+			update `tabStock Ledger Entry`
+			set {set_clauses}
+			where name in ({names})
+		""".format(
+				set_clauses=", ".join(set_clauses), names=", ".join(["%s"] * len(chunk))
+			),
+			tuple(values),
+		)
+
+
 def get_previous_sle_of_current_voucher(args, operator="<", exclude_current_voucher=False):
 	"""get stock ledger entries filtered by specific posting datetime conditions"""
 
@@ -1484,16 +1518,6 @@ def get_future_sle_with_negative_batch_qty(args):
 			return [entry]
 
 
-def _round_off_if_near_zero(number: float, precision: int = 6) -> float:
-	"""Rounds off the number to zero only if number is close to zero for decimal
-	specified in precision. Precision defaults to 6.
-	"""
-	if abs(0.0 - flt(number)) < (1.0 / (10**precision)):
-		return 0.0
-
-	return flt(number)
-
-
 def get_incoming_rate_for_inter_company_transfer(sle) -> float:
 	"""
 	For inter company transfer, incoming rate is the average of the outgoing rate
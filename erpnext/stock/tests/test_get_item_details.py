@@ -4,7 +4,7 @@ import frappe
 from frappe.test_runner import make_test_records
 from frappe.tests.utils import FrappeTestCase
 
-from erpnext.stock.get_item_details import get_item_details
+from erpnext.stock.get_item_details import get_item_details, get_items_details
 
 test_ignore = ["BOM"]
 test_dependencies = ["Customer", "Supplier", "Item", "Price List", "Item Price"]
@@ -38,3 +38,29 @@ class TestGetItemDetail(FrappeTestCase):
 		)
 		details = get_item_details(args)
 		self.assertEqual(details.get("price_list_rate"), 100)
+
+	def test_get_items_details_same_as_get_item_details(self):
+		args = frappe._dict(
+			{
+				"company": "_Test Company",
+				"customer": "_Test Customer",
+				"conversion_rate": 1.0,
+				"price_list_currency": "INR",
+				"plc_conversion_rate": 1.0,
+				"doctype": "Sales Order",
+				"name": None,
+				"transaction_date": "2021-01-01",
+				"price_list": "_Test Price List",
+				"warehouse": "_Test Warehouse - _TC",
+				"ignore_pricing_rule": 1,
+			}
+		)
+		items = [
+			{"item_code": "_Test Item", "qty": 1},
+			{"item_code": "_Test Item 2", "qty": 2},
+			{"item_code": "_Test Item", "qty": 5, "uom": "_Test UOM 1"},
+		]
+
+		expected = [get_item_details(frappe._dict(args, **item)) for item in items]
+		self.assertEqual(get_items_details(args, items), expected)
+		self.assertIsNone(frappe.flags.item_details_batch_cache)
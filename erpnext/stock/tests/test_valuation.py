@@ -0,0 +1,78 @@
+import unittest
+
+from erpnext.stock.valuation import FIFOValuation
+
+
+class TestFIFOValuation(unittest.TestCase):
+	def setUp(self):
+		self.queue = FIFOValuation([])
+
+	def tearDown(self):
+		qty, value = self.queue.get_total_stock_and_value()
+		self.assertTotalQty(qty)
+		self.assertTotalValue(value)
+
+	def assertTotalQty(self, qty):
+		self.assertAlmostEqual(sum(q for q, _ in self.queue.state), qty, msg=f"queue: {self.queue}")
+
+	def assertTotalValue(self, value):
+		self.assertAlmostEqual(
+			sum(q * r for q, r in self.queue.state), value, msg=f"queue: {self.queue}"
+		)
+
+	def test_simple_addition(self):
+		self.queue.add_stock(1, 10)
+		self.assertEqual(self.queue.state, [[1, 10]])
+		self.assertEqual(self.queue.get_total_stock_and_value(), (1, 10))
+
+	def test_simple_removal(self):
+		self.queue.add_stock(1, 10)
+		self.queue.remove_stock(1)
+		self.assertEqual(self.queue.state, [])
+		self.assertEqual(self.queue.get_total_stock_and_value(), (0, 0))
+
+	def test_merge_new_stock(self):
+		self.queue.add_stock(1, 10)
+		self.queue.add_stock(1, 10)
+		self.assertEqual(self.queue.state, [[2, 10]])
+
+	def test_adding_multiple_bins(self):
+		self.queue.add_stock(1, 10)
+		self.queue.add_stock(2, 20)
+		self.assertEqual(self.queue.state, [[1, 10], [2, 20]])
+		self.assertEqual(self.queue.get_total_stock_and_value(), (3, 50))
+
+	def test_fifo_consumption(self):
+		self.queue.add_stock(10, 10)
+		self.queue.add_stock(10, 20)
+		consumed = self.queue.remove_stock(15)
+		self.assertEqual(consumed, [[10, 10], [5, 20]])
+		self.assertEqual(self.queue.state, [[5, 20]])
+		self.assertEqual(self.queue.get_total_stock_and_value(), (5, 100))
+
+	def test_consumption_with_outgoing_rate(self):
+		self.queue.add_stock(10, 10)
+		self.queue.add_stock(10, 20)
+		self.queue.remove_stock(5, outgoing_rate=20)
+		self.assertEqual(self.queue.state, [[10, 10], [5, 20]])
+
+	def test_negative_stock(self):
+		self.queue.add_stock(1, 10)
+		self.queue.remove_stock(2)
+		self.assertEqual(self.queue.state, [[-1, 10]])
+
+		# new stock should first fill the negative bin
+		self.queue.add_stock(3, 20)
+		self.assertEqual(self.queue.state, [[2, 20]])
+
+	def test_negative_stock_from_empty_queue(self):
+		self.queue.remove_stock(5, rate_generator=lambda: 15)
+		self.assertEqual(self.queue.state, [[-5, 15]])
+		self.assertEqual(self.queue.get_total_stock_and_value(), (-5, -75))
+
+	def test_totals_after_many_transactions(self):
+		for _ in range(100):
+			self.queue.add_stock(3, 10.1)
+			self.queue.add_stock(2, 11.3)
+			self.queue.remove_stock(4)
+		self.assertEqual(self.queue.get_total_stock_and_value()[0], 100)
@@ -10,6 +10,7 @@ from frappe.utils import cstr, flt, get_link_to_form, nowdate, nowtime
 from six import string_types
 
 import erpnext
+from erpnext.stock.valuation import FIFOValuation
 
 
 class InvalidWarehouseCompany(frappe.ValidationError):
@@ -329,29 +330,16 @@ def get_valuation_method(item_code):
 
 def get_fifo_rate(previous_stock_queue, qty):
 	"""get FIFO (average) Rate from Queue"""
+	stock_queue = FIFOValuation(previous_stock_queue)
 	if flt(qty) >= 0:
-		total = sum(f[0] for f in previous_stock_queue)
-		return sum(flt(f[0]) * flt(f[1]) for f in previous_stock_queue) / flt(total) if total else 0.0
+		total_qty, total_value = stock_queue.get_total_stock_and_value()
+		return total_value / total_qty if total_qty else 0.0
 	else:
-		available_qty_for_outgoing, outgoing_cost = 0, 0
-		qty_to_pop = abs(flt(qty))
-		while qty_to_pop and previous_stock_queue:
-			batch = previous_stock_queue[0]
-			if 0 < batch[0] <= qty_to_pop:
-				# if batch qty > 0
-				# not enough or exactly same qty in current batch, clear batch
-				available_qty_for_outgoing += flt(batch[0])
-				outgoing_cost += flt(batch[0]) * flt(batch[1])
-				qty_to_pop -= batch[0]
-				previous_stock_queue.pop(0)
-			else:
-				# all from current batch
-				available_qty_for_outgoing += flt(qty_to_pop)
-				outgoing_cost += flt(qty_to_pop) * flt(batch[1])
-				batch[0] -= qty_to_pop
-				qty_to_pop = 0
+		popped_bins = stock_queue.remove_stock(abs(flt(qty)))
+		available_qty_for_outgoing = sum(flt(fifo_bin[0]) for fifo_bin in popped_bins)
+		outgoing_cost = sum(flt(fifo_bin[0]) * flt(fifo_bin[1]) for fifo_bin in popped_bins)
 
-		return outgoing_cost / available_qty_for_outgoing
+		return outgoing_cost / available_qty_for_outgoing if available_qty_for_outgoing else 0.0
 
 
 def get_valid_serial_nos(sr_nos, qty=0, item_code=""):
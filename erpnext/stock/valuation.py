@@ -0,0 +1,161 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from frappe.utils import flt
+
+# stock queue bins are stored as [qty, rate]
+QTY = 0
+RATE = 1
+
+
+class FIFOValuation:
+	"""Valuation queue for FIFO valued items.
+
+	Bins are kept in a deque so that consuming from the front is O(1). Total qty and
+	value of the queue are maintained as bins are added and consumed, so reading them
+	does not require summing over every bin.
+
+	:param state: existing stock queue as stored on SLE, e.g. `[[10, 100], [5, 120]]`
+	"""
+
+	def __init__(self, state: Optional[List[List[float]]] = None):
+		self.queue = deque(list(fifo_bin) for fifo_bin in (state or []))
+		self._qty = 0.0
+		self._value = 0.0
+		self._recompute_totals()
+
+	def __repr__(self) -> str:
+		return str(self.state)
+
+	def __iter__(self) -> Iterator[List[float]]:
+		return iter(self.queue)
+
+	def __len__(self) -> int:
+		return len(self.queue)
+
+	@property
+	def state(self) -> List[List[float]]:
+		"""Get current state of queue, suitable for storing in `stock_queue` field of SLE."""
+		return list(self.queue)
+
+	def get_total_stock_and_value(self) -> Tuple[float, float]:
+		return _round_off_if_near_zero(self._qty), _round_off_if_near_zero(self._value)
+
+	def add_stock(self, qty: float, rate: float) -> None:
+		"""Update fifo queue with new stock.
+
+		args:
+		        qty: new quantity to add
+		        rate: incoming rate of new quantity"""
+
+		if not self.queue:
+			self.queue.append([0, 0])
+
+		last_bin = self.queue[-1]
+
+		# last row has the same rate, just updated the qty
+		if last_bin[RATE] == rate:
+			self._update_bin(last_bin, last_bin[QTY] + qty, rate)
+		else:
+			# Item has a positive balance qty, add new entry
+			if last_bin[QTY] > 0:
+				self._append_bin(qty, rate)
+			else:  # negative balance qty
+				new_qty = last_bin[QTY] + qty
+				if new_qty > 0:  # new balance qty is positive
+					self._update_bin(last_bin, new_qty, rate)
+				else:  # new balance qty is still negative, maintain same rate
+					self._update_bin(last_bin, new_qty, last_bin[RATE])
+
+	def remove_stock(
+		self,
+		qty: float,
+		outgoing_rate: float = 0.0,
+		rate_generator: Optional[Callable[[], float]] = None,
+	) -> List[List[float]]:
+		"""Remove stock from the queue and return the consumed bins.
+
+		args:
+		        qty: quantity to remove
+		        outgoing_rate: consume the bin with this rate first, if any
+		        rate_generator: called for rate of a new bin when the queue is empty,
+		                i.e. when stock is going negative"""
+
+		consumed_bins = []
+		while qty:
+			if not self.queue:
+				self._append_bin(0, rate_generator() if rate_generator else 0.0)
+
+			index = 0
+			if outgoing_rate > 0:
+				# Find the entry where rate matched with outgoing rate,
+				# if not found consume as per FIFO
+				for idx, fifo_bin in enumerate(self.queue):
+					if fifo_bin[RATE] == outgoing_rate:
+						index = idx
+						break
+
+			# select first bin or the bin with same rate
+			fifo_bin = self.queue[index]
+			if qty >= fifo_bin[QTY]:
+				# consume current bin
+				qty = _round_off_if_near_zero(qty - fifo_bin[QTY])
+				self._remove_bin(index)
+				consumed_bins.append(list(fifo_bin))
+
+				if not self.queue and qty:
+					# stock finished, qty still remains to be withdrawn
+					# negative stock, keep in as a negative bin
+					rate = outgoing_rate or fifo_bin[RATE]
+					self._append_bin(-qty, rate)
+					consumed_bins.append([qty, rate])
+					break
+			else:
+				# qty found in current bin, consume it and exit
+				self._update_bin(fifo_bin, fifo_bin[QTY] - qty, fifo_bin[RATE])
+				consumed_bins.append([qty, fifo_bin[RATE]])
+				qty = 0
+
+		return consumed_bins
+
+	def _append_bin(self, qty: float, rate: float) -> None:
+		self.queue.append([qty, rate])
+		self._qty += qty
+		self._value += qty * rate
+
+	def _update_bin(self, fifo_bin: List[float], qty: float, rate: float) -> None:
+		self._qty += qty - fifo_bin[QTY]
+		self._value += qty * rate - fifo_bin[QTY] * fifo_bin[RATE]
+		fifo_bin[QTY] = qty
+		fifo_bin[RATE] = rate
+
+	def _remove_bin(self, index: int) -> None:
+		if index == 0:
+			fifo_bin = self.queue.popleft()
+		else:
+			fifo_bin = self.queue[index]
+			del self.queue[index]
+
+		if self.queue:
+			self._qty -= fifo_bin[QTY]
+			self._value -= fifo_bin[QTY] * fifo_bin[RATE]
+		else:
+			# reset running totals on empty queue, avoids accumulating float errors
+			self._qty = self._value = 0.0
+
+	def _recompute_totals(self) -> None:
+		self._qty = sum(flt(fifo_bin[QTY]) for fifo_bin in self.queue)
+		self._value = sum(flt(fifo_bin[QTY]) * flt(fifo_bin[RATE]) for fifo_bin in self.queue)
+
+
+def _round_off_if_near_zero(number: float, precision: int = 6) -> float:
+	"""Rounds off the number to zero only if number is close to zero for decimal
+	specified in precision. Precision defaults to 6.
+	"""
+	if abs(0.0 - flt(number)) < (1.0 / (10**precision)):
+		return 0.0
+
+	return flt(number)
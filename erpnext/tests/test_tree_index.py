@@ -0,0 +1,61 @@
+import unittest
+
+import frappe
+from frappe.utils.nestedset import get_ancestors_of, get_descendants_of
+
+from erpnext.utilities.tree_index import get_tree_index
+
+
+class TestTreeIndex(unittest.TestCase):
+	def make_item_group(self, name, parent):
+		if not frappe.db.exists("Item Group", name):
+			frappe.get_doc(
+				{
+					"doctype": "Item Group",
+					"item_group_name": name,
+					"parent_item_group": parent,
+					"is_group": 1,
+				}
+			).insert()
+
+		return name
+
+	def test_tree_index_is_same_as_nested_set(self):
+		parent = self.make_item_group("_Test Tree Index Parent", "All Item Groups")
+		child = self.make_item_group("_Test Tree Index Child", parent)
+
+		tree_index = get_tree_index("Item Group")
+		self.assertEqual(tree_index.ancestors(child), get_ancestors_of("Item Group", child))
+		self.assertEqual(
+			sorted(tree_index.descendants("All Item Groups")),
+			sorted(get_descendants_of("Item Group", "All Item Groups")),
+		)
+		self.assertTrue(tree_index.is_descendant(child, parent))
+		self.assertFalse(tree_index.is_descendant(parent, child))
+		self.assertFalse(tree_index.is_descendant(parent, parent))
+		self.assertTrue(tree_index.is_descendant(parent, parent, include_self=True))
+
+		# index is rebuilt on change of the tree
+		grandchild = self.make_item_group("_Test Tree Index Grandchild", child)
+		self.assertEqual(
+			get_tree_index("Item Group").descendants(parent, include_self=True),
+			[parent, child, grandchild],
+		)
+		self.assertEqual(
+			get_tree_index("Item Group").ancestors(grandchild)[:2],
+			[child, parent],
+		)
+
+	def test_tree_index_held_by_long_job_is_rebuilt(self):
+		parent = self.make_item_group("_Test Tree Index Parent", "All Item Groups")
+		tree_index = get_tree_index("Item Group")
+
+		child = self.make_item_group("_Test Tree Index Job Child", parent)
+		# index held by a background job while another process changed the tree
+		frappe.flags.tree_index = {"Item Group": tree_index}
+
+		self.assertTrue(get_tree_index("Item Group").is_descendant(child, parent))
+		self.assertEqual(
+			get_tree_index("Item Group").bounds[parent],
+			tuple(frappe.db.get_value("Item Group", parent, ["lft", "rgt"])),
+		)
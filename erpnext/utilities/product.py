@@ -2,11 +2,16 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import pickle
+
 import frappe
 from frappe.utils import cint, flt, fmt_money, getdate, nowdate
 
 from erpnext.accounts.doctype.pricing_rule.pricing_rule import get_pricing_rule_for_item
 from erpnext.stock.doctype.batch.batch import get_batch_qty
+from erpnext.stock.doctype.item_price.item_price import get_item_prices_cache_key
+
+ITEM_PRICES_CACHE_EXPIRY = 24 * 60 * 60
 
 
 def get_web_item_qty_in_stock(item_code, item_warehouse_field, warehouse=None):
@@ -79,26 +84,55 @@ def qty_from_all_warehouses(batch_info):
 
 
 def get_price(item_code, price_list, customer_group, company, qty=1):
-	from erpnext.e_commerce.shopping_cart.cart import get_party
+	return get_prices([item_code], price_list, customer_group, company, qty=qty).get(item_code)
 
-	template_item_code = frappe.db.get_value("Item", item_code, "variant_of")
 
-	if price_list:
-		price = frappe.get_all(
-			"Item Price",
-			fields=["price_list_rate", "currency"],
-			filters={"price_list": price_list, "item_code": item_code},
+def get_prices(item_codes, price_list, customer_group, company, qty=1):
+	"""Returns price with pricing rule applied of each item that has a price in the price list.
+
+	Item prices, sales UOM conversion factors and pricing rule lookups are fetched once
+	for all the items."""
+	from erpnext.e_commerce.shopping_cart.cart import get_party
+
+	if not price_list or not item_codes:
+		return {}
+
+	item_details = {
+		d.name: d
+		for d in frappe.db.sql(
+			"""select I.name, I.variant_of, C.conversion_factor
+			from `tabItem` I
+			left join `tabUOM Conversion Detail` C on C.parent = I.name and C.uom = I.sales_uom
+			where I.name in %s""",
+			(tuple(item_codes),),
+			as_dict=1,
 		)
+	}
 
-		if template_item_code and not price:
-			price = frappe.get_all(
-				"Item Price",
-				fields=["price_list_rate", "currency"],
-				filters={"price_list": price_list, "item_code": template_item_code},
-			)
+	template_item_codes = [d.variant_of for d in item_details.values() if d.variant_of]
+	item_prices = get_item_prices(price_list, list(set(item_codes) | set(template_item_codes)))
+
+	party, prices = None, {}
+	price_list_currency = frappe.db.get_value("Price List", price_list, "currency")
+	hide_currency_symbol = cint(frappe.db.get_default("hide_currency_symbol"))
+
+	# candidate pricing rules are shared by all the items
+	batch_cache = frappe.flags.pricing_rule_batch_cache
+	if batch_cache is None:
+		frappe.flags.pricing_rule_batch_cache = {}
+	try:
+		for item_code in item_codes:
+			details = item_details.get(item_code) or frappe._dict()
+			price = item_prices.get(item_code)
+			if details.variant_of and not price:
+				price = item_prices.get(details.variant_of)
+
+			if not price:
+				continue
+
+			if party is None:
+				party = get_party() or frappe._dict()
 
-		if price:
-			party = get_party()
 			pricing_rule_dict = frappe._dict(
 				{
 					"item_code": item_code,
@@ -110,7 +144,7 @@ def get_price(item_code, price_list, customer_group, company, qty=1):
 					"company": company,
 					"conversion_rate": 1,
 					"for_shopping_cart": True,
-					"currency": frappe.db.get_value("Price List", price_list, "currency"),
+					"currency": price_list_currency,
 				}
 			)
 
@@ -118,64 +152,108 @@ def get_price(item_code, price_list, customer_group, company, qty=1):
 				pricing_rule_dict.update({"customer": party.name})
 
 			pricing_rule = get_pricing_rule_for_item(pricing_rule_dict)
-			price_obj = price[0]
-
-			if pricing_rule:
-				# price without any rules applied
-				mrp = price_obj.price_list_rate or 0
-
-				if pricing_rule.pricing_rule_for == "Discount Percentage":
-					price_obj.discount_percent = pricing_rule.discount_percentage
-					price_obj.formatted_discount_percent = str(flt(pricing_rule.discount_percentage, 0)) + "%"
-					price_obj.price_list_rate = flt(
-						price_obj.price_list_rate * (1.0 - (flt(pricing_rule.discount_percentage) / 100.0))
-					)
-
-				if pricing_rule.pricing_rule_for == "Rate":
-					rate_discount = flt(mrp) - flt(pricing_rule.price_list_rate)
-					if rate_discount > 0:
-						price_obj.formatted_discount_rate = fmt_money(rate_discount, currency=price_obj["currency"])
-					price_obj.price_list_rate = pricing_rule.price_list_rate or 0
-
-			if price_obj:
-				price_obj["formatted_price"] = fmt_money(
-					price_obj["price_list_rate"], currency=price_obj["currency"]
-				)
-				if mrp != price_obj["price_list_rate"]:
-					price_obj["formatted_mrp"] = fmt_money(mrp, currency=price_obj["currency"])
-
-				price_obj["currency_symbol"] = (
-					not cint(frappe.db.get_default("hide_currency_symbol"))
-					and (
-						frappe.db.get_value("Currency", price_obj.currency, "symbol", cache=True)
-						or price_obj.currency
-					)
-					or ""
-				)
-
-				uom_conversion_factor = frappe.db.sql(
-					"""select	C.conversion_factor
-					from `tabUOM Conversion Detail` C
-					inner join `tabItem` I on C.parent = I.name and C.uom = I.sales_uom
-					where I.name = %s""",
-					item_code,
-				)
-
-				uom_conversion_factor = uom_conversion_factor[0][0] if uom_conversion_factor else 1
-				price_obj["formatted_price_sales_uom"] = fmt_money(
-					price_obj["price_list_rate"] * uom_conversion_factor, currency=price_obj["currency"]
-				)
-
-				if not price_obj["price_list_rate"]:
-					price_obj["price_list_rate"] = 0
-
-				if not price_obj["currency"]:
-					price_obj["currency"] = ""
-
-				if not price_obj["formatted_price"]:
-					price_obj["formatted_price"], price_obj["formatted_mrp"] = "", ""
-
-			return price_obj
+			prices[item_code] = get_price_object(
+				frappe._dict(price[0]), pricing_rule, details.conversion_factor or 1, hide_currency_symbol
+			)
+	finally:
+		frappe.flags.pricing_rule_batch_cache = batch_cache
+
+	return prices
+
+
+def get_price_object(price_obj, pricing_rule, uom_conversion_factor, hide_currency_symbol):
+	if pricing_rule:
+		# price without any rules applied
+		mrp = price_obj.price_list_rate or 0
+
+		if pricing_rule.pricing_rule_for == "Discount Percentage":
+			price_obj.discount_percent = pricing_rule.discount_percentage
+			price_obj.formatted_discount_percent = str(flt(pricing_rule.discount_percentage, 0)) + "%"
+			price_obj.price_list_rate = flt(
+				price_obj.price_list_rate * (1.0 - (flt(pricing_rule.discount_percentage) / 100.0))
+			)
+
+		if pricing_rule.pricing_rule_for == "Rate":
+			rate_discount = flt(mrp) - flt(pricing_rule.price_list_rate)
+			if rate_discount > 0:
+				price_obj.formatted_discount_rate = fmt_money(rate_discount, currency=price_obj["currency"])
+			price_obj.price_list_rate = pricing_rule.price_list_rate or 0
+
+	if price_obj:
+		price_obj["formatted_price"] = fmt_money(
+			price_obj["price_list_rate"], currency=price_obj["currency"]
+		)
+		if mrp != price_obj["price_list_rate"]:
+			price_obj["formatted_mrp"] = fmt_money(mrp, currency=price_obj["currency"])
+
+		price_obj["currency_symbol"] = (
+			not hide_currency_symbol
+			and (
+				frappe.db.get_value("Currency", price_obj.currency, "symbol", cache=True) or price_obj.currency
+			)
+			or ""
+		)
+
+		price_obj["formatted_price_sales_uom"] = fmt_money(
+			price_obj["price_list_rate"] * uom_conversion_factor, currency=price_obj["currency"]
+		)
+
+		if not price_obj["price_list_rate"]:
+			price_obj["price_list_rate"] = 0
+
+		if not price_obj["currency"]:
+			price_obj["currency"] = ""
+
+		if not price_obj["formatted_price"]:
+			price_obj["formatted_price"], price_obj["formatted_mrp"] = "", ""
+
+	return price_obj
+
+
+def get_item_prices(price_list, item_codes):
+	"""Returns {item_code: [price_list_rate and currency of each Item Price]}.
+
+	Item prices are cached per price list along with the version of the price list they were
+	read at, and are read again once any Item Price of the price list is changed."""
+	cache = frappe.cache()
+	cache_key = get_item_prices_cache_key(price_list)
+	version = get_item_prices_version(price_list)
+
+	item_prices, pending_items = {}, []
+	cached_prices = cache.hmget(cache.make_key(cache_key), item_codes) if item_codes else []
+	for item_code, cached in zip(item_codes, cached_prices):
+		cached = pickle.loads(cached) if cached else None
+		if cached and cached["version"] == version:
+			item_prices[item_code] = cached["prices"]
+		else:
+			pending_items.append(item_code)
+
+	if pending_items:
+		prices = {item_code: [] for item_code in pending_items}
+		for d in frappe.get_all(
+			"Item Price",
+			fields=["item_code", "price_list_rate", "currency"],
+			filters={"price_list": price_list, "item_code": ("in", pending_items)},
+		):
+			prices[d.item_code].append({"price_list_rate": d.price_list_rate, "currency": d.currency})
+
+		for item_code, rows in prices.items():
+			cache.hset(cache_key, item_code, {"version": version, "prices": rows})
+			item_prices[item_code] = rows
+
+		# prices cached at earlier versions are dropped with the key
+		cache.expire(cache.make_key(cache_key), ITEM_PRICES_CACHE_EXPIRY)
+
+	return item_prices
+
+
+def get_item_prices_version(price_list):
+	# changes on insert, delete and save of any item price of the price list
+	return tuple(
+		frappe.db.sql(
+			"select count(*), max(modified) from `tabItem Price` where price_list = %s", price_list
+		)[0]
+	)
 
 
 def get_non_stock_item_status(item_code, item_warehouse_field):
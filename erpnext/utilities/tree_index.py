@@ -0,0 +1,148 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+from bisect import bisect_left, bisect_right
+
+import frappe
+from frappe.model.base_document import get_controller
+
+TREE_INDEX_CACHE_KEY = "tree_index"
+TREE_VERSION_CACHE_KEY = "tree_index_version:{0}"
+# trees resolved on hot paths, invalidated via doc_events in hooks.py
+CACHED_TREE_DOCTYPES = (
+	"Account",
+	"Cost Center",
+	"Item Group",
+	"Customer Group",
+	"Territory",
+	"Supplier Group",
+	"Warehouse",
+	"Sales Person",
+)
+
+
+class TreeIndex:
+	"""Ancestors and descendants of nodes of a nested set tree, resolved in memory."""
+
+	def __init__(self, doctype, nodes, version=None):
+		self.doctype = doctype
+		self.version = version
+		self.parents = {}
+		self.bounds = {}
+		self.roots = []
+
+		# nodes are (name, parent, lft, rgt) sorted by lft
+		self.names = [d[0] for d in nodes]
+		self.lfts = [d[2] for d in nodes]
+		for name, parent, lft, rgt in nodes:
+			self.parents[name] = parent
+			self.bounds[name] = (lft, rgt)
+			if not parent:
+				self.roots.append(name)
+
+	def exists(self, name):
+		return name in self.bounds
+
+	def ancestors(self, name, include_self=False):
+		"""Returns ancestors of `name`, nearest first."""
+		ancestors = [name] if include_self and self.exists(name) else []
+		parent = self.parents.get(name)
+		while parent and parent not in ancestors:
+			ancestors.append(parent)
+			parent = self.parents.get(parent)
+
+		return ancestors
+
+	def descendants(self, name, include_self=False):
+		"""Returns descendants of `name`, in tree order."""
+		if not self.exists(name):
+			return []
+
+		lft, rgt = self.bounds[name]
+		start = bisect_left(self.lfts, lft) if include_self else bisect_right(self.lfts, lft)
+		return self.names[start : bisect_right(self.lfts, rgt)]
+
+	def is_descendant(self, name, ancestor, include_self=False):
+		if not (self.exists(name) and self.exists(ancestor)):
+			return False
+		elif name == ancestor:
+			return include_self
+
+		lft, rgt = self.bounds[name]
+		ancestor_lft, ancestor_rgt = self.bounds[ancestor]
+		return ancestor_lft < lft and rgt < ancestor_rgt
+
+
+def get_tree_index(doctype):
+	"""Returns `TreeIndex` of the doctype, cached till a node of the tree is changed."""
+	if frappe.flags.tree_index is None:
+		frappe.flags.tree_index = {}
+
+	tree_index = frappe.flags.tree_index.get(doctype)
+	if doctype in CACHED_TREE_DOCTYPES:
+		version = get_tree_version(doctype)
+		if not tree_index or tree_index.version != version:
+			tree_index = TreeIndex(doctype, get_cached_tree_nodes(doctype, version), version)
+	elif not tree_index:
+		tree_index = TreeIndex(doctype, get_tree_nodes(doctype))
+
+	frappe.flags.tree_index[doctype] = tree_index
+	return tree_index
+
+
+def get_tree_version(doctype):
+	"""Returns version of the tree, changed by `clear_tree_index`.
+
+	Read from redis directly, so that a long background job holding the index in
+	`frappe.flags` sees changes of the tree made by other processes."""
+	cache = frappe.cache()
+	return cache.get(cache.make_key(TREE_VERSION_CACHE_KEY.format(doctype)))
+
+
+def get_cached_tree_nodes(doctype, version):
+	"""Returns nodes of the tree from cache, rebuilt if cached for another version of the tree."""
+	cached = frappe.cache().hget(TREE_INDEX_CACHE_KEY, doctype)
+
+	if not cached or cached["version"] != version:
+		cached = {"version": version, "nodes": get_tree_nodes(doctype)}
+		frappe.cache().hset(TREE_INDEX_CACHE_KEY, doctype, cached)
+
+	return cached["nodes"]
+
+
+def get_tree_nodes(doctype):
+	parent_field = getattr(get_controller(doctype), "nsm_parent_field", None)
+	if not parent_field:
+		parent_field = "parent_" + frappe.scrub(doctype)
+
+	return [
+		tuple(d)
+		for d in frappe.db.sql(
+			"""select name, `{0}`, lft, rgt from `tab{1}`
+			where lft is not null and rgt is not null
+			order by lft""".format(
+				parent_field, doctype
+			)
+		)
+	]
+
+
+def get_ancestors(doctype, name, include_self=False):
+	return get_tree_index(doctype).ancestors(name, include_self)
+
+
+def get_descendants(doctype, name, include_self=False):
+	return get_tree_index(doctype).descendants(name, include_self)
+
+
+def is_descendant(doctype, name, ancestor, include_self=False):
+	return get_tree_index(doctype).is_descendant(name, ancestor, include_self)
+
+
+def clear_tree_index(doc, method=None):
+	"""Clear cached index of the tree of `doc` on insert, update, rename or delete of a node."""
+	cache = frappe.cache()
+	cache.incr(cache.make_key(TREE_VERSION_CACHE_KEY.format(doc.doctype)))
+	cache.hdel(TREE_INDEX_CACHE_KEY, doc.doctype)
+	if frappe.flags.tree_index:
+		frappe.flags.tree_index.pop(doc.doctype, None)
@@ -0,0 +1,45 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+import frappe
+from frappe.utils import create_batch
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def insert_or_add(doctype, fields, values, unique_fields, add_fields):
+	"""Insert rows of `values` for `fields` in multi-row statements. If a row has the same
+	`unique_fields` as an existing row, its `add_fields` are added to the existing row instead.
+
+	`unique_fields` must have a unique index. Each row is locked only by its own statement,
+	so concurrent inserts of the same key don't create duplicates or wait on gap locks."""
+	if not values:
+		return
+
+	table = "`tab{0}`".format(doctype)
+	columns = ", ".join("`{0}`".format(field) for field in fields)
+	placeholders = "({0})".format(", ".join(["%s"] * len(fields)))
+
+	for batch in create_batch(values, UPSERT_BATCH_SIZE):
+		frappe.db.multisql(
+			{
+				"mariadb": """insert into {table} ({columns}) values {values}
+					on duplicate key update {updates}""".format(
+					table=table,
+					columns=columns,
+					values=", ".join([placeholders] * len(batch)),
+					updates=", ".join("`{0}` = `{0}` + values(`{0}`)".format(field) for field in add_fields),
+				),
+				"postgres": """insert into {table} ({columns}) values {values}
+					on conflict ({unique_fields}) do update set {updates}""".format(
+					table=table,
+					columns=columns,
+					values=", ".join([placeholders] * len(batch)),
+					unique_fields=", ".join("`{0}`".format(field) for field in unique_fields),
+					updates=", ".join(
+						"`{0}` = {1}.`{0}` + excluded.`{0}`".format(field, table) for field in add_fields
+					),
+				),
+			},
+			[value for row in batch for value in row],
+		)